@@ -0,0 +1,68 @@
+"""Benchmark the throughput of validating a directory of input manifests with `twined.bulk.validate_files` for numbers
+of worker processes from one up to the number of processors, against validating them one by one in this process.
+
+Usage:
+```
+python benchmarks/bulk_validation.py [number_of_files]
+```
+"""
+
+import json
+import os
+import sys
+from tempfile import TemporaryDirectory
+import time
+
+from twined import Twine
+from twined.bulk import validate_files
+
+TWINE = {"input_manifest": {"datasets": {"met_mast_data": {}}}}
+
+
+def write_manifests(directory, number_of_files):
+    for i in range(number_of_files):
+        files = [
+            {"id": str(j), "path": f"gs://bucket/dataset/file_{j}.csv", "tags": {"index": j}, "labels": ["csv"]}
+            for j in range(50)
+        ]
+
+        manifest = {
+            "id": f"manifest-{i}",
+            "datasets": {
+                "met_mast_data": {"id": "dataset-id", "name": "met_mast_data", "tags": {}, "labels": [], "files": files}
+            },
+        }
+
+        with open(os.path.join(directory, f"manifest_{i}.json"), "w") as f:
+            json.dump(manifest, f)
+
+
+def validate_one_by_one(directory):
+    twine = Twine(source=TWINE)
+
+    for filename in os.listdir(directory):
+        twine.validate_input_manifest(os.path.join(directory, filename))
+
+
+if __name__ == "__main__":
+    number_of_files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with TemporaryDirectory() as temporary_directory:
+        write_manifests(temporary_directory, number_of_files)
+
+        start = time.perf_counter()
+        validate_one_by_one(temporary_directory)
+        duration = time.perf_counter() - start
+        print(f"One by one: {number_of_files / duration:.0f} files per second")
+
+        max_workers = 1
+
+        while max_workers <= os.cpu_count():
+            start = time.perf_counter()
+
+            for _ in validate_files(TWINE, "input_manifest", [temporary_directory], max_workers=max_workers):
+                pass
+
+            duration = time.perf_counter() - start
+            print(f"validate_files ({max_workers} workers): {number_of_files / duration:.0f} files per second")
+            max_workers *= 2
@@ -0,0 +1,73 @@
+"""Benchmark the duplicate-key detection hook against the previous key-by-key implementation and against parsing
+without any detection, both on the hook alone for objects of different sizes and on parsing a whole manifest.
+
+Usage:
+```
+python benchmarks/duplicate_key_detection.py
+```
+"""
+
+import json
+import os
+import timeit
+
+from twined.utils.decoders import raise_error_if_duplicate_keys
+
+EXAMPLE_MANIFEST_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "met_mast_scada_service", "data", "input_manifest.json"
+)
+
+OBJECT_SIZES = (1, 5, 20, 100)
+NUMBER = 100_000
+MANIFEST_REPETITIONS = 2000
+
+
+def raise_error_if_duplicate_keys_key_by_key(pairs):
+    """The previous implementation of `raise_error_if_duplicate_keys`, checking each key before adding it."""
+    result = {}
+
+    for key, value in pairs:
+        if key in result:
+            raise KeyError(f"Duplicate key detected: {key!r}.")
+
+        result[key] = value
+
+    return result
+
+
+HOOKS = {
+    "key by key": raise_error_if_duplicate_keys_key_by_key,
+    "dict and compare lengths": raise_error_if_duplicate_keys,
+}
+
+
+def benchmark_hooks():
+    """Time each hook on objects of different sizes."""
+    for size in OBJECT_SIZES:
+        pairs = [(f"key_{i}", i) for i in range(size)]
+        print(f"Object with {size} key(s):")
+
+        for name, hook in HOOKS.items():
+            duration = min(timeit.repeat(lambda: hook(pairs), number=NUMBER, repeat=5)) / NUMBER
+            print(f"  {name}: {duration * 1e9:.0f} ns")
+
+
+def benchmark_parsing():
+    """Time parsing a large manifest with the standard library's decoder using each hook and no hook."""
+    with open(EXAMPLE_MANIFEST_PATH) as f:
+        manifest = json.load(f)
+
+    for dataset in manifest["datasets"]:
+        dataset["files"] = dataset["files"] * MANIFEST_REPETITIONS
+
+    document = json.dumps(manifest)
+    print(f"Parsing a manifest of {len(document) / 1e6:.0f} MB:")
+
+    for name, hook in {**HOOKS, "no detection": None}.items():
+        duration = min(timeit.repeat(lambda: json.loads(document, object_pairs_hook=hook), number=1, repeat=3))
+        print(f"  {name}: {len(document) / 1e6 / duration:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    benchmark_hooks()
+    benchmark_parsing()
@@ -0,0 +1,76 @@
+"""Benchmark how long the event loop is blocked while large input manifests are validated concurrently with
+`Twine.avalidate_input_manifest`, against how long validating one of them synchronously would block it.
+
+Usage:
+```
+python benchmarks/event_loop_latency.py [number_of_files] [number_of_manifests]
+```
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+
+from twined import Twine
+
+TWINE = {"input_manifest": {"datasets": {"met_mast_data": {}}}}
+
+
+def create_manifest(number_of_files):
+    files = [
+        {"id": str(i), "path": f"gs://bucket/dataset/file_{i}.csv", "tags": {"index": i}, "labels": ["csv"]}
+        for i in range(number_of_files)
+    ]
+
+    return {
+        "id": "manifest-id",
+        "datasets": {
+            "met_mast_data": {"id": "dataset-id", "name": "met_mast_data", "tags": {}, "labels": [], "files": files}
+        },
+    }
+
+
+async def measure_maximum_latency(stop, interval=0.001):
+    maximum_latency = 0
+
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        maximum_latency = max(maximum_latency, time.perf_counter() - start - interval)
+
+    return maximum_latency
+
+
+async def validate_concurrently(twine, manifest, number_of_manifests):
+    stop = asyncio.Event()
+    latency = asyncio.create_task(measure_maximum_latency(stop))
+
+    with ThreadPoolExecutor(max_workers=number_of_manifests) as executor:
+        await asyncio.gather(
+            *(twine.avalidate_input_manifest(manifest, executor=executor) for _ in range(number_of_manifests))
+        )
+
+    stop.set()
+    return await latency
+
+
+if __name__ == "__main__":
+    number_of_files = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    number_of_manifests = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    twine = Twine(source=TWINE)
+    manifest = create_manifest(number_of_files)
+    twine.validate_input_manifest(manifest)
+
+    start = time.perf_counter()
+    twine.validate_input_manifest(manifest)
+    blocking_duration = time.perf_counter() - start
+
+    maximum_latency = asyncio.run(validate_concurrently(twine, manifest, number_of_manifests))
+
+    print(f"Validating one manifest of {number_of_files} files synchronously: {blocking_duration * 1000:.1f} ms")
+    print(
+        f"Maximum event loop latency validating {number_of_manifests} concurrently: {maximum_latency * 1000:.1f} ms "
+        f"({maximum_latency / blocking_duration:.0%} of the synchronous validation)"
+    )
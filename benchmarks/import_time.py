@@ -0,0 +1,41 @@
+"""Benchmark the time taken to import twined and its heavy dependencies in fresh interpreters, measured with
+`python -X importtime` (the median of several runs).
+
+Usage:
+```
+python benchmarks/import_time.py [number_of_runs]
+```
+"""
+
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = {
+    "twined": "import twined; twined.utils.TwinedEncoder",
+    "twined.twine": "from twined import Twine",
+    "jsonschema": "import jsonschema",
+}
+
+
+def get_cumulative_import_time(statement, module):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            return int(line.split("|")[1])
+
+    raise ValueError(f"{module!r} wasn't imported by {statement!r}.")
+
+
+if __name__ == "__main__":
+    number_of_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    for module, statement in STATEMENTS.items():
+        times = [get_cumulative_import_time(statement, module) for _ in range(number_of_runs)]
+        print(f"{module}: {statistics.median(times) / 1000:.1f} ms (median of {number_of_runs} runs)")
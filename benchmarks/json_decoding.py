@@ -0,0 +1,83 @@
+"""Benchmark the parse throughput of `load_json` (the standard library's decoder with duplicate-key detection) against the
+standard library's decoder without duplicate-key detection, on the example input manifest scaled up to sizes from 1 MB
+to 100 MB. If `orjson` is installed, its throughput without duplicate-key detection is shown for reference as an upper
+bound for a decoder plugged in with `twined.utils.set_json_decoder`.
+
+Usage:
+```
+python benchmarks/json_decoding.py [maximum_size_in_mb]
+```
+"""
+
+import copy
+import json
+import os
+import sys
+import time
+
+from twined.utils import load_json
+
+EXAMPLE_MANIFEST_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "met_mast_scada_service", "data", "input_manifest.json"
+)
+
+SIZES_IN_MB = (1, 10, 100)
+
+REPEATS = 3
+
+
+def scale_manifest(manifest, size_in_mb):
+    """Repeat the files in each dataset of the manifest until its serialised size is roughly the given size.
+
+    :param dict manifest:
+    :param int size_in_mb:
+    :return bytes:
+    """
+    manifest = copy.deepcopy(manifest)
+    serialised_size = len(json.dumps(manifest, indent=2))
+    repetitions = max(1, size_in_mb * 1_000_000 // serialised_size)
+
+    for dataset in manifest["datasets"]:
+        files = dataset["files"]
+        dataset["files"] = [{**file, "id": f"{file['id']}-{i}"} for i in range(repetitions) for file in files]
+
+    return json.dumps(manifest, indent=2).encode()
+
+
+def measure_throughput(function, document):
+    """Measure the throughput of parsing the document with the function, taking the best of a few runs.
+
+    :param callable function:
+    :param bytes document:
+    :return float: the throughput in MB/s
+    """
+    durations = []
+
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function(document)
+        durations.append(time.perf_counter() - start)
+
+    return len(document) / 1e6 / min(durations)
+
+
+if __name__ == "__main__":
+    maximum_size_in_mb = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES_IN_MB[-1]
+
+    with open(EXAMPLE_MANIFEST_PATH) as f:
+        example_manifest = json.load(f)
+
+    for size_in_mb in (size for size in SIZES_IN_MB if size <= maximum_size_in_mb):
+        document = scale_manifest(example_manifest, size_in_mb)
+        print(f"Manifest of {len(document) / 1e6:.0f} MB:")
+
+        throughput = measure_throughput(json.loads, document)
+        print(f"  json (without duplicate-key detection): {throughput:.1f} MB/s")
+        print(f"  load_json: {measure_throughput(load_json, document):.1f} MB/s")
+
+        try:
+            import orjson
+        except ImportError:
+            print("  orjson: not installed")
+        else:
+            print(f"  orjson (without duplicate-key detection): {measure_throughput(orjson.loads, document):.1f} MB/s")
@@ -0,0 +1,88 @@
+"""Benchmark encoding output values containing a large float array with `TwinedEncoder` against the previous approach of
+converting arrays to lists as a whole with `tolist`, and writing them to a file with `write_json` rather than encoding
+them into one string, measuring throughput and peak memory use.
+
+Usage:
+```
+python benchmarks/numpy_encoding.py [number_of_elements]
+```
+"""
+
+import json
+import os
+import sys
+from tempfile import TemporaryDirectory
+import time
+import tracemalloc
+
+import numpy as np
+
+from twined.utils import TwinedEncoder, write_json
+
+NUMBER_OF_ELEMENTS = 10_000_000
+
+
+class TolistEncoder(json.JSONEncoder):
+    """The previous implementation of `TwinedEncoder`, converting each array to nested lists as a whole."""
+
+    def default(self, obj):
+        import numpy
+
+        if isinstance(obj, numpy.ndarray) or isinstance(obj, numpy.matrix):
+            return obj.tolist()
+
+        return json.JSONEncoder.default(self, obj)
+
+
+ENCODERS = {"tolist": TolistEncoder, "TwinedEncoder": TwinedEncoder}
+
+
+def measure(encoder, values):
+    """Measure the time taken and the peak memory allocated to encode the values with the encoder.
+
+    :param type encoder:
+    :param dict values:
+    :return (float, int, int): the duration in seconds, the peak memory allocated in bytes and the length of the output
+    """
+    start = time.perf_counter()
+    json.dumps(values, cls=encoder)
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    output = json.dumps(values, cls=encoder)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak_memory, len(output)
+
+
+if __name__ == "__main__":
+    number_of_elements = int(sys.argv[1]) if len(sys.argv) > 1 else NUMBER_OF_ELEMENTS
+    values = {"wind_speeds": np.random.default_rng(0).standard_normal(number_of_elements), "site": "met-mast-1"}
+    print(f"Encoding output values with a float64 array of {number_of_elements} elements:")
+
+    for name, encoder in ENCODERS.items():
+        duration, peak_memory, output_length = measure(encoder, values)
+
+        print(
+            f"  {name}: {duration:.2f} s ({output_length / 1e6 / duration:.1f} MB/s), peak memory allocated "
+            f"{peak_memory / 1e6:.0f} MB (of which {output_length / 1e6:.0f} MB is the output)"
+        )
+
+    with TemporaryDirectory() as temporary_directory:
+        path = os.path.join(temporary_directory, "output_values.json")
+
+        start = time.perf_counter()
+        write_json(values, path)
+        duration = time.perf_counter() - start
+
+        tracemalloc.start()
+        write_json(values, path)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        output_length = os.path.getsize(path)
+
+    print(
+        f"  write_json (to a file): {duration:.2f} s ({output_length / 1e6 / duration:.1f} MB/s), peak memory "
+        f"allocated {peak_memory / 1e6:.0f} MB"
+    )
@@ -0,0 +1,67 @@
+"""Benchmark validating output values containing a large float array directly against the previous approach of
+converting the array to a list with `tolist` first, measuring the time taken and peak memory use.
+
+Usage:
+```
+python benchmarks/numpy_validation.py [number_of_elements]
+```
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from twined import Twine
+
+NUMBER_OF_ELEMENTS = 1_000_000
+
+TWINE = {
+    "output_values_schema": {
+        "type": "object",
+        "properties": {
+            "wind_speeds": {"type": "array", "items": {"type": "number", "minimum": -100, "maximum": 100}},
+            "site": {"type": "string"},
+        },
+    }
+}
+
+
+def measure(validate, values):
+    """Measure the time taken and the peak memory allocated to validate the values.
+
+    :param callable validate:
+    :param dict values:
+    :return (float, int): the duration in seconds and the peak memory allocated in bytes
+    """
+    start = time.perf_counter()
+    validate(values)
+    duration = time.perf_counter() - start
+
+    tracemalloc.start()
+    validate(values)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak_memory
+
+
+if __name__ == "__main__":
+    number_of_elements = int(sys.argv[1]) if len(sys.argv) > 1 else NUMBER_OF_ELEMENTS
+    values = {"wind_speeds": np.random.default_rng(0).standard_normal(number_of_elements), "site": "met-mast-1"}
+    print(f"Validating output values with a float64 array of {number_of_elements} elements:")
+
+    for compiled_strands in ((), ("output_values",)):
+        twine = Twine(source=TWINE, compiled_strands=compiled_strands)
+        kind = "compiled" if compiled_strands else "jsonschema"
+
+        validators = {
+            f"tolist ({kind})": lambda values: twine.validate_output_values(
+                {**values, "wind_speeds": values["wind_speeds"].tolist()}
+            ),
+            f"array ({kind})": twine.validate_output_values,
+        }
+
+        for name, validate in validators.items():
+            duration, peak_memory = measure(validate, values)
+            print(f"  {name}: {duration:.3f} s, peak memory allocated {peak_memory / 1e6:.0f} MB")
@@ -0,0 +1,32 @@
+"""Benchmark the construction of `Twine` instances with the twine validator shared between instances (the current
+behaviour) against rebuilding it for every instance (the previous behaviour).
+
+Usage:
+```
+python benchmarks/twine_construction.py
+```
+"""
+
+import os
+import timeit
+
+from twined import Twine
+from twined.schema import get_twine_validator
+
+TWINE_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "apps", "example_app", "twine.json")
+NUMBER = 500
+
+
+def construct_with_shared_validator():
+    Twine(source=TWINE_PATH)
+
+
+def construct_with_validator_rebuilt():
+    get_twine_validator.cache_clear()
+    Twine(source=TWINE_PATH)
+
+
+if __name__ == "__main__":
+    for function in (construct_with_validator_rebuilt, construct_with_shared_validator):
+        duration = min(timeit.repeat(function, number=NUMBER, repeat=5)) / NUMBER
+        print(f"{function.__name__}: {duration * 1e6:.1f} µs per twine")
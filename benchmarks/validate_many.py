@@ -0,0 +1,54 @@
+"""Benchmark validating batches of input values with `Twine.validate_many` against validating them one by one with
+`Twine.validate_input_values`, for batch sizes from 10 to 1,000,000 items.
+
+Usage:
+```
+python benchmarks/validate_many.py [maximum_batch_size]
+```
+"""
+
+import sys
+import time
+
+from twined import Twine
+
+TWINE = {
+    "input_values_schema": {
+        "type": "object",
+        "properties": {"height": {"type": "integer", "minimum": 2}, "name": {"type": "string"}},
+        "required": ["height"],
+    }
+}
+
+BATCH_SIZES = (10, 1000, 100_000, 1_000_000)
+
+
+def validate_one_by_one(twine, items):
+    for item in items:
+        try:
+            twine.validate_input_values(item)
+        except Exception:
+            pass
+
+
+def validate_many(twine, items):
+    twine.validate_many("input_values", items)
+
+
+if __name__ == "__main__":
+    maximum_batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else BATCH_SIZES[-1]
+
+    for compiled_strands in ((), ("input_values",)):
+        twine = Twine(source=TWINE, compiled_strands=compiled_strands)
+        twine.warm()
+        print(f"Compiled strands: {compiled_strands}")
+
+        for batch_size in (size for size in BATCH_SIZES if size <= maximum_batch_size):
+            # One in every hundred items is invalid.
+            items = [{"height": 1 if i % 100 == 0 else i + 2, "name": "item"} for i in range(batch_size)]
+
+            for function in (validate_one_by_one, validate_many):
+                start = time.perf_counter()
+                function(twine, items)
+                duration = time.perf_counter() - start
+                print(f"  {function.__name__} ({batch_size} items): {duration / batch_size * 1e6:.2f} µs per item")
@@ -48,6 +48,20 @@ VALID_SCHEMA_TWINE = """
     }
 """
 
+MONITOR_MESSAGE_TWINE = """
+    {
+        "monitor_message_schema": {
+            "type": "object",
+            "properties": {
+                "my_property": {
+                    "type": "number"
+                }
+            },
+            "required": ["my_property"]
+        }
+    }
+"""
+
 
 class BaseTestCase(unittest.TestCase):
     """Base test case for twined:
@@ -0,0 +1,185 @@
+import itertools
+
+from jsonschema.validators import Draft4Validator, Draft7Validator, Draft202012Validator
+import numpy as np
+
+from twined import Twine, exceptions
+from twined.arrays import contains_numpy_objects, get_array_validator_class
+from twined.compiler import CompiledValidator
+
+from .base import BaseTestCase
+
+OUTPUT_VALUES_TWINE = {
+    "output_values_schema": {
+        "type": "object",
+        "properties": {
+            "wind_speeds": {
+                "type": "array",
+                "minItems": 2,
+                "items": {"type": "number", "minimum": 0, "maximum": 100},
+            },
+            "grid": {
+                "type": "array",
+                "items": {
+                    "type": "array",
+                    "minItems": 3,
+                    "maxItems": 3,
+                    "items": {"type": "integer", "exclusiveMinimum": -1},
+                },
+            },
+            "labels": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}},
+        },
+    }
+}
+
+
+def _get_errors(validator, instance):
+    """Get the messages, paths and instances of the validation errors for an instance, sorted.
+
+    :param jsonschema.protocols.Validator validator:
+    :param any instance:
+    :return list(tuple):
+    """
+    return sorted(
+        (error.message, list(error.absolute_path), repr(error.instance)) for error in validator.iter_errors(instance)
+    )
+
+
+class TestArrays(BaseTestCase):
+    def test_valid_arrays(self):
+        """Test that valid numpy arrays of different shapes and types are accepted by values strands, compiled or
+        not.
+        """
+        values = {
+            "wind_speeds": np.linspace(0, 100, 5, dtype=np.float32),
+            "grid": np.arange(9).reshape(3, 3),
+            "labels": np.array(["a", "b"]),
+        }
+
+        for compiled_strands in ((), ("output_values",)):
+            with self.subTest(compiled_strands=compiled_strands):
+                twine = Twine(source=OUTPUT_VALUES_TWINE, compiled_strands=compiled_strands)
+                twine.validate_output_values(values)
+                self.assertTrue(twine._get_validator("output_values").is_valid(values))
+
+    def test_invalid_arrays_raise_same_errors_as_lists(self):
+        """Test that invalid numpy arrays produce the same errors as the equivalent lists, compiled or not."""
+        list_twine = Twine(source=OUTPUT_VALUES_TWINE)
+
+        for compiled_strands in ((), ("output_values",)):
+            twine = Twine(source=OUTPUT_VALUES_TWINE, compiled_strands=compiled_strands)
+            self.assertEqual(
+                isinstance(twine._get_validator("output_values"), CompiledValidator), bool(compiled_strands)
+            )
+
+            for values in (
+                {"wind_speeds": np.array([1.0, 100.5, -3])},
+                {"wind_speeds": np.array([1, 200], dtype=np.uint8)},
+                {"wind_speeds": np.array([np.nan, -np.inf])},
+                {"grid": np.ones((2, 4))},
+                {"grid": np.array([[0, 1, 2.5], [-1, 0, 1]])},
+                {"labels": np.array(["a", "c"])},
+            ):
+                with self.subTest(compiled_strands=compiled_strands, values=values):
+                    self.assertFalse(twine._get_validator("output_values").is_valid(values))
+
+                    with self.assertRaises(exceptions.InvalidValuesContents) as context:
+                        twine.validate_output_values(values)
+
+                    with self.assertRaises(exceptions.InvalidValuesContents) as list_context:
+                        list_twine.validate_output_values({key: value.tolist() for key, value in values.items()})
+
+                    self.assertEqual(context.exception.args, list_context.exception.args)
+
+    def test_errors_for_whole_arrays_show_arrays(self):
+        """Test that errors for whole arrays (rather than their items) show the arrays as numpy summarises them, so
+        errors for large arrays stay readable.
+        """
+        twine = Twine(source=OUTPUT_VALUES_TWINE)
+        wind_speeds = np.zeros((1, 10000))
+
+        with self.assertRaises(exceptions.InvalidValuesContents) as context:
+            twine.validate_output_values({"wind_speeds": wind_speeds})
+
+        self.assertIn(f"{wind_speeds!r} is too short", context.exception.args[0])
+        self.assertIn("...", repr(wind_speeds))
+
+    def test_errors_match_jsonschema(self):
+        """Test that the errors for many combinations of arrays and item schemas are the same as those for the
+        equivalent lists, whether the items are checked vectorised or not.
+        """
+        arrays = [
+            np.array([0, 1, 2, 3]),
+            np.array([-(2**62), 2**62]),
+            np.array([0, 2**64 - 1], dtype=np.uint64),
+            np.array([0.5, 1.0, 2.0, np.nan, np.inf, -np.inf]),
+            np.array([0.1, 0.2, 1e10], dtype=np.float32),
+            np.array([True, False]),
+            np.array(["a", "b"]),
+            np.arange(12).reshape(2, 3, 2),
+            np.zeros((2, 0)),
+            np.zeros(0),
+        ]
+
+        item_schemas = [
+            {},
+            {"type": "number"},
+            {"type": "integer"},
+            {"type": ["integer", "string"]},
+            {"type": "boolean"},
+            {"type": "array", "minItems": 3, "items": {"type": "array", "items": {"maximum": 5}}},
+            {"type": "array", "maxItems": 2},
+            {"minimum": 0.5, "exclusiveMaximum": 2},
+            {"minimum": 1, "maximum": 2.5, "title": "Things"},
+            {"exclusiveMinimum": 0.1, "maximum": 2**63},
+            {"exclusiveMinimum": 2**53 + 1},
+            {"maximum": 1e300},
+            {"minimum": 1, "multipleOf": 2},
+        ]
+
+        for validator_class in (Draft7Validator, Draft202012Validator):
+            array_validator_class = get_array_validator_class(validator_class)
+
+            for array, item_schema in itertools.product(arrays, item_schemas):
+                schema = {"type": "array", "items": item_schema}
+
+                with self.subTest(validator_class=validator_class, array=array, schema=schema):
+                    self.assertEqual(
+                        _get_errors(array_validator_class(schema), array),
+                        _get_errors(validator_class(schema), array.tolist()),
+                    )
+
+    def test_draft_4_boolean_exclusive_minimum(self):
+        """Test that the boolean `exclusiveMinimum` of draft 4 is respected."""
+        validator = get_array_validator_class(Draft4Validator)({"items": {"minimum": 1, "exclusiveMinimum": True}})
+        self.assertTrue(validator.is_valid(np.array([1.5, 2])))
+        self.assertFalse(validator.is_valid(np.array([1, 2])))
+
+    def test_whole_array_keywords(self):
+        """Test that keywords comparing whole instances treat arrays as lists."""
+        validator = get_array_validator_class(Draft202012Validator)(
+            {"properties": {"a": {"uniqueItems": True}, "b": {"const": [1, 2]}, "c": {"enum": [[[1], [2]]]}}}
+        )
+
+        self.assertTrue(validator.is_valid({"a": np.array([1, 2]), "b": np.array([1, 2]), "c": np.array([[1], [2]])}))
+        self.assertFalse(validator.is_valid({"a": np.array([1, 1])}))
+        self.assertFalse(validator.is_valid({"b": np.array([1, 3])}))
+        self.assertFalse(validator.is_valid({"c": np.array([1, 2])}))
+
+    def test_numpy_scalars(self):
+        """Test that numpy scalars are validated as the JSON numbers and booleans they represent."""
+        validator = get_array_validator_class(Draft202012Validator)(
+            {"properties": {"a": {"type": "integer"}, "b": {"type": "boolean"}, "c": {"type": "number", "minimum": 0}}}
+        )
+
+        self.assertTrue(validator.is_valid({"a": np.int8(1), "b": np.bool_(True), "c": np.float32(0.5)}))
+        self.assertTrue(validator.is_valid({"a": np.float32(2.0)}))
+        self.assertFalse(validator.is_valid({"a": np.float32(2.5)}))
+        self.assertFalse(validator.is_valid({"b": np.int64(1)}))
+        self.assertFalse(validator.is_valid({"c": np.float32(-0.5)}))
+
+    def test_contains_numpy_objects(self):
+        """Test that numpy arrays and scalars are found in nested instances."""
+        self.assertTrue(contains_numpy_objects({"a": [1, {"b": np.zeros(2)}]}))
+        self.assertTrue(contains_numpy_objects([np.float32(1)]))
+        self.assertFalse(contains_numpy_objects({"a": [1, {"b": [0.0, 1.0]}]}))
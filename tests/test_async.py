@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import unittest
+from unittest import mock
+
+from twined import Twine, exceptions
+
+from .base import VALID_SCHEMA_TWINE, BaseTestCase
+
+MANIFEST_TWINE = {"input_manifest": {"datasets": {"met_mast_data": {}}}}
+
+
+def create_large_manifest(number_of_files):
+    """Create a manifest containing one dataset with the given number of files.
+
+    :param int number_of_files:
+    :return dict:
+    """
+    files = [
+        {"id": str(i), "path": f"gs://bucket/dataset/file_{i}.csv", "tags": {"index": i}, "labels": ["csv"]}
+        for i in range(number_of_files)
+    ]
+
+    return {
+        "id": "manifest-id",
+        "datasets": {
+            "met_mast_data": {"id": "dataset-id", "name": "met_mast_data", "tags": {}, "labels": [], "files": files}
+        },
+    }
+
+
+class TestAsyncValidation(BaseTestCase):
+    def test_avalidate_strand(self):
+        """Test that strands can be validated with the `avalidate_<strand>` coroutines."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        async def validate():
+            self.assertEqual(await twine.avalidate_input_values({"height": 3}), {"height": 3})
+
+            with self.assertRaises(exceptions.InvalidValuesContents):
+                await twine.avalidate_input_values({"height": 1})
+
+        asyncio.run(validate())
+
+    def test_avalidate(self):
+        """Test that several strands can be validated at once with `avalidate`."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        validated = asyncio.run(
+            twine.avalidate(input_values={"height": 3}, configuration_values='{"n_iterations": 2}', output_values={})
+        )
+
+        self.assertEqual(
+            validated,
+            {"input_values": {"height": 3}, "configuration_values": {"n_iterations": 2}, "output_values": {}},
+        )
+
+    def test_parallel_avalidate_does_not_use_twine_executor_for_strands(self):
+        """Test that validating strands in parallel with `avalidate` doesn't submit the strands to the twine's executor,
+        which `validate` is already running in - with a bounded executor (e.g. one with a single worker), the strands
+        would wait forever for `validate` to free up a worker.
+        """
+
+        class CountingExecutor(ThreadPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.submissions = 0
+
+            def submit(self, *args, **kwargs):
+                self.submissions += 1
+                return super().submit(*args, **kwargs)
+
+        executor = CountingExecutor(max_workers=4)
+        self.addCleanup(executor.shutdown)
+        twine = Twine(source=VALID_SCHEMA_TWINE, executor=executor)
+
+        validated = asyncio.run(
+            twine.avalidate(
+                parallel=True,
+                input_values={"height": 3},
+                configuration_values='{"n_iterations": 2}',
+                output_values={},
+            )
+        )
+
+        self.assertEqual(validated["input_values"], {"height": 3})
+        self.assertEqual(executor.submissions, 1)
+
+    def test_validation_runs_in_given_executor(self):
+        """Test that validation runs in the executor given to the twine or to the coroutine."""
+        thread_names = []
+
+        def validate_input_values(source, **kwargs):
+            thread_names.append(threading.current_thread().name)
+
+        with ThreadPoolExecutor(thread_name_prefix="twine-executor") as twine_executor:
+            with ThreadPoolExecutor(thread_name_prefix="call-executor") as call_executor:
+                twine = Twine(source=VALID_SCHEMA_TWINE, executor=twine_executor)
+
+                async def validate():
+                    with mock.patch.object(twine, "validate_input_values", validate_input_values):
+                        await twine.avalidate_input_values({"height": 3})
+                        await twine.avalidate_input_values({"height": 3}, executor=call_executor)
+
+                asyncio.run(validate())
+
+        self.assertTrue(thread_names[0].startswith("twine-executor"))
+        self.assertTrue(thread_names[1].startswith("call-executor"))
+
+    def test_cancellation(self):
+        """Test that cancelling validation that hasn't started yet stops it from running."""
+        twine = Twine(source=MANIFEST_TWINE)
+        started = threading.Event()
+        release = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+
+            async def validate():
+                # Occupy the executor's only worker so the validation is queued.
+                blocker = asyncio.get_running_loop().run_in_executor(executor, release.wait)
+                task = asyncio.create_task(twine.avalidate_input_manifest(create_large_manifest(1), executor=executor))
+                await asyncio.sleep(0.01)
+                task.cancel()
+
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+                release.set()
+                await blocker
+
+            with mock.patch.object(twine, "validate_input_manifest", side_effect=lambda *args, **kwargs: started.set()):
+                asyncio.run(validate())
+
+        self.assertFalse(started.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import gzip
+import json
+import os
+from tempfile import TemporaryDirectory
+import unittest
+from unittest import mock
+
+from jsonschema.exceptions import SchemaError
+
+from twined import Twine, bulk, exceptions
+from twined.bulk import validate_files
+
+from .base import VALID_SCHEMA_TWINE, BaseTestCase
+
+
+class TestBulkValidation(BaseTestCase):
+    def _write_values(self, directory, number_of_files):
+        """Write input values files to a directory, every third of which is invalid.
+
+        :param str directory:
+        :param int number_of_files:
+        :return dict(str, bool): the path of each file mapped to whether it's valid
+        """
+        paths = {}
+
+        for i in range(number_of_files):
+            path = os.path.join(directory, f"values_{i}.json")
+
+            with open(path, "w") as f:
+                json.dump({"height": 1 if i % 3 == 0 else 3}, f)
+
+            paths[path] = i % 3 != 0
+
+        return paths
+
+    def test_validate_files(self):
+        """Test that each file is validated once, with the error raised by validating it, for various chunk sizes."""
+        with TemporaryDirectory() as temporary_directory:
+            paths = self._write_values(temporary_directory, 10)
+
+            for chunksize in (1, 3, 100):
+                with self.subTest(chunksize=chunksize):
+                    results = list(
+                        validate_files(VALID_SCHEMA_TWINE, "input_values", paths, max_workers=2, chunksize=chunksize)
+                    )
+
+                    self.assertEqual(sorted(result.path for result in results), sorted(paths))
+
+                    for result in results:
+                        if paths[result.path]:
+                            self.assertIsNone(result.error)
+                        else:
+                            self.assertIsInstance(result.error, exceptions.InvalidValuesContents)
+
+    def test_directories_are_searched_for_files(self):
+        """Test that directories are searched recursively for files with the given suffix."""
+        with TemporaryDirectory() as temporary_directory:
+            subdirectory = os.path.join(temporary_directory, "subdirectory")
+            os.mkdir(subdirectory)
+            paths = {**self._write_values(temporary_directory, 2), **self._write_values(subdirectory, 2)}
+
+            with open(os.path.join(temporary_directory, "notes.txt"), "w") as f:
+                f.write("Not a values file.")
+
+            results = list(validate_files(VALID_SCHEMA_TWINE, "input_values", [temporary_directory], max_workers=1))
+
+        self.assertEqual(sorted(result.path for result in results), sorted(paths))
+
+    def test_invalid_json_and_missing_files_are_reported(self):
+        """Test that files that aren't valid JSON or don't exist are reported rather than stopping the validation."""
+        with TemporaryDirectory() as temporary_directory:
+            invalid_json_path = os.path.join(temporary_directory, "invalid.json")
+
+            with open(invalid_json_path, "w") as f:
+                f.write("{")
+
+            missing_path = os.path.join(temporary_directory, "missing.json")
+
+            results = dict(
+                validate_files(VALID_SCHEMA_TWINE, "input_values", [invalid_json_path, missing_path], max_workers=1)
+            )
+
+        self.assertIsInstance(results[invalid_json_path], exceptions.InvalidValuesJson)
+        self.assertIsInstance(results[missing_path], exceptions.InputValuesFileNotFound)
+
+    def test_unreadable_files_are_reported(self):
+        """Test that truncated compressed files, files that aren't valid UTF-8 and files that can't be opened are
+        reported rather than stopping the validation.
+        """
+        with TemporaryDirectory() as temporary_directory:
+            truncated_path = os.path.join(temporary_directory, "truncated.json.gz")
+
+            with open(truncated_path, "wb") as f:
+                f.write(gzip.compress(b'{"height": 3}')[:-10])
+
+            invalid_utf8_path = os.path.join(temporary_directory, "invalid_utf8.json")
+
+            with open(invalid_utf8_path, "wb") as f:
+                f.write(b'{"height": "\xff"}')
+
+            valid_paths = list(self._write_values(temporary_directory, 2))
+
+            results = dict(
+                validate_files(
+                    VALID_SCHEMA_TWINE,
+                    "input_values",
+                    [truncated_path, invalid_utf8_path, valid_paths[1]],
+                    max_workers=1,
+                )
+            )
+
+            self.assertIsInstance(results[truncated_path], exceptions.InvalidValuesJson)
+            self.assertIsInstance(results[invalid_utf8_path], exceptions.InvalidValuesJson)
+            self.assertIsNone(results[valid_paths[1]])
+
+        # Errors raised opening files can't be caused portably (e.g. permissions don't stop root reading files), so
+        # they're raised by the worker's twine instead.
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        for error in (PermissionError("Permission denied"), IsADirectoryError("Is a directory"), EOFError()):
+            with self.subTest(error=error):
+                with mock.patch.object(bulk, "_worker_twine", twine):
+                    with mock.patch.object(twine, "validate_input_values", side_effect=[error, None]):
+                        results = bulk._validate_chunk("input_values", valid_paths)
+
+                self.assertEqual(results, [(valid_paths[0], error), (valid_paths[1], None)])
+
+    def test_credentials_cannot_be_validated(self):
+        """Test that credentials and unknown strands can't be validated from files."""
+        for strand in ("credentials", "not_a_strand"):
+            with self.subTest(strand=strand):
+                with self.assertRaises(exceptions.UnknownStrand):
+                    list(validate_files(VALID_SCHEMA_TWINE, strand, []))
+
+    def test_invalid_twines_raise_their_own_errors(self):
+        """Test that an invalid twine or strand schema raises its own error rather than breaking the worker
+        processes.
+        """
+        for twine_source, expected_exception in (
+            ('{"input_values_schema": 1}', exceptions.InvalidTwine),
+            ({"input_values_schema": {"type": "not-a-type"}}, SchemaError),
+        ):
+            with self.subTest(twine_source=twine_source):
+                with self.assertRaises(expected_exception):
+                    list(validate_files(twine_source, "input_values", [], max_workers=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
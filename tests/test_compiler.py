@@ -0,0 +1,360 @@
+import decimal
+import itertools
+import json
+import os
+import stat
+from tempfile import TemporaryDirectory
+import time
+import unittest
+from unittest import mock
+
+from jsonschema.validators import Draft4Validator, Draft7Validator, Draft202012Validator
+
+from twined import Twine, exceptions
+from twined.compiler import STALE_DIRECTORY_AGE, CompiledValidator, CompilerCache, compile_validator
+from twined.schema import BUNDLED_SCHEMAS, load_bundled_schema
+
+from .base import MONITOR_MESSAGE_TWINE, VALID_SCHEMA_TWINE, BaseTestCase
+
+PRIMITIVES = [
+    None,
+    True,
+    False,
+    0,
+    1,
+    2,
+    3,
+    -1,
+    10,
+    11,
+    1.5,
+    4.0,
+    1e10,
+    float("inf"),
+    "",
+    "x",
+    "abc",
+    "xyz",
+    "PuBu",
+    "png",
+    [],
+    [1],
+    ["x", "xy"],
+    [1, 2, 3, 4],
+    [1.5, "a"],
+    {},
+    {"a": 1},
+]
+
+HANDWRITTEN_SCHEMAS = [
+    True,
+    False,
+    {},
+    {"type": ["integer", "null"]},
+    {"type": "number", "exclusiveMinimum": 1, "exclusiveMaximum": 10, "multipleOf": 2},
+    {"minimum": 2, "maximum": 3},
+    {"type": "string", "minLength": 1, "maxLength": 3, "pattern": "^x"},
+    {"enum": [1, "x", None, [1], {"a": 1}]},
+    {"enum": [True]},
+    {"const": 1},
+    {"const": False},
+    {"type": "array", "items": {"type": "integer", "minimum": 1}, "minItems": 1, "maxItems": 3},
+    {"items": {"type": "string"}},
+    {"items": True},
+    {
+        "type": "object",
+        "properties": {"a": {"type": "integer"}, "b": False, "c": True},
+        "required": ["a"],
+        "additionalProperties": False,
+    },
+    {"properties": {"a": {"type": "number"}}, "additionalProperties": {"type": "string"}, "minProperties": 1},
+    {"additionalProperties": {"type": "integer"}, "maxProperties": 1},
+    {"type": "object", "properties": {"a": {"type": "object", "properties": {"b": {"type": "array"}}}}},
+    {"type": "string", "format": "date-time", "title": "A title", "x-unknown-keyword": 1},
+]
+
+
+def get_test_schemas():
+    """Get the strand schemas used in the tests and twined's examples, along with the handwritten schemas above.
+
+    :return list(dict|bool):
+    """
+    schemas = list(HANDWRITTEN_SCHEMAS)
+    twines = [
+        json.loads(VALID_SCHEMA_TWINE),
+        json.loads(MONITOR_MESSAGE_TWINE),
+    ]
+    apps_path = os.path.join(os.path.dirname(__file__), "data", "apps")
+
+    for app in os.listdir(apps_path):
+        with open(os.path.join(apps_path, app, "twine.json")) as f:
+            twines.append(json.load(f))
+
+    for twine in twines:
+        for name, strand in twine.items():
+            if name.endswith("_schema"):
+                schemas.append(strand)
+                schemas.extend(strand.get("properties", {}).values())
+
+    return schemas
+
+
+def generate_instances(schema):
+    """Generate instances to validate against a schema: a pool of JSON primitives, objects with each of the schema's
+    properties set to each primitive, and objects with all the schema's properties set to each primitive.
+
+    :param dict|bool schema:
+    :return iter(any):
+    """
+    yield from PRIMITIVES
+
+    if not isinstance(schema, dict):
+        return
+
+    names = [*schema.get("properties", {}), *schema.get("required", []), "an_extra_property"]
+
+    for name, value in itertools.product(names, PRIMITIVES):
+        yield {name: value}
+
+    for value in PRIMITIVES:
+        yield {name: value for name in names}
+        yield {name: value for name in names if name != "an_extra_property"}
+
+
+class TestCompiler(BaseTestCase):
+    def test_conformance(self):
+        """Test that compiled validators agree with `jsonschema` on the validity of a variety of instances against the
+        schemas used in the tests and examples.
+        """
+        for schema in get_test_schemas():
+            validator = Draft202012Validator(schema)
+
+            try:
+                compiled_validator = compile_validator(validator)
+            except exceptions.UnsupportedSchema:
+                continue
+
+            for instance in generate_instances(schema):
+                with self.subTest(schema=schema, instance=instance):
+                    self.assertEqual(compiled_validator.is_valid(instance), validator.is_valid(instance))
+
+    def test_errors_are_produced_by_jsonschema(self):
+        """Test that the errors from a compiled validator are the same as those from `jsonschema`."""
+        schema = {"type": "object", "properties": {"a": {"type": "integer", "minimum": 2}}, "required": ["a"]}
+        validator = Draft202012Validator(schema)
+        compiled_validator = compile_validator(validator)
+
+        for instance in ({"a": 1}, {}, []):
+            with self.subTest(instance=instance):
+                self.assertEqual(
+                    [error.message for error in compiled_validator.iter_errors(instance)],
+                    [error.message for error in validator.iter_errors(instance)],
+                )
+
+        self.assertEqual(list(compiled_validator.iter_errors({"a": 2})), [])
+
+    def test_non_finite_limits(self):
+        """Test that limits without a Python literal (the `Infinity` and `NaN` accepted by the standard library's JSON
+        decoder) are compiled and survive the compiler cache.
+        """
+        schema = json.loads('{"type": "number", "maximum": Infinity, "exclusiveMinimum": -Infinity, "minimum": NaN}')
+        validator = Draft202012Validator(schema)
+        compiled_validator = compile_validator(validator)
+
+        with TemporaryDirectory() as temporary_directory:
+            cache = CompilerCache(temporary_directory)
+            cache.save(compiled_validator)
+            loaded_validator = cache.load(validator)
+
+        for instance in (1, 2.5, 1e308, -1e308, "a"):
+            with self.subTest(instance=instance):
+                self.assertEqual(compiled_validator.is_valid(instance), validator.is_valid(instance))
+                self.assertEqual(loaded_validator.is_valid(instance), validator.is_valid(instance))
+
+    def test_unsupported_schemas(self):
+        """Test that schemas using unsupported keywords or drafts can't be compiled."""
+        for validator in (
+            Draft202012Validator({"properties": {"a": {"$ref": "#/$defs/a"}}, "$defs": {"a": {}}}),
+            Draft202012Validator({"anyOf": [{"type": "string"}, {"type": "integer"}]}),
+            Draft202012Validator({"type": "number", "multipleOf": 0.1}),
+            Draft202012Validator({"type": "number", "minimum": decimal.Decimal("1.5")}),
+            Draft202012Validator(
+                {"type": "string", "format": "date-time"}, format_checker=Draft202012Validator.FORMAT_CHECKER
+            ),
+            Draft7Validator({"items": [{"type": "number"}]}),
+            Draft4Validator({"type": "integer"}),
+            *(Draft202012Validator(load_bundled_schema(filename)) for filename in BUNDLED_SCHEMAS.values()),
+        ):
+            with self.subTest(schema=validator.schema):
+                with self.assertRaises(exceptions.UnsupportedSchema):
+                    compile_validator(validator)
+
+    def test_compiled_strands(self):
+        """Test that a twine validates the strands it's told to compile with compiled validators, raising the same
+        errors as when they're not compiled.
+        """
+        twine = Twine(source=VALID_SCHEMA_TWINE, compiled_strands=("input_values",))
+        uncompiled_twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        twine.validate_input_values({"height": 3})
+        self.assertIsInstance(twine._get_validator("input_values"), CompiledValidator)
+        self.assertNotIsInstance(twine._get_validator("configuration_values"), CompiledValidator)
+
+        with self.assertRaises(exceptions.InvalidValuesContents) as context:
+            twine.validate_input_values({"height": 1})
+
+        with self.assertRaises(exceptions.InvalidValuesContents) as uncompiled_context:
+            uncompiled_twine.validate_input_values({"height": 1})
+
+        self.assertEqual(context.exception.args, uncompiled_context.exception.args)
+
+    def test_compiled_strands_with_unsupported_schema_fall_back_to_jsonschema(self):
+        """Test that strands whose schemas can't be compiled are validated by `jsonschema`."""
+        twine = Twine(
+            source={"input_values_schema": {"anyOf": [{"type": "array"}, {"type": "integer"}]}},
+            compiled_strands=("input_values",),
+        )
+
+        twine.validate_input_values([])
+        self.assertNotIsInstance(twine._get_validator("input_values"), CompiledValidator)
+
+        with self.assertRaises(exceptions.InvalidValuesContents):
+            twine.validate_input_values(1.5)
+
+
+class TestCompilerCache(BaseTestCase):
+    SCHEMA = {
+        "type": "object",
+        "properties": {"a": {"type": "string", "pattern": "^x"}, "b": {"enum": [1, 2]}},
+        "additionalProperties": False,
+    }
+
+    def test_compiled_validators_are_loaded_from_cache(self):
+        """Test that compiled validators saved to the cache are loaded from it and work the same as the originals."""
+        validator = Draft202012Validator(self.SCHEMA)
+        compiled_validator = compile_validator(validator)
+
+        with TemporaryDirectory() as temporary_directory:
+            cache = CompilerCache(temporary_directory)
+            self.assertIsNone(cache.load(validator))
+            cache.save(compiled_validator)
+            loaded_validator = CompilerCache(temporary_directory).load(Draft202012Validator(self.SCHEMA))
+
+            # No temporary files are left behind.
+            self.assertEqual(
+                [os.path.splitext(name)[1] for name in os.listdir(cache.versioned_directory)],
+                [".json"],
+            )
+
+        self.assertEqual(loaded_validator.source, compiled_validator.source)
+
+        for instance in ({"a": "xy", "b": 1}, {"a": "y"}, {"b": 3}, {"c": 1}, []):
+            with self.subTest(instance=instance):
+                self.assertEqual(loaded_validator.is_valid(instance), validator.is_valid(instance))
+
+    def test_entries_for_other_schemas_are_not_loaded(self):
+        """Test that entries are only loaded for the schema and kind of validator they were compiled from."""
+        with TemporaryDirectory() as temporary_directory:
+            cache = CompilerCache(temporary_directory)
+            cache.save(compile_validator(Draft202012Validator(self.SCHEMA)))
+            self.assertIsNone(cache.load(Draft202012Validator({**self.SCHEMA, "required": ["a"]})))
+            self.assertIsNone(cache.load(Draft7Validator(self.SCHEMA)))
+
+    def test_corrupt_entries_are_ignored(self):
+        """Test that corrupt cache entries are ignored."""
+        validator = Draft202012Validator(self.SCHEMA)
+
+        with TemporaryDirectory() as temporary_directory:
+            cache = CompilerCache(temporary_directory)
+            cache.save(compile_validator(validator))
+
+            with open(cache._get_path(validator), "w") as f:
+                f.write("{")
+
+            with self.assertLogs(level="WARNING"):
+                self.assertIsNone(cache.load(validator))
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "Cache ownership and permissions are only checked on POSIX platforms.")
+    def test_untrusted_entries_are_not_loaded(self):
+        """Test that entries aren't loaded if they or the cache directories are writable by other users or owned by
+        another user, and that the directories are created so they're only writable by the current user.
+        """
+        validator = Draft202012Validator(self.SCHEMA)
+
+        with TemporaryDirectory() as temporary_directory:
+            cache = CompilerCache(os.path.join(temporary_directory, "cache"))
+            cache.save(compile_validator(validator))
+
+            for path in (cache.directory, cache.versioned_directory):
+                with self.subTest(path=path):
+                    self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o700)
+
+            self.assertIsNotNone(cache.load(validator))
+
+            for path in (cache.directory, cache.versioned_directory, cache._get_path(validator)):
+                for mode in (0o770, 0o707):
+                    with self.subTest(path=path, mode=oct(mode)):
+                        original_mode = os.stat(path).st_mode
+                        os.chmod(path, original_mode | mode)
+
+                        try:
+                            with self.assertLogs(level="WARNING"):
+                                self.assertIsNone(cache.load(validator))
+                        finally:
+                            os.chmod(path, original_mode)
+
+            with mock.patch("os.getuid", return_value=os.getuid() + 1):
+                with self.assertLogs(level="WARNING"):
+                    self.assertIsNone(cache.load(validator))
+
+            self.assertIsNotNone(cache.load(validator))
+
+    def test_stale_entries_for_other_versions_are_removed(self):
+        """Test that entries for other versions of twined and jsonschema are removed when the cache is written to if
+        they haven't been written to for a while, and kept otherwise so different versions can share the cache.
+        """
+        with TemporaryDirectory() as temporary_directory:
+            stale_directory = os.path.join(temporary_directory, "twined-0.0.1_jsonschema-4.0.0")
+            recent_directory = os.path.join(temporary_directory, "twined-0.0.2_jsonschema-4.0.0")
+            os.makedirs(stale_directory)
+            os.makedirs(recent_directory)
+
+            stale_time = time.time() - STALE_DIRECTORY_AGE - 60
+            os.utime(stale_directory, (stale_time, stale_time))
+
+            CompilerCache(temporary_directory).save(compile_validator(Draft202012Validator(self.SCHEMA)))
+            self.assertFalse(os.path.exists(stale_directory))
+            self.assertTrue(os.path.exists(recent_directory))
+
+    def test_twine_uses_compiler_cache(self):
+        """Test that twines given a compiler cache directory save their compiled validators to it and that other twines
+        load them from it without checking or compiling the schemas again.
+        """
+        source = {"input_values_schema": self.SCHEMA}
+
+        with TemporaryDirectory() as temporary_directory:
+            twine = Twine(
+                source=source, compiled_strands=("input_values",), compiler_cache_directory=temporary_directory
+            )
+            twine.validate_input_values({"a": "x"})
+
+            other_twine = Twine(
+                source=source,
+                compiled_strands=("input_values",),
+                compiler_cache_directory=temporary_directory,
+            )
+
+            with mock.patch("twined.twine.compile_validator") as mock_compile_validator:
+                with mock.patch.object(Draft202012Validator, "check_schema") as mock_check_schema:
+                    other_twine.validate_input_values({"a": "x"})
+
+                    with self.assertRaises(exceptions.InvalidValuesContents):
+                        other_twine.validate_input_values({"a": "y"})
+
+        mock_compile_validator.assert_not_called()
+        mock_check_schema.assert_not_called()
+        self.assertIsInstance(other_twine._get_validator("input_values"), CompiledValidator)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import unittest
+
+import twined
+from twined import twine
+
+from .base import BaseTestCase
+
+
+class TestImports(BaseTestCase):
+    def _import_in_fresh_interpreter(self, statement):
+        """Run the given import statement in a fresh interpreter with `-X importtime`.
+
+        :param str statement:
+        :return dict(str, int): the cumulative import time in microseconds of each module imported, keyed on module name
+        """
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        import_times = {}
+
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+
+            _, cumulative, name = line.split("|")
+            import_times[name.strip()] = int(cumulative)
+
+        return import_times
+
+    def test_import_twined_does_not_import_heavy_dependencies(self):
+        """Test that importing twined and its utilities doesn't import its heavy dependencies. The time the import takes
+        is measured by `benchmarks/import_time.py` rather than here as it depends on the machine.
+        """
+        import_times = self._import_in_fresh_interpreter("import twined; twined.utils.TwinedEncoder")
+        self.assertIn("twined", import_times)
+
+        for module in ("jsonschema", "referencing", "dotenv", "twined.twine"):
+            with self.subTest(module=module):
+                self.assertNotIn(module, import_times)
+
+    def test_dotenv_is_not_imported_with_twine(self):
+        """Test that importing the `Twine` class doesn't import `dotenv`."""
+        import_times = self._import_in_fresh_interpreter("from twined import Twine")
+        self.assertIn("twined.twine", import_times)
+        self.assertNotIn("dotenv", import_times)
+
+    def test_lazy_attributes(self):
+        """Test that lazily imported attributes and submodules are available from the package."""
+        self.assertIs(twined.Twine, twine.Twine)
+        self.assertIs(twined.ALL_STRANDS, twine.ALL_STRANDS)
+        self.assertIn("Twine", dir(twined))
+
+        with self.assertRaises(AttributeError):
+            twined.not_an_attribute
+
+
+if __name__ == "__main__":
+    unittest.main()
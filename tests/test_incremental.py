@@ -0,0 +1,187 @@
+import unittest
+from unittest import mock
+
+from twined import Twine, exceptions
+from twined.incremental import IncrementalValidator
+
+from .base import BaseTestCase
+
+TWINE = {
+    "configuration_values_schema": {
+        "type": "object",
+        "properties": {
+            "n_iterations": {"type": "integer", "minimum": 1},
+            "name": {"type": "string"},
+            "tags": {"type": "array", "items": {"type": "string"}, "maxItems": 3},
+            "options": {
+                "type": "object",
+                "properties": {"colour": {"enum": ["red", "blue"]}},
+                "additionalProperties": False,
+            },
+        },
+        "required": ["n_iterations"],
+    }
+}
+
+DOCUMENT = {"n_iterations": 3, "name": "run", "tags": ["a", "b"], "options": {"colour": "red"}}
+
+
+class TestIncrementalValidator(BaseTestCase):
+    def _create_validator(self, twine_source=TWINE, document=DOCUMENT):
+        validator = IncrementalValidator(Twine(source=twine_source), "configuration_values")
+        validator.validate(document)
+        return validator
+
+    def test_update(self):
+        """Test that changed documents are validated and remembered."""
+        validator = self._create_validator()
+        document = {**DOCUMENT, "n_iterations": 4}
+
+        self.assertEqual(validator.update(document), document)
+        self.assertIs(validator.document, document)
+
+        for invalid_document in (
+            {**DOCUMENT, "n_iterations": 0},
+            {**DOCUMENT, "tags": ["a", "b", "c", "d"]},
+            {**DOCUMENT, "options": {"colour": "green"}},
+            {**DOCUMENT, "options": {"colour": "red", "size": 1}},
+            {"name": "run"},
+        ):
+            with self.subTest(document=invalid_document):
+                with self.assertRaises(exceptions.InvalidValuesContents):
+                    validator.update(invalid_document)
+
+                self.assertIs(validator.document, document)
+
+    def test_only_changed_parts_are_revalidated(self):
+        """Test that only the changed parts of a document are revalidated if they can be validated on their own."""
+        validator = self._create_validator()
+
+        with mock.patch.object(validator.twine, "_validate_against_schema") as mock_validate_against_schema:
+            validator.update({**DOCUMENT, "n_iterations": 4})
+            validator.apply_patch([{"op": "add", "path": "/tags/-", "value": "c"}])
+
+        mock_validate_against_schema.assert_not_called()
+
+    def test_errors_are_the_same_as_for_full_validation(self):
+        """Test that the errors raised for invalid documents are the same as those raised by `validate_<strand>`."""
+        validator = self._create_validator()
+        document = {**DOCUMENT, "n_iterations": 0}
+
+        with self.assertRaises(exceptions.InvalidValuesContents) as context:
+            validator.update(document)
+
+        with self.assertRaises(exceptions.InvalidValuesContents) as full_context:
+            validator.twine.validate_configuration_values(document)
+
+        self.assertEqual(context.exception.args, full_context.exception.args)
+
+    def test_cross_property_keywords_fall_back_to_full_validation(self):
+        """Test that changes below schemas with keywords relating properties to each other are validated in full."""
+        twine_source = {
+            "configuration_values_schema": {
+                "type": "object",
+                "properties": {"kind": {"type": "string"}, "size": {"type": "integer"}},
+                "if": {"properties": {"kind": {"const": "big"}}},
+                "then": {"properties": {"size": {"minimum": 10}}},
+            }
+        }
+
+        validator = self._create_validator(twine_source, {"kind": "small", "size": 1})
+        validator.update({"kind": "big", "size": 10})
+
+        # Changing only "size" would be valid against its own subschema but not against the "then" subschema.
+        with self.assertRaises(exceptions.InvalidValuesContents):
+            validator.update({"kind": "big", "size": 1})
+
+    def test_schemas_with_references_are_validated_in_full(self):
+        """Test that documents are validated in full if the schema contains references."""
+        twine_source = {
+            "configuration_values_schema": {
+                "type": "object",
+                "properties": {"size": {"$ref": "#/$defs/size"}},
+                "$defs": {"size": {"type": "integer", "minimum": 1}},
+            }
+        }
+
+        validator = self._create_validator(twine_source, {"size": 1})
+
+        with mock.patch.object(
+            validator.twine, "_validate_against_schema", wraps=validator.twine._validate_against_schema
+        ) as mock_validate_against_schema:
+            validator.update({"size": 2})
+
+            with self.assertRaises(exceptions.InvalidValuesContents):
+                validator.update({"size": 0})
+
+        self.assertEqual(mock_validate_against_schema.call_count, 2)
+
+    def test_apply_patch(self):
+        """Test that JSON patches are applied to a copy of the last valid document and the result validated."""
+        validator = self._create_validator()
+        original_document = validator.document
+
+        document = validator.apply_patch(
+            [
+                {"op": "test", "path": "/name", "value": "run"},
+                {"op": "replace", "path": "/n_iterations", "value": 5},
+                {"op": "add", "path": "/tags/0", "value": "z"},
+                {"op": "remove", "path": "/tags/2"},
+                {"op": "copy", "from": "/name", "path": "/options/colour"},
+                {"op": "replace", "path": "/options/colour", "value": "blue"},
+                {"op": "move", "from": "/name", "path": "/renamed"},
+            ]
+        )
+
+        self.assertEqual(
+            document, {"n_iterations": 5, "renamed": "run", "tags": ["z", "a"], "options": {"colour": "blue"}}
+        )
+
+        self.assertEqual(original_document, DOCUMENT)
+        self.assertIs(validator.document, document)
+
+        with self.assertRaises(exceptions.InvalidValuesContents):
+            validator.apply_patch('[{"op": "replace", "path": "/tags/1", "value": 1}]')
+
+        self.assertIs(validator.document, document)
+
+    def test_invalid_patches(self):
+        """Test that patches that are malformed or can't be applied raise an error."""
+        validator = self._create_validator()
+
+        for patch in (
+            {"op": "add"},
+            [{"op": "add", "path": "/name"}],
+            [{"op": "jump", "path": "/name"}],
+            [{"op": "remove", "path": "/missing"}],
+            [{"op": "replace", "path": "/tags/2", "value": "c"}],
+            [{"op": "replace", "path": "/tags/01", "value": "c"}],
+            [{"op": "add", "path": "/name/child", "value": 1}],
+            [{"op": "move", "from": "/options", "path": "/options/inner"}],
+            [{"op": "test", "path": "/n_iterations", "value": True}],
+            [{"op": "add", "path": "name", "value": "x"}],
+        ):
+            with self.subTest(patch=patch):
+                with self.assertRaises(exceptions.InvalidJsonPatch):
+                    validator.apply_patch(patch)
+
+        self.assertEqual(validator.document, DOCUMENT)
+
+    def test_patch_without_document(self):
+        """Test that a patch can't be applied before a document has been validated."""
+        validator = IncrementalValidator(Twine(source=TWINE), "configuration_values")
+
+        with self.assertRaises(exceptions.InvalidJsonPatch):
+            validator.apply_patch([])
+
+    def test_unsupported_strands(self):
+        """Test that only values and monitor message strands can be validated incrementally."""
+        with self.assertRaises(exceptions.UnknownStrand):
+            IncrementalValidator(Twine(source=TWINE), "input_manifest")
+
+        with self.assertRaises(exceptions.StrandNotFound):
+            IncrementalValidator(Twine(source=TWINE), "input_values")
+
+
+if __name__ == "__main__":
+    unittest.main()
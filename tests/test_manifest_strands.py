@@ -1,6 +1,13 @@
+import gzip
+import io
+import json
 import os
+from tempfile import TemporaryDirectory
+import tracemalloc
+from unittest import mock
 
 from twined import Twine, exceptions
+from twined.schema import BUNDLED_SCHEMAS, MANIFEST_SCHEMA, find_manifest_file_schema, load_bundled_schema
 
 from .base import BaseTestCase
 
@@ -313,3 +320,200 @@ class TestManifestStrands(BaseTestCase):
         """Test that not providing an optional strand doesn't result in a validation error."""
         twine = Twine(source={"output_manifest": {"datasets": {}, "optional": True}})
         twine.validate(output_manifest=None)
+
+
+class TestStreamingManifests(BaseTestCase):
+    TWINE = {"output_manifest": {"datasets": {"met_mast_data": {}, "scada_data": {"optional": True}}}}
+
+    def _create_manifest(self, number_of_files):
+        """Create a manifest whose "met_mast_data" dataset has the given number of files.
+
+        :param int number_of_files:
+        :return dict:
+        """
+        return {
+            "id": "manifest-id",
+            "datasets": {
+                "met_mast_data": {
+                    "id": "dataset-id",
+                    "name": "met_mast_data",
+                    "tags": {},
+                    "labels": [],
+                    "files": [
+                        {"id": str(i), "path": f"gs://bucket/file_{i}.csv", "tags": {"index": i}, "labels": []}
+                        for i in range(number_of_files)
+                    ],
+                },
+                "scada_data": "gs://bucket/scada_data",
+            },
+        }
+
+    def test_files_are_yielded_for_each_kind_of_source(self):
+        """Test that each file entry is yielded from manifests given as strings, files, compressed files or binary
+        streams, however the stream is split into chunks.
+        """
+        twine = Twine(source=self.TWINE)
+        manifest = self._create_manifest(5)
+        serialised_manifest = json.dumps(manifest, indent=4)
+
+        with TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "manifest.json")
+
+            with open(path, "w") as f:
+                f.write(serialised_manifest)
+
+            compressed_path = path + ".gz"
+
+            with gzip.open(compressed_path, "wt") as f:
+                f.write(serialised_manifest)
+
+            for source in (serialised_manifest, path, compressed_path, io.BytesIO(serialised_manifest.encode())):
+                for chunk_size in (1, 7, 65536):
+                    with self.subTest(source=type(source), chunk_size=chunk_size):
+                        if isinstance(source, io.BytesIO):
+                            source.seek(0)
+
+                        entries = list(twine.iter_validate_manifest("output_manifest", source, chunk_size=chunk_size))
+
+                        self.assertEqual(
+                            entries,
+                            [
+                                ("met_mast_data", i, file)
+                                for i, file in enumerate(manifest["datasets"]["met_mast_data"]["files"])
+                            ],
+                        )
+
+    def test_invalid_manifests(self):
+        """Test that invalid file entries, invalid parts of the rest of the manifest and missing datasets are reported
+        with the same exceptions as `validate_<manifest>`.
+        """
+        twine = Twine(source=self.TWINE)
+        invalid_file_manifest = self._create_manifest(3)
+        invalid_file_manifest["datasets"]["met_mast_data"]["files"][1]["path"] = 1
+        invalid_dataset_manifest = self._create_manifest(3)
+        del invalid_dataset_manifest["datasets"]["met_mast_data"]["labels"]
+        missing_dataset_manifest = self._create_manifest(3)
+        del missing_dataset_manifest["datasets"]["met_mast_data"]
+
+        for manifest in (invalid_file_manifest, invalid_dataset_manifest, missing_dataset_manifest, {"id": 1}, []):
+            with self.subTest(manifest=manifest):
+                with self.assertRaises(exceptions.InvalidManifestContents):
+                    twine.validate_output_manifest(manifest)
+
+                with self.assertRaises(exceptions.InvalidManifestContents):
+                    list(twine.iter_validate_manifest("output_manifest", json.dumps(manifest)))
+
+        with self.assertRaises(exceptions.InvalidManifestContents) as context:
+            list(twine.iter_validate_manifest("output_manifest", json.dumps(invalid_file_manifest)))
+
+        self.assertIn("On instance['datasets']['met_mast_data']['files'][1]['path']", str(context.exception))
+
+    def test_invalid_json(self):
+        """Test that manifests that aren't valid JSON (including those followed by anything other than whitespace) or
+        have duplicate keys raise an error.
+        """
+        twine = Twine(source=self.TWINE)
+        serialised_manifest = json.dumps(self._create_manifest(2))
+
+        for source in (
+            serialised_manifest[:-1],
+            serialised_manifest.replace(",", ";", 5),
+            "{",
+            serialised_manifest + " garbage {",
+            serialised_manifest + "}",
+        ):
+            with self.subTest(source=source):
+                with self.assertRaises(exceptions.InvalidManifestJson):
+                    list(twine.iter_validate_manifest("output_manifest", source))
+
+        with self.assertRaises(KeyError):
+            list(twine.iter_validate_manifest("output_manifest", '{"id": "1", "id": "2", "datasets": {}}'))
+
+        # Trailing whitespace is allowed.
+        self.assertEqual(len(list(twine.iter_validate_manifest("output_manifest", serialised_manifest + " \n"))), 2)
+
+    def test_truncated_compressed_manifest(self):
+        """Test that a truncated compressed manifest raises the same error as a manifest that isn't valid JSON."""
+        twine = Twine(source=self.TWINE, offline=True)
+
+        with TemporaryDirectory() as temporary_directory:
+            path = os.path.join(temporary_directory, "manifest.json.gz")
+
+            with open(path, "wb") as f:
+                f.write(gzip.compress(json.dumps(self._create_manifest(2)).encode())[:-10])
+
+            with self.assertRaises(exceptions.InvalidManifestJson):
+                twine.validate_output_manifest(path)
+
+            with self.assertRaises(exceptions.InvalidManifestJson):
+                list(twine.iter_validate_manifest("output_manifest", path))
+
+    def test_manifest_file_schema_is_found_structurally(self):
+        """Test that the schema of the file entries is found however the dataset schemas are combined or referenced,
+        and that no schema is found if datasets can have differently structured files.
+        """
+        manifest_schema = load_bundled_schema(BUNDLED_SCHEMAS[MANIFEST_SCHEMA])
+        dataset_options = manifest_schema["properties"]["datasets"]["patternProperties"][".+"]["oneOf"]
+        file_schema = dataset_options[1]["properties"]["files"]["items"]
+        self.assertEqual(find_manifest_file_schema(manifest_schema), file_schema)
+
+        reordered_schema = json.loads(json.dumps(manifest_schema))
+        reordered_schema["$defs"]["dataset"] = dataset_options[1]
+        reordered_schema["properties"]["datasets"] = {
+            "type": "object",
+            "additionalProperties": {"anyOf": [{"$ref": "#/$defs/dataset"}, {"type": "string"}]},
+        }
+        self.assertEqual(find_manifest_file_schema(reordered_schema), file_schema)
+
+        ambiguous_schema = json.loads(json.dumps(reordered_schema))
+        ambiguous_schema["properties"]["datasets"]["properties"] = {
+            "raw": {"properties": {"files": {"items": {"type": "string"}}}}
+        }
+        self.assertIsNone(find_manifest_file_schema(ambiguous_schema))
+        self.assertIsNone(find_manifest_file_schema({"type": "object"}))
+
+    def test_file_entries_are_validated_with_the_manifest_without_a_file_schema(self):
+        """Test that, if there's no schema for the file entries alone, the entries are still yielded and are validated
+        with the rest of the manifest at the end of the stream.
+        """
+        twine = Twine(source=self.TWINE, offline=True)
+        manifest = self._create_manifest(3)
+
+        with mock.patch("twined.twine.get_manifest_file_validator", return_value=None):
+            entries = list(twine.iter_validate_manifest("output_manifest", json.dumps(manifest)))
+            self.assertEqual([entry.file for entry in entries], manifest["datasets"]["met_mast_data"]["files"])
+
+            manifest["datasets"]["met_mast_data"]["files"][1]["path"] = 1
+
+            with self.assertRaises(exceptions.InvalidManifestContents):
+                list(twine.iter_validate_manifest("output_manifest", json.dumps(manifest)))
+
+    def test_missing_strands_and_files(self):
+        """Test that an error is raised if the manifest strand isn't in the twine or the manifest file doesn't exist."""
+        twine = Twine(source=self.TWINE)
+
+        with self.assertRaises(exceptions.UnknownStrand):
+            list(twine.iter_validate_manifest("input_values", "{}"))
+
+        with self.assertRaises(exceptions.StrandNotFound):
+            list(twine.iter_validate_manifest("input_manifest", "{}"))
+
+        with self.assertRaises(exceptions.OutputManifestFileNotFound):
+            list(twine.iter_validate_manifest("output_manifest", "non_existent.json"))
+
+    def test_memory_use_does_not_grow_with_number_of_files(self):
+        """Test that the peak memory used validating a manifest doesn't grow with the number of files in it."""
+        twine = Twine(source=self.TWINE)
+        peak_memory = {}
+
+        for number_of_files in (1000, 20000):
+            source = io.StringIO(json.dumps(self._create_manifest(number_of_files)))
+            tracemalloc.start()
+
+            for _ in twine.iter_validate_manifest("output_manifest", source):
+                pass
+
+            peak_memory[number_of_files] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self.assertLess(peak_memory[20000], peak_memory[1000] * 2)
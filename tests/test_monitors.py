@@ -1,31 +1,61 @@
+import io
+import itertools
+import tracemalloc
+
 from twined import Twine, exceptions
 
-from .base import BaseTestCase
+from .base import MONITOR_MESSAGE_TWINE, BaseTestCase
 
 
 class TestMonitorMessageTwine(BaseTestCase):
-    STRAND_WITH_MONITOR_MESSAGE_SCHEMA = """
-        {
-            "monitor_message_schema": {
-                "type": "object",
-                "properties": {
-                    "my_property": {
-                        "type": "number"
-                    }
-                },
-                "required": ["my_property"]
-            }
-        }
-    """
-
     def test_validate_monitor_message_raises_error_if_monitor_message_schema_not_met(self):
         """Test that an error is raised if an invalid monitor update is validated."""
-        twine = Twine(source=self.STRAND_WITH_MONITOR_MESSAGE_SCHEMA)
+        twine = Twine(source=MONITOR_MESSAGE_TWINE)
 
         with self.assertRaises(exceptions.InvalidValuesContents):
             twine.validate_monitor_message([])
 
     def test_validate_monitor_message_with_valid_monitor_update(self):
         """Test that a valid monitor update validates successfully."""
-        twine = Twine(source=self.STRAND_WITH_MONITOR_MESSAGE_SCHEMA)
+        twine = Twine(source=MONITOR_MESSAGE_TWINE)
         twine.validate_monitor_message({"my_property": 3.7})
+
+    def test_iter_validate_monitor_messages(self):
+        """Test that each line of a stream of monitor messages is validated with its line index and error reported."""
+        twine = Twine(source=MONITOR_MESSAGE_TWINE)
+        stream = '{"my_property": 1}\n\n{"my_property": "a"}\n{\n{"my_property": 2}'
+
+        for stream_ in (io.StringIO(stream), io.BytesIO(stream.encode())):
+            with self.subTest(stream=stream_):
+                results = list(twine.iter_validate_monitor_messages(stream_))
+
+                self.assertEqual([result.index for result in results], [0, 2, 3, 4])
+                self.assertEqual(
+                    [result.data for result in results], [{"my_property": 1}, None, None, {"my_property": 2}]
+                )
+                self.assertIsInstance(results[1].error, exceptions.InvalidValuesContents)
+                self.assertIsInstance(results[2].error, exceptions.InvalidValuesJson)
+
+    def test_iter_validate_monitor_messages_with_bytes_chunks(self):
+        """Test that monitor messages split across chunks of bytes at arbitrary points are validated."""
+        twine = Twine(source=MONITOR_MESSAGE_TWINE)
+        chunks = [b'{"my_prop', b'erty": 1}\r\n{"my_property": 2}\n{"my', b'_property": 3}', b"\n"]
+        results = list(twine.iter_validate_monitor_messages(iter(chunks)))
+        self.assertEqual([result.data for result in results], [{"my_property": i} for i in (1, 2, 3)])
+
+    def test_iter_validate_monitor_messages_uses_constant_memory(self):
+        """Test that memory use doesn't grow with the length of a stream of monitor messages."""
+        twine = Twine(source=MONITOR_MESSAGE_TWINE)
+        peak_memory = {}
+
+        for number_of_messages in (1000, 20000):
+            stream = itertools.repeat(b'{"my_property": 3.7}\n', number_of_messages)
+            tracemalloc.start()
+
+            for _ in twine.iter_validate_monitor_messages(stream):
+                pass
+
+            peak_memory[number_of_messages] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self.assertLess(peak_memory[20000], peak_memory[1000] * 2)
@@ -1,6 +1,7 @@
 import os
 from tempfile import TemporaryDirectory
 import unittest
+from unittest import mock
 
 from twined import Twine, exceptions
 
@@ -117,5 +118,238 @@ class TestSchemaStrands(BaseTestCase):
         twine.validate(configuration_values=None)
 
 
+class TestValidateMany(BaseTestCase):
+    def test_validate_many(self):
+        """Test that a batch of values is validated with the index and error of each invalid item reported."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        results = twine.validate_many("input_values", [{"height": 3}, {"height": 1}, '{"height": 4}', "{", {}])
+
+        self.assertEqual([result.index for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual([result.data for result in results], [{"height": 3}, None, {"height": 4}, None, None])
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, exceptions.InvalidValuesContents)
+        self.assertIsInstance(results[3].error, exceptions.InvalidValuesJson)
+        self.assertIsInstance(results[4].error, exceptions.InvalidValuesContents)
+
+    def test_validate_many_with_invalid_utf8(self):
+        """Test that bytes-like sources that aren't valid UTF-8 are reported as invalid JSON without stopping the batch."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        results = twine.validate_many("input_values", [b'{"height": "\xff"}', b'{"height": 3}'])
+
+        self.assertIsInstance(results[0].error, exceptions.InvalidValuesJson)
+        self.assertEqual(results[1], (1, {"height": 3}, None))
+
+        with self.assertRaises(exceptions.InvalidValuesJson):
+            twine.validate_input_values(b'{"height": "\xff"}')
+
+    def test_validate_many_errors_match_single_validation(self):
+        """Test that the errors reported for a batch are the same as those raised when validating items one by one."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        [result] = twine.validate_many("input_values", [{"height": 1}])
+
+        with self.assertRaises(exceptions.InvalidValuesContents) as context:
+            twine.validate_input_values({"height": 1})
+
+        self.assertEqual(result.error.args, context.exception.args)
+
+    def test_validate_many_with_fail_fast(self):
+        """Test that validation stops at the first invalid item when `fail_fast` is `True`."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        results = twine.validate_many(
+            "input_values", iter([{"height": 3}, {"height": 1}, {"height": 4}]), fail_fast=True
+        )
+        self.assertEqual([(result.index, result.error is None) for result in results], [(0, True), (1, False)])
+
+    def test_validate_many_with_manifests(self):
+        """Test that strands other than values strands can be validated in batches."""
+        twine = Twine(source={"input_manifest": {"datasets": {"met_mast_data": {}}}})
+        results = twine.validate_many(
+            "input_manifest",
+            [{"id": "1", "datasets": {"met_mast_data": "gs://bucket/dataset"}}, {"id": "2", "datasets": {}}],
+        )
+
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, exceptions.InvalidManifestContents)
+
+    def test_validate_many_with_unsupported_strands(self):
+        """Test that trying to validate batches of credentials, unknown strands or strands missing from the twine
+        raises an error.
+        """
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        for strand in ("credentials", "not_a_strand"):
+            with self.subTest(strand=strand):
+                with self.assertRaises(exceptions.UnknownStrand):
+                    twine.validate_many(strand, [])
+
+        with self.assertRaises(exceptions.StrandNotFound):
+            twine.validate_many("monitor_message", [{}])
+
+
+class TestIsValid(BaseTestCase):
+    def test_is_valid(self):
+        """Test that valid sources are reported as valid and invalid or unparseable sources as invalid."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        self.assertTrue(twine.is_valid("input_values", {"height": 3}))
+        self.assertTrue(twine.is_valid("input_values", '{"height": 3}'))
+        self.assertFalse(twine.is_valid("input_values", {"height": 1}))
+        self.assertFalse(twine.is_valid("input_values", "{"))
+        self.assertFalse(twine.is_valid("input_values", '{"height": 3, "height": 4}'))
+        self.assertFalse(twine.is_valid("input_values", b'{"height": "\xff"}'))
+
+    def test_is_valid_does_not_build_errors(self):
+        """Test that checking the validity of a source doesn't select or render any validation error messages."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        with mock.patch("twined.twine.best_match") as mock_best_match:
+            with mock.patch("jsonschema.exceptions.ValidationError.__str__") as mock_str:
+                self.assertFalse(twine.is_valid("input_values", {"height": 1}))
+
+        mock_best_match.assert_not_called()
+        mock_str.assert_not_called()
+
+    def test_is_valid_many(self):
+        """Test that the validity of a batch of sources is reported in order and agrees with `validate_many`."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        sources = [{"height": 3}, {"height": 1}, '{"height": 4}', "{", {}]
+
+        self.assertEqual(
+            twine.is_valid_many("input_values", sources),
+            [result.error is None for result in twine.validate_many("input_values", sources)],
+        )
+
+    def test_is_valid_with_manifests(self):
+        """Test that manifests missing a non-optional dataset are invalid."""
+        twine = Twine(source={"input_manifest": {"datasets": {"met_mast_data": {}}}})
+
+        self.assertEqual(
+            twine.is_valid_many(
+                "input_manifest",
+                [{"id": "1", "datasets": {"met_mast_data": "gs://bucket/dataset"}}, {"id": "2", "datasets": {}}],
+            ),
+            [True, False],
+        )
+
+    def test_is_valid_with_children(self):
+        """Test that children whose keys don't match the keys in the children strand are invalid and that this agrees
+        with `validate_many`.
+        """
+        twine = Twine(source={"children": [{"key": "gis"}]})
+        backend = {"name": "GCPPubSubBackend", "project_id": "my-project"}
+        sources = [[{"key": "gis", "id": "1", "backend": backend}], [{"key": "other", "id": "1", "backend": backend}]]
+
+        self.assertEqual(twine.is_valid_many("children", sources), [True, False])
+
+        self.assertEqual(
+            twine.is_valid_many("children", sources),
+            [result.error is None for result in twine.validate_many("children", sources)],
+        )
+
+    def test_is_valid_with_unsupported_strands(self):
+        """Test that checking the validity of credentials, unknown strands or strands missing from the twine raises an
+        error.
+        """
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        for strand in ("credentials", "not_a_strand"):
+            with self.subTest(strand=strand):
+                with self.assertRaises(exceptions.UnknownStrand):
+                    twine.is_valid(strand, {})
+
+        with self.assertRaises(exceptions.StrandNotFound):
+            twine.is_valid_many("monitor_message", [{}])
+
+
+class TestCollectErrors(BaseTestCase):
+    TWINE = {
+        "input_values_schema": {
+            "type": "object",
+            "properties": {
+                "height": {"type": "integer", "minimum": 2},
+                "items": {"type": "array", "items": {"type": "string", "maxLength": 3}},
+                "a/b": {"type": "string"},
+            },
+        }
+    }
+
+    def test_valid_source_has_no_errors(self):
+        """Test that no errors are collected for a valid source."""
+        twine = Twine(source=self.TWINE)
+        self.assertEqual(twine.collect_errors("input_values", {"height": 3, "items": ["abc"]}), ([], True))
+
+    def test_all_errors_are_collected(self):
+        """Test that every error is collected with its JSON pointer, keyword, message and an excerpt of the instance."""
+        twine = Twine(source=self.TWINE)
+        collected = twine.collect_errors("input_values", {"height": 1, "items": ["abcd", 1], "a/b": 1})
+
+        self.assertTrue(collected.complete)
+
+        self.assertEqual(
+            sorted((error.pointer, error.keyword, error.excerpt) for error in collected.errors),
+            [
+                ("/a~1b", "type", "1"),
+                ("/height", "minimum", "1"),
+                ("/items/0", "maxLength", "'abcd'"),
+                ("/items/1", "type", "1"),
+            ],
+        )
+
+        self.assertIn(
+            "is less than the minimum of 2",
+            [error for error in collected.errors if error.keyword == "minimum"][0].message,
+        )
+
+    def test_max_errors(self):
+        """Test that collection stops once the maximum number of errors has been collected."""
+        twine = Twine(source=self.TWINE)
+        collected = twine.collect_errors("input_values", {"items": ["abcd"] * 1000}, max_errors=10)
+        self.assertEqual(len(collected.errors), 10)
+        self.assertFalse(collected.complete)
+
+    def test_time_budget(self):
+        """Test that collection stops once the time budget has run out."""
+        twine = Twine(source=self.TWINE)
+        collected = twine.collect_errors("input_values", {"items": ["abcd"] * 1000}, max_errors=None, time_budget=0)
+        self.assertEqual(len(collected.errors), 1)
+        self.assertFalse(collected.complete)
+
+    def test_excerpts_are_truncated(self):
+        """Test that excerpts and messages of large invalid instances are truncated."""
+        twine = Twine(source={"input_values_schema": {"type": "string"}})
+        [error] = twine.collect_errors("input_values", [{"name": "x" * 1000, "index": i} for i in range(1000)]).errors
+
+        self.assertEqual(error.pointer, "")
+        self.assertLessEqual(len(error.excerpt), 200)
+        self.assertLessEqual(len(error.message), 200)
+        self.assertTrue(error.message.endswith("..."))
+
+    def test_missing_datasets_are_collected(self):
+        """Test that missing non-optional datasets are collected for manifests."""
+        twine = Twine(source={"input_manifest": {"datasets": {"met_mast_data": {}, "scada_data": {}}}})
+        collected = twine.collect_errors("input_manifest", {"id": "1", "datasets": {}})
+
+        self.assertEqual(
+            [(error.pointer, error.keyword) for error in collected.errors], [("/datasets", "datasets")] * 2
+        )
+        self.assertTrue(collected.complete)
+
+    def test_children_key_errors_are_collected(self):
+        """Test that children whose keys don't match the keys in the children strand have those errors collected."""
+        twine = Twine(source={"children": [{"key": "gis"}]})
+        backend = {"name": "GCPPubSubBackend", "project_id": "my-project"}
+        collected = twine.collect_errors("children", [{"key": "other", "id": "1", "backend": backend}])
+
+        self.assertEqual(
+            [error.message for error in collected.errors],
+            [
+                "No children found matching the key gis",
+                "Child with key 'other' found but no such key exists in the 'children' strand of the twine.",
+            ],
+        )
+
+        self.assertEqual({error.keyword for error in collected.errors}, {"key"})
+        self.assertTrue(collected.complete)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,129 @@
+import copy
+import io
+import json
+import os
+import pickle
+from tempfile import TemporaryDirectory
+
+from twined import SourceCache, Twine
+from twined.utils import FrozenDict, FrozenList, freeze
+
+from .base import VALID_SCHEMA_TWINE, BaseTestCase
+
+VALID_TWINE_WITH_CHILDREN = """{"children": [{"key": "gis", "purpose": "The purpose", "notes": "Some notes."}]}"""
+
+VALID_CHILDREN = [{"key": "gis", "id": "some-id", "backend": {"name": "GCPPubSubBackend", "project_id": "my-project"}}]
+
+
+class TestSourceCache(BaseTestCase):
+    def test_same_data_is_returned_for_same_source(self):
+        """Test that string and bytes-like sources are only loaded once."""
+        cache = SourceCache()
+
+        for source in ('{"a": [1, {"b": 2}]}', b'{"a": [1, {"b": 2}]}'):
+            with self.subTest(source_type=type(source)):
+                data = cache.load(source)
+                self.assertEqual(data, {"a": [1, {"b": 2}]})
+                self.assertIs(cache.load(source), data)
+
+        info = cache.cache_info()
+        self.assertEqual(info[:4], (2, 2, 2, 128))
+        self.assertGreater(info.memory, 0)
+
+    def test_cached_data_is_read_only(self):
+        """Test that cached data can't be modified, but copies of it can."""
+        data = SourceCache().load('{"a": [1, {"b": 2}]}')
+
+        for modify in (
+            lambda: data.update({"c": 3}),
+            lambda: data.pop("a"),
+            lambda: data["a"].append(3),
+            lambda: data["a"][1].__setitem__("b", 3),
+        ):
+            with self.assertRaises(TypeError):
+                modify()
+
+        modifiable_data = copy.deepcopy(data)
+        modifiable_data["a"][1]["b"] = 3
+        self.assertEqual(type(modifiable_data["a"]), list)
+        self.assertEqual(data["a"][1]["b"], 2)
+
+        unpickled_data = pickle.loads(pickle.dumps(data))
+        self.assertEqual(unpickled_data, data)
+        self.assertIsInstance(unpickled_data["a"], FrozenList)
+
+    def test_keyword_arguments_are_part_of_the_key(self):
+        """Test that the same source loaded with different keyword arguments is cached separately."""
+        cache = SourceCache()
+        self.assertEqual(cache.load('{"a": 1, "a": 2}', detect_duplicate_keys=False), {"a": 2})
+
+        with self.assertRaises(KeyError):
+            cache.load('{"a": 1, "a": 2}')
+
+    def test_file_is_reloaded_when_changed(self):
+        """Test that a file is reloaded if it's modified and taken from the cache otherwise."""
+        cache = SourceCache()
+
+        with TemporaryDirectory() as temporary_directory:
+            path = self._write_json_string_to_file('{"a": 1}', temporary_directory)
+            data = cache.load(path)
+            self.assertIs(cache.load(path), data)
+
+            with open(path, "w") as f:
+                json.dump({"a": 2}, f)
+
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(cache.load(path), {"a": 2})
+
+        self.assertEqual(cache.cache_info()[:3], (1, 2, 2))
+
+    def test_uncacheable_sources_are_loaded_without_caching(self):
+        """Test that file-like sources, objects and sources loaded with unhashable arguments aren't cached."""
+        cache = SourceCache()
+        self.assertEqual(cache.load(io.StringIO('{"a": 1}')), {"a": 1})
+        self.assertEqual(type(cache.load({"a": 1})), dict)
+        self.assertEqual(cache.load('{"a": 1}', allowed_kinds=["string"]), {"a": 1})
+        self.assertEqual(cache.cache_info()[:3], (0, 0, 0))
+
+    def test_least_recently_used_data_is_evicted(self):
+        """Test that the least recently used data is evicted when the cache is full or uses too much memory."""
+        cache = SourceCache(maxsize=2)
+        cache.load("[1]")
+        cache.load("[2]")
+        cache.load("[1]")
+        cache.load("[3]")
+        self.assertEqual(cache.cache_info().size, 2)
+        cache.load("[1]")
+        self.assertEqual(cache.cache_info().misses, 3)
+
+        _, data_size = freeze([1])
+        cache = SourceCache(max_memory=data_size * 2)
+        cache.load("[1]")
+        cache.load("[2]")
+        cache.load("[3]")
+        self.assertEqual(cache.cache_info().size, 2)
+        self.assertLessEqual(cache.cache_info().memory, cache.max_memory)
+
+    def test_data_larger_than_max_memory_is_not_cached(self):
+        """Test that data too large for the cache is returned read-only without being cached."""
+        cache = SourceCache(max_memory=10)
+        self.assertIsInstance(cache.load('{"a": 1}'), FrozenDict)
+        self.assertEqual(cache.cache_info().size, 0)
+
+    def test_twine_uses_source_cache(self):
+        """Test that twines given a source cache load children and values from it, but not the twine itself."""
+        cache = SourceCache()
+        twine = Twine(source=VALID_TWINE_WITH_CHILDREN, source_cache=cache)
+        self.assertEqual(cache.cache_info().size, 0)
+
+        with TemporaryDirectory() as temporary_directory:
+            path = self._write_json_string_to_file(json.dumps(VALID_CHILDREN), temporary_directory)
+            twine.validate_children(source=path)
+            twine.validate_children(source=path)
+
+        self.assertEqual(cache.cache_info()[:3], (1, 1, 1))
+
+        values_twine = Twine(source=VALID_SCHEMA_TWINE, source_cache=cache)
+        values = values_twine.validate_input_values('{"height": 3}')
+        self.assertIs(values_twine.validate_input_values('{"height": 3}'), values)
+        self.assertIsInstance(values, FrozenDict)
@@ -1,8 +1,25 @@
+from concurrent.futures import Executor, Future
+import hashlib
+import io
+import json
 import os
+import threading
+from unittest import mock
+from urllib.request import urlopen
 
 from twined import Twine, exceptions
+import twined.schema
+from twined.schema import (
+    BUNDLED_SCHEMAS,
+    PUBLISHED_SCHEMA_HASHES,
+    REMOTE_SCHEMA_TIMEOUT,
+    _retrieve_remote,
+    get_registry,
+    is_published_copy,
+    load_bundled_schema,
+)
 
-from .base import BaseTestCase
+from .base import VALID_SCHEMA_TWINE, BaseTestCase
 
 
 class TestTwine(BaseTestCase):
@@ -27,6 +44,35 @@ class TestTwine(BaseTestCase):
         with self.assertRaises(exceptions.TwineVersionConflict):
             Twine(source=incorrect_version_twine)
 
+    def test_twined_version_ranges(self):
+        """Ensures twined version ranges in a twine are checked against the installed version of twined"""
+        with mock.patch("twined.twine.get_installed_twined_version", return_value="0.7.1"):
+            for specification in ("0.7.1", ">=0.7,<0.8", "~=0.7.0", "!=0.6.0", "==0.7.*", "!=0.6.*"):
+                with self.subTest(specification=specification):
+                    Twine(source={"twined_version": specification})
+
+            for specification in ("0.7.0", ">=0.8", "<0.7,>0.6", "~=0.6.0", "==0.6.*", "!=0.7.*"):
+                with self.subTest(specification=specification):
+                    with self.assertRaises(exceptions.TwineVersionConflict):
+                        Twine(source={"twined_version": specification})
+
+    def test_twined_pre_release_versions(self):
+        """Ensures a twine can pin an installed pre-release of twined, and that the pre-release doesn't satisfy a
+        specification of the final release
+        """
+        with mock.patch("twined.twine.get_installed_twined_version", return_value="0.7.0rc1"):
+            Twine(source={"twined_version": "0.7.0rc1"})
+
+            for specification in ("0.7.0", "==0.7.0", ">=0.7.0"):
+                with self.subTest(specification=specification):
+                    with self.assertRaises(exceptions.TwineVersionConflict):
+                        Twine(source={"twined_version": specification})
+
+    def test_invalid_twined_version_specification(self):
+        """Ensures an invalid twined version specification in a twine raises an error"""
+        with self.assertRaises(exceptions.InvalidTwineContents):
+            Twine(source={"twined_version": "=>0.7"})
+
     def test_empty_twine(self):
         """Ensures that an empty twine file can be loaded"""
         with self.assertLogs(level="DEBUG") as log:
@@ -158,3 +204,235 @@ class TestTwine(BaseTestCase):
             with self.subTest(twine=twine):
                 twine = Twine(source=twine)
                 self.assertEqual(twine.required_strands, expected)
+
+    def _validate_children_and_manifest(self, offline):
+        """Validate children and an input manifest with a new twine.
+
+        :param bool offline:
+        :return None:
+        """
+        children = [
+            {"key": "gis", "id": "some-id", "backend": {"name": "GCPPubSubBackend", "project_id": "my-project"}}
+        ]
+        manifest = {"id": "some-id", "datasets": {"my-dataset": "gs://my-bucket/my-dataset"}}
+        twine = Twine(
+            source={"children": [{"key": "gis"}], "input_manifest": {"datasets": {"my-dataset": {}}}}, offline=offline
+        )
+        twine.validate_children(children)
+        twine.validate_input_manifest(manifest)
+
+    def test_bundled_schemas_are_resolved_without_network_access_in_offline_mode(self):
+        """Test that children and manifests are validated against the schemas distributed with twined without any
+        attempt to fetch them remotely in offline mode.
+        """
+        with mock.patch("twined.schema.urlopen") as mock_urlopen:
+            self._validate_children_and_manifest(offline=True)
+
+        mock_urlopen.assert_not_called()
+
+    def test_bundled_schemas_are_only_resolved_by_default_if_they_are_published_copies(self):
+        """Test that, outside offline mode, the schemas distributed with twined are only used if they're byte-for-byte
+        copies of the published schemas, and the published schemas are fetched otherwise.
+        """
+        schema_directory = os.path.dirname(twined.schema.__file__)
+        bundled_schema_hashes = {}
+
+        for uri, filename in BUNDLED_SCHEMAS.items():
+            with open(os.path.join(schema_directory, filename), "rb") as f:
+                bundled_schema_hashes[uri] = hashlib.sha256(f.read()).hexdigest()
+
+        other_hashes = {uri: "0" * 64 for uri in BUNDLED_SCHEMAS}
+
+        def urlopen(uri, timeout):
+            return io.BytesIO(json.dumps(load_bundled_schema(BUNDLED_SCHEMAS[uri])).encode())
+
+        for hashes, expected_retrieved_uris in (
+            ({}, set(BUNDLED_SCHEMAS)),
+            (other_hashes, set(BUNDLED_SCHEMAS)),
+            (bundled_schema_hashes, set()),
+        ):
+            with self.subTest(hashes=hashes):
+                get_registry.cache_clear()
+                _retrieve_remote.cache_clear()
+
+                try:
+                    with mock.patch.dict(PUBLISHED_SCHEMA_HASHES, hashes, clear=True):
+                        with mock.patch("twined.schema.urlopen", side_effect=urlopen) as mock_urlopen:
+                            self._validate_children_and_manifest(offline=False)
+                finally:
+                    get_registry.cache_clear()
+                    _retrieve_remote.cache_clear()
+
+                self.assertEqual({call.args[0] for call in mock_urlopen.call_args_list}, expected_retrieved_uris)
+
+    def test_published_schema_hashes_match_bundled_schemas(self):
+        """Test that each schema recorded as a copy of a published schema is unchanged from the recorded hash."""
+        self.assertLessEqual(set(PUBLISHED_SCHEMA_HASHES), set(BUNDLED_SCHEMAS))
+
+        for uri in PUBLISHED_SCHEMA_HASHES:
+            with self.subTest(uri=uri):
+                self.assertTrue(is_published_copy(uri))
+
+    def test_remote_schemas_are_not_retrieved_in_offline_mode(self):
+        """Test that referencing a schema that isn't distributed with twined raises an error in offline mode instead of
+        fetching it.
+        """
+        twine = Twine(source={"input_values_schema": {"$ref": "https://example.com/schema.json"}}, offline=True)
+
+        with mock.patch("twined.schema.urlopen") as mock_urlopen:
+            with self.assertRaises(exceptions.RemoteSchemaRetrievalDisabled):
+                twine.validate_input_values({})
+
+        mock_urlopen.assert_not_called()
+
+    def test_remote_schemas_are_retrieved_with_a_timeout(self):
+        """Test that schemas that aren't distributed with twined are fetched with a timeout so validation can't hang."""
+        uri = "https://example.com/schema-with-timeout.json"
+        twine = Twine(source={"input_values_schema": {"$ref": uri}})
+
+        with mock.patch("twined.schema.urlopen") as mock_urlopen:
+            mock_urlopen.return_value.__enter__.return_value = io.BytesIO(
+                b'{"$schema": "https://json-schema.org/draft/2020-12/schema", "type": "object"}'
+            )
+            twine.validate_input_values({})
+
+        mock_urlopen.assert_called_once_with(uri, timeout=REMOTE_SCHEMA_TIMEOUT)
+
+    def test_published_schema_hashes_match_published_schemas(self):
+        """Test that the recorded hashes of the published schemas bundled with twined match the documents currently
+        published. This is skipped if the schema registry can't be reached.
+        """
+        for uri, published_hash in PUBLISHED_SCHEMA_HASHES.items():
+            with self.subTest(uri=uri):
+                try:
+                    with urlopen(uri, timeout=REMOTE_SCHEMA_TIMEOUT) as response:
+                        published_schema = response.read()
+                except OSError as e:
+                    self.skipTest(f"The schema registry can't be reached: {e}")
+
+                self.assertEqual(hashlib.sha256(published_schema).hexdigest(), published_hash)
+
+    def test_validators_are_compiled_once_per_strand(self):
+        """Test that each strand's validator is compiled the first time it's used and reused for later validations."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        for height in range(2, 12):
+            twine.validate_input_values({"height": height})
+
+        self.assertEqual(twine.validator_cache_info, (9, 1, 1))
+
+    def test_warm(self):
+        """Test that warming a twine compiles validators for all its strands so validation doesn't compile any."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        twine.warm()
+        cache_info = twine.validator_cache_info
+        self.assertEqual(cache_info.size, 3)
+
+        twine.validate_input_values({"height": 3})
+        twine.validate_configuration_values({"n_iterations": 3})
+        self.assertEqual(twine.validator_cache_info.misses, cache_info.misses)
+        self.assertEqual(twine.validator_cache_info.hits, cache_info.hits + 2)
+
+    def test_warm_with_unavailable_strand_raises_error(self):
+        """Test that warming a strand that isn't in the twine raises an error."""
+        with self.assertRaises(exceptions.StrandNotFound):
+            Twine(source=VALID_SCHEMA_TWINE).warm("monitor_message")
+
+    def test_twine_validator_is_shared_between_twines(self):
+        """Test that the twine schema is only loaded and compiled once, however many twines are instantiated."""
+        with mock.patch("twined.schema.load_bundled_schema") as mock_load_bundled_schema:
+            for _ in range(3):
+                Twine(source=VALID_SCHEMA_TWINE)
+
+        mock_load_bundled_schema.assert_not_called()
+
+    def test_parallel_validate(self):
+        """Test that validating strands in parallel gives the same results as validating them sequentially."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        sources = {"input_values": {"height": 3}, "configuration_values": '{"n_iterations": 2}', "output_values": {}}
+        self.assertEqual(twine.validate(parallel=True, **sources), twine.validate(**sources))
+
+    def test_parallel_validate_runs_strands_concurrently(self):
+        """Test that strands are validated concurrently in parallel mode."""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        barrier = threading.Barrier(3, timeout=5)
+
+        def wait_for_other_strands(source, **kwargs):
+            barrier.wait()
+            return source
+
+        with mock.patch.multiple(
+            twine,
+            validate_input_values=wait_for_other_strands,
+            validate_configuration_values=wait_for_other_strands,
+            validate_output_values=wait_for_other_strands,
+        ):
+            # This would time out if the strands were validated one after another.
+            twine.validate(parallel=True, input_values={}, configuration_values={}, output_values={})
+
+    def test_parallel_validate_raises_error_for_first_failing_strand(self):
+        """Test that the error for the first failing strand in the order the sources were given is raised in parallel
+        mode, even if a later strand fails first.
+        """
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        later_strand_failed = threading.Event()
+
+        def fail_after_later_strand(source, **kwargs):
+            later_strand_failed.wait(timeout=5)
+            raise exceptions.InvalidValuesContents("Input values are invalid.")
+
+        def fail(source, **kwargs):
+            later_strand_failed.set()
+            raise exceptions.InvalidValuesContents("Output values are invalid.")
+
+        with mock.patch.multiple(twine, validate_input_values=fail_after_later_strand, validate_output_values=fail):
+            with self.assertRaises(exceptions.InvalidValuesContents) as context:
+                twine.validate(parallel=True, input_values={}, configuration_values={}, output_values={})
+
+        self.assertEqual(context.exception.args[0], "Input values are invalid.")
+
+    def test_parallel_validate_raises_same_errors_as_serial_validate(self):
+        """Test that the same error is raised in parallel mode as in serial mode when a source can't be validated (e.g.
+        because its strand isn't in the twine) after an earlier strand fails validation.
+        """
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        for input_values, expected_exception in (
+            ({"height": 1}, exceptions.InvalidValuesContents),
+            ({"height": 3}, exceptions.StrandNotFound),
+        ):
+            sources = {"input_values": input_values, "output_values": {}, "input_manifest": {}}
+
+            for parallel in (False, True):
+                with self.subTest(input_values=input_values, parallel=parallel):
+                    with self.assertRaises(expected_exception):
+                        twine.validate(parallel=parallel, **sources)
+
+    def test_parallel_validate_cancels_strands_after_failure(self):
+        """Test that strands that haven't started validating are cancelled when another strand fails."""
+
+        class FirstTaskOnlyExecutor(Executor):
+            """An executor that only runs the first function submitted to it, leaving the rest queued."""
+
+            def __init__(self):
+                self.futures = []
+
+            def submit(self, function, *args, **kwargs):
+                future = Future()
+
+                if not self.futures:
+                    try:
+                        future.set_result(function(*args, **kwargs))
+                    except Exception as e:
+                        future.set_exception(e)
+
+                self.futures.append(future)
+                return future
+
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+        executor = FirstTaskOnlyExecutor()
+
+        with self.assertRaises(exceptions.InvalidValuesContents):
+            twine.validate(parallel=True, executor=executor, input_values={"height": 1}, output_values={})
+
+        self.assertTrue(executor.futures[1].cancelled())
@@ -0,0 +1,109 @@
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from twined import Twine, TwineCache, exceptions
+
+from .base import VALID_SCHEMA_TWINE, BaseTestCase
+
+
+class TestTwineCache(BaseTestCase):
+    def test_same_twine_is_returned_for_same_source(self):
+        """Test that the same twine instance is returned for repeated loads of the same string or dict source."""
+        cache = TwineCache()
+
+        for source in (VALID_SCHEMA_TWINE, json.loads(VALID_SCHEMA_TWINE)):
+            with self.subTest(source_type=type(source)):
+                self.assertIs(cache.get(source), cache.get(source))
+
+        self.assertEqual(cache.cache_info(), (2, 2, 2, 128))
+
+    def test_different_sources_give_different_twines(self):
+        """Test that different sources and offline modes give different twines."""
+        cache = TwineCache()
+        twine = cache.get(VALID_SCHEMA_TWINE)
+        self.assertIsNot(cache.get("{}"), twine)
+        self.assertIsNot(cache.get(VALID_SCHEMA_TWINE, offline=True), twine)
+
+    def test_cached_twines_are_warmed_and_frozen(self):
+        """Test that cached twines have their validators compiled and can't have their strands reassigned."""
+        twine = TwineCache().get(VALID_SCHEMA_TWINE)
+        self.assertEqual(twine.validator_cache_info.size, 3)
+
+        with self.assertRaises(exceptions.FrozenTwine):
+            twine.input_values_schema = {}
+
+        # Validating still works on a frozen twine.
+        twine.validate_input_values({"height": 3})
+
+    def test_cached_twine_strands_cannot_be_mutated_in_place(self):
+        """Test that the strands of cached twines are read-only, so one caller can't change the validation done for
+        every other caller of the same cached twine.
+        """
+        cache = TwineCache()
+        twine = cache.get(VALID_SCHEMA_TWINE)
+
+        with self.assertRaises(TypeError):
+            twine.input_values_schema["properties"]["height"]["minimum"] = 100
+
+        with self.assertRaises(TypeError):
+            twine.input_values_schema["required"].append("width")
+
+        cache.get(VALID_SCHEMA_TWINE).validate_input_values({"height": 3})
+
+    def test_mutating_dict_source_does_not_affect_cached_twine(self):
+        """Test that changing a dict source after caching its twine doesn't change the cached twine."""
+        source = json.loads(VALID_SCHEMA_TWINE)
+        twine = TwineCache().get(source)
+        source["input_values_schema"]["required"] = ["width"]
+        self.assertEqual(twine.input_values_schema["required"], ["height"])
+
+    def test_twine_file_is_reloaded_when_changed(self):
+        """Test that a twine file is reloaded if it's modified and taken from the cache otherwise."""
+        cache = TwineCache()
+
+        with TemporaryDirectory() as temporary_directory:
+            path = self._write_json_string_to_file(VALID_SCHEMA_TWINE, temporary_directory)
+            twine = cache.get(path)
+            self.assertIs(cache.get(path), twine)
+
+            with open(path, "w") as f:
+                json.dump({"input_values_schema": {"type": "object"}}, f)
+
+            os.utime(path, ns=(0, 0))
+            reloaded_twine = cache.get(path)
+
+        self.assertIsNot(reloaded_twine, twine)
+        self.assertEqual(reloaded_twine.available_strands, {"input_values"})
+
+    def test_least_recently_used_twine_is_evicted(self):
+        """Test that the least recently used twine is evicted when the cache is full."""
+        cache = TwineCache(maxsize=2)
+        first = cache.get('{"input_values_schema": {}}')
+        cache.get('{"output_values_schema": {}}')
+        cache.get('{"input_values_schema": {}}')
+        cache.get('{"monitor_message_schema": {}}')
+
+        self.assertEqual(cache.cache_info().size, 2)
+        self.assertIs(cache.get('{"input_values_schema": {}}'), first)
+        self.assertEqual(cache.cache_info().misses, 3)
+
+    def test_file_like_sources_are_not_cached(self):
+        """Test that twines loaded from file-like sources aren't cached."""
+        cache = TwineCache()
+
+        with TemporaryDirectory() as temporary_directory:
+            path = self._write_json_string_to_file(VALID_SCHEMA_TWINE, temporary_directory)
+
+            with open(path) as f:
+                cache.get(f)
+
+        self.assertEqual(cache.cache_info(), (0, 0, 0, 128))
+
+    def test_twine_cached_uses_process_wide_cache(self):
+        """Test that `Twine.cached` gets twines from the process-wide cache."""
+        with mock.patch("twined.cache.twine_cache", TwineCache()) as cache:
+            self.assertIs(Twine.cached(VALID_SCHEMA_TWINE), Twine.cached(VALID_SCHEMA_TWINE))
+
+        self.assertEqual(cache.cache_info().hits, 1)
@@ -1,12 +1,31 @@
+import bz2
+import gzip
+import io
 import json
+import lzma
+import mmap
+import os
+import socket
+import sys
 from tempfile import TemporaryDirectory
+import tracemalloc
 import unittest
 from unittest import mock
 
 import numpy as np
 
-from twined import exceptions
-from twined.utils import TwinedEncoder, load_json
+from twined import Twine, exceptions
+from twined.utils import (
+    JSONStreamReader,
+    TwinedEncoder,
+    get_json_decoder,
+    iter_lines,
+    load_json,
+    set_json_decoder,
+    version_satisfies,
+    write_json,
+)
+from twined.utils.decoders import raise_error_if_duplicate_keys
 
 from .base import VALID_SCHEMA_TWINE, BaseTestCase
 
@@ -35,6 +54,181 @@ class TestUtils(BaseTestCase):
         with self.assertRaises(exceptions.InvalidSourceKindException):
             load_json("{}", allowed_kinds=custom_allowed_kinds)
 
+    def test_load_json_with_bytes_like(self):
+        """Ensures that json can be loaded from bytes-like objects in any of the encodings json allows"""
+        for source in (
+            b'{"a": "\xc3\xa9"}',
+            bytearray(b'{"a": "\xc3\xa9"}'),
+            memoryview(b'{"a": "\xc3\xa9"}'),
+            b'\xef\xbb\xbf{"a": "\xc3\xa9"}',
+            '{"a": "\u00e9"}'.encode("utf-16"),
+        ):
+            with self.subTest(source=source):
+                self.assertEqual(load_json(source), {"a": "\u00e9"})
+
+        with self.assertRaises(KeyError):
+            load_json(b'{"a": 1, "a": 2}')
+
+        with self.assertRaises(exceptions.InvalidSourceKindException):
+            load_json(b"{}", allowed_kinds=("string",))
+
+    def test_load_json_with_large_file(self):
+        """Ensures that large files are memory-mapped, and read instead if they can't be memory-mapped"""
+        load_json_module = sys.modules["twined.utils.load_json"]
+
+        with TemporaryDirectory() as tmp_dir:
+            path = self._write_json_string_to_file(VALID_SCHEMA_TWINE, tmp_dir)
+
+            with mock.patch.object(load_json_module, "MMAP_THRESHOLD", 0):
+                with mock.patch("mmap.mmap", wraps=mmap.mmap) as mock_mmap:
+                    self.assertEqual(load_json(path), json.loads(VALID_SCHEMA_TWINE))
+
+                mock_mmap.assert_called_once()
+
+                with mock.patch("mmap.mmap", side_effect=OSError):
+                    self.assertEqual(load_json(path), json.loads(VALID_SCHEMA_TWINE))
+
+    def test_load_json_with_compressed_file(self):
+        """Ensures that compressed json files are decompressed, and that the twine validates them like other files"""
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        with TemporaryDirectory() as tmp_dir:
+            for suffix, module in ((".gz", gzip), (".bz2", bz2), (".xz", lzma)):
+                with self.subTest(suffix=suffix):
+                    path = os.path.join(tmp_dir, "input_values.json" + suffix)
+
+                    with module.open(path, "wt") as f:
+                        f.write('{"height": 3}')
+
+                    self.assertEqual(load_json(path), {"height": 3})
+                    self.assertEqual(twine.validate_input_values(path), {"height": 3})
+
+                    with self.assertRaises(exceptions.InvalidSourceKindException):
+                        load_json(path, allowed_kinds=("string",))
+
+            with self.assertRaises(exceptions.InputValuesFileNotFound):
+                twine.validate_input_values(os.path.join(tmp_dir, "missing.json.gz"))
+
+    def test_load_json_with_corrupt_compressed_file(self):
+        """Ensures that truncated or corrupt compressed json files raise a twined exception rather than the
+        decompression module's own error, and that the twine reports them as invalid json
+        """
+        twine = Twine(source=VALID_SCHEMA_TWINE)
+
+        with TemporaryDirectory() as tmp_dir:
+            for suffix, module in ((".gz", gzip), (".bz2", bz2), (".xz", lzma)):
+                data = module.compress(b'{"height": 3}')
+
+                for description, corrupt_data in (("truncated", data[:-10]), ("corrupt", b"not compressed" + data)):
+                    with self.subTest(suffix=suffix, description=description):
+                        path = os.path.join(tmp_dir, "input_values.json" + suffix)
+
+                        with open(path, "wb") as f:
+                            f.write(corrupt_data)
+
+                        with self.assertRaises(exceptions.CorruptCompressedFile):
+                            load_json(path)
+
+                        with self.assertRaises(exceptions.InvalidValuesJson):
+                            twine.validate_input_values(path)
+
+                        self.assertFalse(twine.is_valid("input_values", path))
+
+    def test_load_json_with_zstd_compressed_file_without_zstandard(self):
+        """Ensures that an informative error is raised if no module that can decompress zstd is installed"""
+        with mock.patch.dict(sys.modules, {"compression.zstd": None, "zstandard": None}):
+            with self.assertRaisesRegex(ImportError, "must be installed"):
+                load_json("input_values.json.zst")
+
+    def test_json_decoding(self):
+        """Ensures that documents are parsed identically from strings and bytes-like objects and that duplicate keys are
+        rejected, however they're escaped or spaced
+        """
+        valid_documents = (
+            '{"a": {"b": [1, 2.5, null, true]}, "c": "d"}',
+            '{"a\\\\": 1, "a": 2}',
+            '{"a": "\\":", "b": "\\\\\\":"}',
+            '{"a" : 1, "b"\n:\t{"a" : 2}}',
+            '{"a": NaN, "b": Infinity}',
+            '{"a": 123456789012345678901234567890}',
+        )
+
+        invalid_documents = (
+            '{"a": 1, "a": 2}',
+            '[{"a": {"b": 1, "b": 1}}]',
+            '{"a\\\\": 1, "a\\\\": 2}',
+            '{"a" : 1, "a"\n: 2}',
+            '{"\\":": "a", "\\":": "b"}',
+        )
+
+        for document in valid_documents:
+            with self.subTest(document=document):
+                for source in (
+                    document,
+                    document.encode(),
+                    bytearray(document.encode()),
+                    memoryview(document.encode()),
+                ):
+                    self.assertEqual(repr(load_json(source)), repr(json.loads(document)))
+
+        for document in invalid_documents:
+            with self.subTest(document=document):
+                with self.assertRaises(KeyError):
+                    load_json(document)
+
+                with self.assertRaises(KeyError):
+                    load_json(memoryview(document.encode()))
+
+        with self.assertRaises(json.JSONDecodeError):
+            load_json('{"a": 1')
+
+    def test_set_json_decoder(self):
+        """Ensures a decoder can be plugged in to parse JSON, that the standard library's decoder is used by default and
+        when arguments specific to it are given, and that non-callable decoders can't be plugged in
+        """
+        original_decoder = get_json_decoder()
+        decoder = mock.Mock(return_value={"decoded": True})
+
+        try:
+            set_json_decoder(decoder)
+            self.assertIs(get_json_decoder(), decoder)
+
+            self.assertEqual(load_json('{"a": 1}'), {"decoded": True})
+            self.assertEqual(load_json(b'{"a": 1}', detect_duplicate_keys=False), {"decoded": True})
+
+            self.assertEqual(
+                decoder.call_args_list,
+                [
+                    mock.call('{"a": 1}', detect_duplicate_keys=True),
+                    mock.call(b'{"a": 1}', detect_duplicate_keys=False),
+                ],
+            )
+
+            self.assertEqual(load_json('{"a": 1}', parse_int=str), {"a": "1"})
+
+            set_json_decoder()
+            self.assertIsNone(get_json_decoder())
+            self.assertEqual(load_json('{"a": 1}'), {"a": 1})
+
+            with self.assertRaises(TypeError):
+                set_json_decoder("orjson")
+
+        finally:
+            set_json_decoder(original_decoder)
+
+    def test_raise_error_if_duplicate_keys(self):
+        """Ensures the duplicate key is named in the error and objects without duplicate keys keep their order"""
+        self.assertEqual(list(raise_error_if_duplicate_keys([("b", 1), ("a", 2)])), ["b", "a"])
+        self.assertEqual(raise_error_if_duplicate_keys([]), {})
+
+        with self.assertRaisesRegex(KeyError, "Duplicate key detected: 'b'"):
+            raise_error_if_duplicate_keys([("a", 1), ("b", 2), ("c", 3), ("b", 4)])
+
+    def test_load_json_without_duplicate_key_detection(self):
+        """Ensures duplicate-key detection can be disabled, keeping the last value of duplicate keys"""
+        self.assertEqual(load_json('{"a": 1, "a": 2}', detect_duplicate_keys=False), {"a": 2})
+        self.assertEqual(load_json(b'{"a": NaN, "a": 2}', detect_duplicate_keys=False), {"a": 2})
+
     def test_encoder_without_numpy(self):
         """Ensures that the json encoder can work without numpy being installed"""
         some_json = {"a": np.array([0, 1])}
@@ -52,6 +246,217 @@ class TestUtils(BaseTestCase):
         some_json = {"a": np.array([0, 1])}
         json.dumps(some_json, cls=TwinedEncoder)
 
+    def test_encoder_encodes_arrays_like_lists(self):
+        """Ensures that numpy arrays are encoded as their nested lists would be, however they're chunked"""
+        some_json = {
+            "a": np.arange(10).reshape(2, 5),
+            "b": [np.linspace(0, 1, 7), np.array([]), np.zeros((2, 0))],
+            "c": np.matrix([[1, 2], [3, 4]]),
+            "d": np.array(["x", "\u00e9"]),
+            "e": np.array([1, np.arange(2), {"f": np.int8(1)}], dtype=object),
+            "g": "\u0000twined-array-0:0\u0000",
+        }
+
+        some_lists = {
+            "a": [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9]],
+            "b": [np.linspace(0, 1, 7).tolist(), [], [[], []]],
+            "c": [[1, 2], [3, 4]],
+            "d": ["x", "\u00e9"],
+            "e": [1, [0, 1], {"f": 1}],
+            "g": "\u0000twined-array-0:0\u0000",
+        }
+
+        for array_chunk_size in (1, 3, 65536):
+            for kwargs in ({}, {"separators": (",", ":"), "sort_keys": True}, {"indent": 2}, {"ensure_ascii": False}):
+                with self.subTest(array_chunk_size=array_chunk_size, kwargs=kwargs):
+                    self.assertEqual(
+                        json.dumps(some_json, cls=TwinedEncoder, array_chunk_size=array_chunk_size, **kwargs),
+                        json.dumps(some_lists, **kwargs),
+                    )
+
+                    encoder = TwinedEncoder(array_chunk_size=array_chunk_size, **kwargs)
+                    self.assertEqual("".join(encoder.iterencode(some_json)), json.dumps(some_lists, **kwargs))
+
+    def test_encoder_encodes_numpy_scalars(self):
+        """Ensures that numpy scalars are encoded as the equivalent python primitives"""
+        some_json = [np.float32(0.5), np.int64(3), np.uint8(255), np.bool_(True), np.str_("x")]
+        self.assertEqual(json.dumps(some_json, cls=TwinedEncoder), '[0.5, 3, 255, true, "x"]')
+
+    def test_encoder_with_non_finite_values(self):
+        """Ensures that non-finite values in numpy arrays and scalars are encoded as python floats would be by default,
+        raise an error if they're not allowed and can be encoded as null instead
+        """
+        some_json = {"a": np.array([np.nan, 1.0, np.inf, -np.inf], dtype=np.float32), "b": np.float32("nan")}
+        self.assertEqual(
+            json.dumps(some_json, cls=TwinedEncoder),
+            '{"a": [NaN, 1.0, Infinity, -Infinity], "b": NaN}',
+        )
+
+        self.assertEqual(
+            json.dumps(some_json, cls=TwinedEncoder, nan_as_null=True),
+            '{"a": [null, 1.0, null, null], "b": null}',
+        )
+
+        with self.assertRaises(ValueError):
+            json.dumps(some_json, cls=TwinedEncoder, allow_nan=False)
+
+    def test_write_json(self):
+        """Ensures that json is written to each kind of destination as `json.dumps` would encode it"""
+        some_json = {"a": np.arange(10).reshape(2, 5), "b": [1.5, None, "\u00e9"], "c": np.float32(0.5)}
+        expected = json.dumps(some_json, cls=TwinedEncoder)
+
+        class SlowRawStream(io.RawIOBase):
+            """A raw stream that writes at most three bytes at a time."""
+
+            def __init__(self):
+                self.data = bytearray()
+
+            def writable(self):
+                return True
+
+            def write(self, data):
+                self.data += data[:3]
+                return len(data[:3])
+
+        for buffer_size in (1, 65536):
+            with self.subTest(buffer_size=buffer_size):
+                text_stream = io.StringIO()
+                write_json(some_json, text_stream, buffer_size=buffer_size)
+                self.assertEqual(text_stream.getvalue(), expected)
+
+                binary_stream = io.BytesIO()
+                write_json(some_json, binary_stream, buffer_size=buffer_size)
+                self.assertEqual(binary_stream.getvalue(), expected.encode())
+
+                raw_stream = SlowRawStream()
+                write_json(some_json, raw_stream, buffer_size=buffer_size)
+                self.assertEqual(raw_stream.data, expected.encode())
+
+                sending_socket, receiving_socket = socket.socketpair()
+
+                with sending_socket, receiving_socket:
+                    write_json(some_json, sending_socket, buffer_size=buffer_size)
+                    sending_socket.shutdown(socket.SHUT_WR)
+                    self.assertEqual(b"".join(iter(lambda: receiving_socket.recv(65536), b"")), expected.encode())
+
+        with TemporaryDirectory() as tmp_dir:
+            for filename in ("values.json", "values.json.gz"):
+                with self.subTest(filename=filename):
+                    path = os.path.join(tmp_dir, filename)
+                    write_json(some_json, path, indent=2)
+                    self.assertEqual(load_json(path), json.loads(json.dumps(some_json, cls=TwinedEncoder)))
+
+    def test_write_json_memory_does_not_grow_with_output_size(self):
+        """Ensures that the memory used to write json is bounded by the buffer and array chunk sizes rather than the
+        size of the output
+        """
+        some_json = {"a": np.linspace(0, 1, 200_000), "b": [{"c": i} for i in range(2000)]}
+
+        with TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "values.json")
+
+            tracemalloc.start()
+            write_json(some_json, path, array_chunk_size=1000)
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.assertLess(peak_memory, os.path.getsize(path) / 10)
+
+    def test_iter_lines(self):
+        """Ensures lines are split from file-like objects and from chunks of bytes split at arbitrary points"""
+        self.assertEqual(list(iter_lines(io.StringIO("a\r\nb\n\nc"))), ["a", "b", "", "c"])
+        self.assertEqual(list(iter_lines(io.BytesIO(b"a\nb\n"))), [b"a", b"b"])
+        self.assertEqual(list(iter_lines([b"a", b"b\nc", b"", b"\nd\r\n", b"e"])), [b"ab", b"c", b"d", b"e"])
+
+    def test_json_stream_reader(self):
+        """Ensures JSON documents can be walked through member by member from text and binary streams read in chunks of
+        any size
+        """
+        document = {"a": [1, 2.5e3, {"b": None}], "c": '\u00e9\\"', "d": {}, "e": [], "f": True}
+        serialised_document = json.dumps(document, indent=2, ensure_ascii=False)
+
+        def read(reader):
+            if reader.peek() == "{":
+                return {key: read(reader) for key in reader.iter_object()}
+
+            if reader.peek() == "[":
+                return [read(reader) for _ in reader.iter_array()]
+
+            return reader.read_value()
+
+        for stream in (io.StringIO(serialised_document), io.BytesIO(serialised_document.encode())):
+            for chunk_size in (1, 3, 1000):
+                with self.subTest(stream=type(stream), chunk_size=chunk_size):
+                    stream.seek(0)
+                    self.assertEqual(read(JSONStreamReader(stream, chunk_size=chunk_size)), document)
+
+        for invalid_document in ('{"a" 1}', '{"a": 1 "b": 2}', "[1, 2", "{1: 2}", "[1, tru]"):
+            with self.subTest(invalid_document=invalid_document):
+                with self.assertRaises(json.JSONDecodeError):
+                    read(JSONStreamReader(io.StringIO(invalid_document), chunk_size=2))
+
+        reader = JSONStreamReader(io.StringIO('{"a": 1} \n'), chunk_size=2)
+        read(reader)
+        reader.expect_end()
+
+        reader = JSONStreamReader(io.StringIO('{"a": 1} {'), chunk_size=2)
+        read(reader)
+
+        with self.assertRaises(json.JSONDecodeError):
+            reader.expect_end()
+
+    def test_version_satisfies(self):
+        """Ensures versions are correctly checked against exact versions and version ranges"""
+        for version, specification, expected in (
+            ("0.7.0", "0.7.0", True),
+            ("0.7.0", "0.7", False),
+            ("0.7.0", "==0.7", True),
+            ("0.7.0", "0.7.1", False),
+            ("0.7.0rc1", "0.7.0rc1", True),
+            ("0.7.0rc1", "0.7.0", False),
+            ("0.7.0rc1", "==0.7.0", False),
+            ("0.7.0rc1", ">=0.7.0", False),
+            ("0.7.0rc1", ">=0.7.0rc1", True),
+            ("0.7.0rc2", ">0.7.0rc1", True),
+            ("0.7.0.dev1", "<0.7.0a1", True),
+            ("0.8.0rc1", "<0.8", False),
+            ("0.8.0rc1", "<0.8.0rc2", True),
+            ("0.7.0.post1", ">0.7.0", False),
+            ("0.7.0.post1", ">=0.7.0", True),
+            ("0.7.0+local", "==0.7.0", True),
+            ("1!0.1", ">2.0", True),
+            ("0.7.0", ">=0.6, <0.8", True),
+            ("0.8.0", ">=0.6, <0.8", False),
+            ("0.7.5", "~=0.7.1", True),
+            ("0.8.0", "~=0.7.1", False),
+            ("1.2", "~=1", True),
+            ("0.7.0", "!=0.7.0", False),
+            ("0.7.0", ">0.6.9", True),
+            ("0.7.0", "<=0.6.9", False),
+            ("0.7.1", "==0.7.*", True),
+            ("0.7", "==0.7.*", True),
+            ("0.7.0rc1", "==0.7.*", True),
+            ("0.7.0+local", "==0.7.*", True),
+            ("0.8.0", "==0.7.*", False),
+            ("0.70.0", "==0.7.*", False),
+            ("1", "==1.0.*", True),
+            ("1!0.7.0", "==0.7.*", False),
+            ("1!0.7.0", "==1!0.7.*", True),
+            ("0.7.1", "!=0.7.*", False),
+            ("0.8.0", "!=0.7.*", True),
+            ("0.7.1", ">=0.6, !=0.6.*", True),
+            ("0.6.5", ">=0.6, !=0.6.*", False),
+        ):
+            with self.subTest(version=version, specification=specification):
+                self.assertEqual(version_satisfies(version, specification), expected)
+
+    def test_version_satisfies_with_invalid_specification(self):
+        """Ensures an error is raised for invalid version specifications"""
+        for specification in ("=>0.7", "latest", "0.7,", ">=0.7-final", ">=0.7.*", "~=0.7.*", "==0.7rc1.*", "==0.*.1"):
+            with self.subTest(specification=specification):
+                with self.assertRaises(ValueError):
+                    version_satisfies("0.7.0", specification)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,12 +1,46 @@
-from . import (
-    exceptions,  # noqa: F401
-    utils,  # noqa: F401
-)
-from .twine import (  # noqa: F401
-    ALL_STRANDS,
-    CHILDREN_STRANDS,
-    CREDENTIAL_STRANDS,
-    MANIFEST_STRANDS,
-    SCHEMA_STRANDS,
-    Twine,
-)
+import sys
+
+from . import utils  # noqa: F401
+
+# The exceptions and the `Twine` class depend on `jsonschema` (and its `referencing` stack) and `dotenv`, so they're
+# imported on first access rather than with the package to keep `import twined` fast for callers that don't need them.
+_LAZY_SUBMODULES = ("arrays", "bulk", "cache", "compiler", "exceptions", "incremental", "migrations", "schema", "twine")
+
+_LAZY_ATTRIBUTES = {
+    "ALL_STRANDS": "twine",
+    "CHILDREN_STRANDS": "twine",
+    "CollectedErrors": "twine",
+    "CREDENTIAL_STRANDS": "twine",
+    "ErrorRecord": "twine",
+    "MANIFEST_STRANDS": "twine",
+    "SCHEMA_STRANDS": "twine",
+    "SourceCache": "cache",
+    "Twine": "twine",
+    "TwineCache": "cache",
+    "ValidationResult": "twine",
+}
+
+
+def _import_submodule(name):
+    """Import a submodule of this package. `__import__` is used rather than `importlib.import_module` so the import is
+    recorded by `python -X importtime`.
+
+    :param str name:
+    :return module:
+    """
+    __import__(f"{__name__}.{name}")
+    return sys.modules[f"{__name__}.{name}"]
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return _import_submodule(name)
+
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(_import_submodule(_LAZY_ATTRIBUTES[name]), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_SUBMODULES, *_LAZY_ATTRIBUTES})
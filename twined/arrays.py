@@ -0,0 +1,286 @@
+"""Validate values containing numpy arrays without converting the arrays to lists first.
+
+The validators for values strands are extended so numpy arrays count as JSON arrays and numpy scalars as the equivalent
+JSON numbers and booleans. The items of an array are checked with vectorised checks on the whole array when their
+schema only constrains their type (to numbers or integers), their range (with `minimum`, `maximum`, `exclusiveMinimum`
+and `exclusiveMaximum`) and, for the rows of multidimensional arrays, their length (with `minItems` and `maxItems`).
+Only the items found to be invalid are then validated one by one to produce the same errors `jsonschema` would.
+Items with other schemas are validated one by one.
+
+numpy is never imported here - if it hasn't been imported, there can't be any numpy arrays to validate.
+"""
+
+import functools
+import math
+import numbers
+import sys
+
+from jsonschema.validators import extend
+
+# Keywords that don't affect validation.
+ANNOTATION_KEYWORDS = {"$comment", "default", "deprecated", "description", "examples", "readOnly", "title", "writeOnly"}
+
+RANGE_KEYWORDS = ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")
+
+# Keywords that can be checked on all the items of an array at once.
+VECTORISABLE_KEYWORDS = {"type", "items", "minItems", "maxItems", *RANGE_KEYWORDS, *ANNOTATION_KEYWORDS}
+
+# Keywords whose implementations compare whole instances, so are given arrays as lists.
+WHOLE_INSTANCE_KEYWORDS = ("const", "enum", "uniqueItems")
+
+
+@functools.lru_cache(maxsize=None)
+def get_array_validator_class(validator_class):
+    """Extend a `jsonschema` validator class to validate numpy arrays and scalars as JSON arrays, numbers and booleans.
+
+    :param type validator_class: a `jsonschema` validator class (e.g. `Draft202012Validator`)
+    :return type: the extended validator class, whose `BASE_VALIDATOR_CLASS` attribute is the given class
+    """
+    base_type_checker = validator_class.TYPE_CHECKER
+
+    def is_array(checker, instance):
+        return base_type_checker.is_type(instance, "array") or _is_ndarray(instance)
+
+    def is_boolean(checker, instance):
+        return base_type_checker.is_type(instance, "boolean") or _is_numpy_instance(instance, "bool_")
+
+    def is_integer(checker, instance):
+        return (
+            base_type_checker.is_type(instance, "integer")
+            or _is_numpy_instance(instance, "integer")
+            or (_is_numpy_instance(instance, "floating") and instance.is_integer())
+        )
+
+    validators = {}
+
+    if "items" in validator_class.VALIDATORS:
+        validators["items"] = _vectorise_items(validator_class.VALIDATORS["items"])
+
+    for keyword in WHOLE_INSTANCE_KEYWORDS:
+        if keyword in validator_class.VALIDATORS:
+            validators[keyword] = _convert_arrays_to_lists(validator_class.VALIDATORS[keyword])
+
+    array_validator_class = extend(
+        validator_class,
+        validators=validators,
+        type_checker=base_type_checker.redefine_many({"array": is_array, "boolean": is_boolean, "integer": is_integer}),
+    )
+
+    array_validator_class.__name__ = array_validator_class.__qualname__ = f"Array{validator_class.__name__}"
+    array_validator_class.BASE_VALIDATOR_CLASS = validator_class
+    return array_validator_class
+
+
+def contains_numpy_objects(instance):
+    """Check whether an instance contains any numpy arrays or scalars.
+
+    :param any instance:
+    :return bool:
+    """
+    if "numpy" not in sys.modules:
+        return False
+
+    if _is_numpy_instance(instance, "ndarray") or _is_numpy_instance(instance, "generic"):
+        return True
+
+    if isinstance(instance, dict):
+        return any(contains_numpy_objects(value) for value in instance.values())
+
+    if isinstance(instance, list):
+        return any(contains_numpy_objects(item) for item in instance)
+
+    return False
+
+
+def _vectorise_items(items_validator):
+    """Wrap the implementation of the "items" keyword so the items of numpy arrays are checked with vectorised checks
+    where possible, validating only the invalid items one by one.
+
+    :param callable items_validator:
+    :return callable:
+    """
+
+    def items(validator, items, instance, schema):
+        if not _is_ndarray(instance) or not isinstance(items, dict) or "prefixItems" in schema:
+            return items_validator(validator, items, instance, schema)
+
+        invalid_indices = _find_invalid_items(sys.modules["numpy"], instance, items)
+
+        if invalid_indices is None:
+            indices = range(len(instance))
+        else:
+            indices = invalid_indices.tolist()
+
+        return (
+            error for index in indices for error in validator.descend(_get_item(instance, index), items, path=index)
+        )
+
+    return items
+
+
+def _convert_arrays_to_lists(keyword_validator):
+    """Wrap the implementation of a keyword so it's given numpy arrays as lists.
+
+    :param callable keyword_validator:
+    :return callable:
+    """
+
+    def validate(validator, value, instance, schema):
+        if _is_ndarray(instance):
+            instance = instance.tolist()
+
+        return keyword_validator(validator, value, instance, schema)
+
+    return validate
+
+
+def _find_invalid_items(numpy, array, schema):
+    """Find the items of an array (along its first axis) that are invalid against a schema with vectorised checks.
+
+    :param module numpy:
+    :param numpy.ndarray array:
+    :param any schema: the schema of the items
+    :return numpy.ndarray|None: the indices of the invalid items, or `None` if the schema can't be checked vectorised
+    """
+    if not isinstance(schema, dict) or not schema.keys() <= VECTORISABLE_KEYWORDS:
+        return None
+
+    types = schema.get("type")
+
+    if isinstance(types, str):
+        types = [types]
+
+    # The items of multidimensional arrays are arrays. Range keywords only apply to numbers, so they're ignored.
+    if array.ndim > 1:
+        if types is not None and "array" not in types:
+            return None
+
+        row_length = array.shape[1]
+
+        if row_length < schema.get("minItems", 0) or row_length > schema.get("maxItems", math.inf):
+            return numpy.arange(len(array))
+
+        if "items" not in schema or row_length == 0:
+            return numpy.arange(0)
+
+        # The items of all the rows are checked at once.
+        invalid_indices = _find_invalid_items(numpy, array.reshape(-1, *array.shape[2:]), schema["items"])
+
+        if invalid_indices is None:
+            return None
+
+        return numpy.unique(invalid_indices // row_length)
+
+    # Booleans aren't numbers in JSON, and other kinds of items aren't checked vectorised.
+    if array.dtype.kind not in "iuf":
+        return None
+
+    check_integers = False
+
+    if types is not None:
+        if "number" in types:
+            pass
+        elif "integer" in types:
+            check_integers = array.dtype.kind == "f"
+        else:
+            return None
+
+    invalid = numpy.zeros(len(array), dtype=bool)
+
+    if check_integers:
+        invalid |= ~(numpy.isfinite(array) & (array == numpy.floor(array)))
+
+    for keyword in RANGE_KEYWORDS:
+        if keyword not in schema:
+            continue
+
+        invalid_range = _find_out_of_range(numpy, array, keyword, schema[keyword])
+
+        if invalid_range is None:
+            return None
+
+        invalid |= invalid_range
+
+    return numpy.flatnonzero(invalid)
+
+
+def _find_out_of_range(numpy, array, keyword, bound):
+    """Find which numbers in a one-dimensional array are out of the range given by a range keyword. The comparisons are
+    exact, as they are between the python numbers the array's items would be converted to by `tolist`.
+
+    :param module numpy:
+    :param numpy.ndarray array: an array of integers or floats
+    :param str keyword: one of `RANGE_KEYWORDS`
+    :param any bound: the value of the keyword
+    :return numpy.ndarray|None: a boolean mask of the numbers out of range, or `None` if the bound isn't a real number
+        (e.g. the boolean `exclusiveMinimum` of draft 4)
+    """
+    if isinstance(bound, bool) or not isinstance(bound, numbers.Real):
+        return None
+
+    comparisons = {
+        "minimum": numpy.less,
+        "maximum": numpy.greater,
+        "exclusiveMinimum": numpy.less_equal,
+        "exclusiveMaximum": numpy.greater_equal,
+    }
+
+    try:
+        if array.dtype.kind == "f":
+            # Python compares floats with integers exactly, so integer bounds that can't be represented exactly by a
+            # float aren't checked vectorised.
+            if isinstance(bound, numbers.Integral) and float(bound) != bound:
+                return None
+
+            # Comparing with a 64-bit float converts the items to 64-bit floats as `tolist` does.
+            bound = numpy.float64(bound)
+
+        elif not isinstance(bound, numbers.Integral):
+            # Integers are only compared with integers, so large integers aren't rounded to floats. The bound is rounded
+            # in the direction that leaves the result of comparing it with any integer unchanged.
+            if keyword in {"minimum", "exclusiveMaximum"}:
+                bound = math.ceil(bound)
+            else:
+                bound = math.floor(bound)
+
+        return comparisons[keyword](array, bound)
+
+    # Raised for non-finite bounds and bounds outside the range of the array's type (in older versions of numpy).
+    except (OverflowError, ValueError):
+        return None
+
+
+def _get_item(array, index):
+    """Get an item of an array as the python object `tolist` would convert it to, so items are validated (and appear in
+    errors) exactly as they would be if the array were a list.
+
+    :param numpy.ndarray array:
+    :param int index:
+    :return any:
+    """
+    item = array[index]
+
+    if _is_numpy_instance(item, "ndarray") or _is_numpy_instance(item, "generic"):
+        return item.tolist()
+
+    return item
+
+
+def _is_ndarray(instance):
+    """Check whether an instance is a numpy array of at least one dimension (zero-dimensional arrays are scalars).
+
+    :param any instance:
+    :return bool:
+    """
+    return _is_numpy_instance(instance, "ndarray") and instance.ndim > 0
+
+
+def _is_numpy_instance(instance, type_name):
+    """Check whether an instance is an instance of the given numpy type, without importing numpy.
+
+    :param any instance:
+    :param str type_name: the name of the type in the `numpy` module (e.g. "ndarray")
+    :return bool:
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(instance, getattr(numpy, type_name))
@@ -0,0 +1,153 @@
+"""Validate large numbers of files (e.g. archived manifests or values) against a twine in parallel processes.
+
+Usage:
+```
+from twined.bulk import validate_files
+
+for result in validate_files("twine.json", "input_manifest", ["archive/"], max_workers=8):
+    if result.error:
+        print(result.path, result.error)
+```
+"""
+
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import itertools
+import os
+
+from twined import exceptions
+from twined.twine import ALL_STRANDS, CREDENTIAL_STRANDS, Twine
+from twined.utils import JSON_FILE_SUFFIXES
+
+BulkValidationResult = namedtuple("BulkValidationResult", ["path", "error"])
+
+# The twine used by each worker process, created once per process by `_initialise_worker`.
+_worker_twine = None
+
+
+def validate_files(
+    twine_source,
+    strand,
+    paths,
+    *,
+    max_workers=None,
+    chunksize=16,
+    pattern=JSON_FILE_SUFFIXES,
+    twine_kwargs=None,
+):
+    """Validate files against a strand of a twine in a pool of processes, yielding the result for each file as soon as
+    the chunk of files it's in has been validated. Each process loads the twine once and validates chunks of files
+    with it until there are none left. Only a few chunks per process are queued at a time, so any number of paths can
+    be given.
+
+    :param str|dict twine_source: the twine to validate the files against (a *.json filename, a json string or a dict)
+    :param str strand: the name of the strand to validate the files against (e.g. "input_manifest" or "output_values")
+    :param iter(str) paths: paths of files to validate and of directories to search recursively for files to validate
+    :param int|None max_workers: the number of processes to use (defaults to the number of processors)
+    :param int chunksize: the number of files each process validates per task
+    :param str|tuple(str) pattern: the suffix (or suffixes) of the files to validate in the given directories; by
+        default, JSON files and compressed JSON files (e.g. *.json.gz)
+    :param dict|None twine_kwargs: keyword arguments to create the twine with in each process
+    :raise twined.exceptions.UnknownStrand: if the strand can't be validated from files
+    :raise twined.exceptions.InvalidTwine: if the twine is invalid
+    :raise jsonschema.exceptions.SchemaError: if the schema of one of the twine's strands is invalid
+    :return iter(BulkValidationResult): the path of each file and `None` or the exception raised by validating it
+    """
+    if strand not in ALL_STRANDS or strand in CREDENTIAL_STRANDS:
+        raise exceptions.UnknownStrand(f"Cannot validate {strand!r} files. Try one of {ALL_STRANDS}.")
+
+    # Load the twine here first so an invalid twine or strand schema raises its own error rather than breaking every
+    # worker process (which would only raise a `BrokenProcessPool` error here).
+    twine_kwargs = twine_kwargs or {}
+    Twine(source=twine_source, **twine_kwargs).warm()
+
+    max_workers = max_workers or os.cpu_count() or 1
+    maximum_pending_chunks = max_workers * 2
+    chunks = _chunk(_iter_files(paths, pattern), chunksize)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_initialise_worker,
+        initargs=(twine_source, twine_kwargs),
+    ) as executor:
+        pending = set()
+
+        while True:
+            for chunk in itertools.islice(chunks, maximum_pending_chunks - len(pending)):
+                pending.add(executor.submit(_validate_chunk, strand, chunk))
+
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                yield from future.result()
+
+
+def _iter_files(paths, pattern):
+    """Iterate over the given file paths and the paths of the files ending in the pattern in the given directories.
+
+    :param iter(str) paths:
+    :param str|tuple(str) pattern:
+    :return iter(str):
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for directory, _, filenames in os.walk(path):
+            for filename in sorted(filenames):
+                if filename.endswith(pattern):
+                    yield os.path.join(directory, filename)
+
+
+def _chunk(iterable, size):
+    """Split an iterable into lists of the given size (the last of which may be shorter).
+
+    :param iter iterable:
+    :param int size:
+    :return iter(list):
+    """
+    iterator = iter(iterable)
+
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _initialise_worker(twine_source, twine_kwargs):
+    """Load the twine for a worker process.
+
+    :param str|dict twine_source:
+    :param dict twine_kwargs:
+    :return None:
+    """
+    global _worker_twine
+    _worker_twine = Twine(source=twine_source, **twine_kwargs)
+    _worker_twine.warm()
+
+
+def _validate_chunk(strand, paths):
+    """Validate a chunk of files against a strand of the worker's twine, recording the error raised for each file
+    that's invalid or can't be read.
+
+    :param str strand:
+    :param list(str) paths:
+    :return list(BulkValidationResult):
+    """
+    validate = getattr(_worker_twine, f"validate_{strand}")
+    results = []
+
+    for path in paths:
+        try:
+            validate(path)
+            results.append(BulkValidationResult(path, None))
+
+        # Duplicate keys in JSON files raise a `KeyError`. Files that can't be read (e.g. because of their permissions)
+        # raise an `OSError` and anything the twine doesn't map to its own exceptions is reported too, so one bad file
+        # can't stop the rest from being validated.
+        except (exceptions.TwineException, KeyError, OSError, EOFError, ValueError) as e:
+            results.append(BulkValidationResult(path, e))
+
+    return results
@@ -0,0 +1,264 @@
+"""Thread-safe, least-recently-used caches of twines (shared between callers as frozen, warmed twines) and of data
+loaded from JSON sources.
+"""
+
+from collections import OrderedDict, namedtuple
+import functools
+import hashlib
+import json as jsonlib
+import os
+import threading
+
+from .twine import Twine
+from .utils import JSON_FILE_SUFFIXES, freeze, load_json
+
+TwineCacheInfo = namedtuple("TwineCacheInfo", ["hits", "misses", "size", "maxsize"])
+SourceCacheInfo = namedtuple("SourceCacheInfo", ["hits", "misses", "size", "maxsize", "memory", "max_memory"])
+
+
+def _get_source_key(source):
+    """Get a key identifying the content of a JSON source - the path, modification time and size of a *.json file, or
+    the hash of a JSON string or bytes-like object - so changed files are reloaded.
+
+    :param any source:
+    :return tuple|None: the key, or `None` if the source is of another kind or is a file that can't be found (leaving
+        the error to be raised when the source is loaded)
+    """
+    if isinstance(source, str):
+        if source.endswith(JSON_FILE_SUFFIXES):
+            try:
+                stat = os.stat(source)
+            except OSError:
+                return None
+
+            return ("filename", os.path.realpath(source), stat.st_mtime_ns, stat.st_size)
+
+        return ("string", hashlib.sha256(source.encode("utf-8", "surrogatepass")).hexdigest())
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return ("bytes", hashlib.sha256(source).hexdigest())
+
+    return None
+
+
+class _LRUCache:
+    """A thread-safe, least-recently-used cache of values, each with an estimated size in bytes. The least recently used
+    values are evicted when there are more than `maxsize` of them or their total size exceeds `max_memory`.
+
+    :param int maxsize: the maximum number of values to keep in the cache
+    :param int|None max_memory: the maximum total size (in bytes) of the cached values (unlimited if `None`); values
+        larger than this are never cached
+    :return None:
+    """
+
+    def __init__(self, maxsize, max_memory=None):
+        self.maxsize = maxsize
+        self.max_memory = max_memory
+        self._entries = OrderedDict()
+        self._memory = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def clear(self):
+        """Remove everything from the cache and reset its statistics.
+
+        :return None:
+        """
+        with self._lock:
+            self._entries.clear()
+            self._memory = 0
+            self._hits = 0
+            self._misses = 0
+
+    def _get(self, key, load):
+        """Get the value for a key from the cache, loading and caching it if it isn't cached. The value is loaded
+        outside the lock so other values can be retrieved meanwhile; if another thread caches a value for the same key
+        first, that value is returned instead.
+
+        :param hashable key:
+        :param callable load: a function taking no arguments and returning the value and its estimated size in bytes
+        :return any:
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+
+            self._misses += 1
+
+        value, size = load()
+
+        if self.max_memory is not None and size > self.max_memory:
+            return value
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self._memory += size
+
+            self._entries.move_to_end(key)
+            value = self._entries[key][0]
+
+            while self._entries and (
+                len(self._entries) > self.maxsize or (self.max_memory is not None and self._memory > self.max_memory)
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._memory -= evicted_size
+
+        return value
+
+
+class TwineCache(_LRUCache):
+    """A thread-safe, least-recently-used cache of warmed, frozen twines keyed on the content of their sources.
+
+    :param int maxsize: the maximum number of twines to keep in the cache
+    :return None:
+    """
+
+    def __init__(self, maxsize=128):
+        super().__init__(maxsize)
+
+    def get(self, source=None, offline=False):
+        """Get the twine for the given source from the cache, loading, warming and freezing it if it isn't cached.
+
+        :param str|dict|None source: a *.json filename, a json string or a dict (file-like sources aren't cached)
+        :param bool offline: if `True`, raise an error instead of fetching any schema that isn't bundled with twined
+        :return Twine:
+        """
+        key = self._get_key(source, offline)
+
+        if key is None:
+            return Twine(source=source, offline=offline)
+
+        return self._get(key, functools.partial(self._load, source, offline))
+
+    def cache_info(self):
+        """Get statistics on the use of the cache.
+
+        :return TwineCacheInfo: the number of cache hits and misses, the number of cached twines and the maximum size
+        """
+        with self._lock:
+            return TwineCacheInfo(self._hits, self._misses, len(self._entries), self.maxsize)
+
+    @staticmethod
+    def _load(source, offline):
+        """Load, freeze and warm a twine. Freezing it copies its strands, so they can't be changed through a dict source
+        either.
+
+        :param str|dict|None source:
+        :param bool offline:
+        :return (Twine, int): the twine and its size (twines don't count towards a memory limit)
+        """
+        twine = Twine(source=source, offline=offline)
+        twine._freeze()
+        twine.warm()
+        return twine, 0
+
+    @staticmethod
+    def _get_key(source, offline):
+        """Get the cache key for a twine source, or `None` if the source can't be cached.
+
+        :param any source:
+        :param bool offline:
+        :return tuple|None:
+        """
+        if source is None:
+            return ("empty", offline)
+
+        if isinstance(source, dict):
+            try:
+                content = jsonlib.dumps(source, sort_keys=True, separators=(",", ":"))
+            except (TypeError, ValueError):
+                return None
+
+            return ("object", hashlib.sha256(content.encode()).hexdigest(), offline)
+
+        if not isinstance(source, str):
+            return None
+
+        key = _get_source_key(source)
+
+        if key is None:
+            return None
+
+        return (*key, offline)
+
+
+class SourceCache(_LRUCache):
+    """A thread-safe, least-recently-used cache of data loaded from JSON sources. Files are cached on their path,
+    modification time and size (so they're reloaded if they change) and strings and bytes-like sources on the hash of
+    their content, in both cases along with the keyword arguments they're loaded with. Other sources (e.g. file-like
+    objects) aren't cached.
+
+    Cached data is shared between callers, so it's returned read-only (see `twined.utils.freeze`); copy it to modify it.
+    The least recently used data is evicted when there are more than `maxsize` sources cached or the estimated memory
+    used by the cached data exceeds `max_memory`.
+
+    :param int maxsize: the maximum number of sources to keep in the cache
+    :param int max_memory: the maximum estimated memory (in bytes) for the cached data to use; data larger than this is
+        never cached
+    :return None:
+    """
+
+    def __init__(self, maxsize=128, max_memory=256 * 1024 * 1024):
+        super().__init__(maxsize, max_memory)
+
+    def load(self, source, **kwargs):
+        """Load data from a JSON source, taking it from the cache if the source has been loaded with the same keyword
+        arguments before.
+
+        :param any source: a *.json filename, a json string, a bytes-like object or any source `load_json` accepts
+        :param kwargs: keyword arguments passed to `load_json`
+        :return any: the data, which is read-only if the source can be cached
+        """
+        key = self._get_key(source, kwargs)
+
+        if key is None:
+            return load_json(source, **kwargs)
+
+        return self._get(key, lambda: freeze(load_json(source, **kwargs)))
+
+    def cache_info(self):
+        """Get statistics on the use of the cache.
+
+        :return SourceCacheInfo: the number of cache hits and misses, the number of cached sources, the maximum size,
+            the estimated memory used by the cached data and the maximum memory
+        """
+        with self._lock:
+            return SourceCacheInfo(
+                self._hits,
+                self._misses,
+                len(self._entries),
+                self.maxsize,
+                self._memory,
+                self.max_memory,
+            )
+
+    @staticmethod
+    def _get_key(source, kwargs):
+        """Get the cache key for a source and the keyword arguments it's loaded with, or `None` if it can't be cached.
+
+        :param any source:
+        :param dict kwargs:
+        :return tuple|None:
+        """
+        kwargs_key = tuple(sorted(kwargs.items()))
+
+        try:
+            hash(kwargs_key)
+        except TypeError:
+            return None
+
+        key = _get_source_key(source)
+
+        if key is None:
+            return None
+
+        return (*key, kwargs_key)
+
+
+twine_cache = TwineCache()
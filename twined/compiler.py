@@ -0,0 +1,605 @@
+"""Compile JSON schemas into specialised Python functions that check instances with inlined type, required-key and
+range checks instead of dispatching on keywords generically like `jsonschema` does.
+
+Compiled functions only say whether an instance is valid. When an instance is invalid, its errors are produced by the
+`jsonschema` validator the schema was compiled from so they're identical to those produced without compilation.
+"""
+
+from collections.abc import Mapping, Sequence
+import functools
+import hashlib
+import importlib.metadata
+import json
+import logging
+import math
+from numbers import Number
+import os
+import re
+import shutil
+import stat
+import tempfile
+import time
+
+from jsonschema.validators import Draft6Validator, Draft7Validator, Draft201909Validator, Draft202012Validator
+
+from twined import exceptions
+from twined.arrays import contains_numpy_objects
+from twined.utils import get_installed_twined_version
+
+logger = logging.getLogger(__name__)
+
+
+# The number of seconds after which the cache entries for other versions of twined and jsonschema are removed if they
+# haven't been written to.
+STALE_DIRECTORY_AGE = 30 * 24 * 60 * 60
+
+# Validator classes whose semantics for the supported keywords are implemented by the compiler.
+SUPPORTED_VALIDATOR_CLASSES = (Draft6Validator, Draft7Validator, Draft201909Validator, Draft202012Validator)
+
+SUPPORTED_KEYWORDS = {
+    "additionalProperties",
+    "const",
+    "enum",
+    "exclusiveMaximum",
+    "exclusiveMinimum",
+    "format",  # Formats are only annotations unless the validator has a format checker.
+    "items",
+    "maxItems",
+    "maxLength",
+    "maxProperties",
+    "maximum",
+    "minItems",
+    "minLength",
+    "minProperties",
+    "minimum",
+    "multipleOf",
+    "pattern",
+    "properties",
+    "required",
+    "type",
+}
+
+TYPE_CHECKS = {
+    "array": "isinstance({0}, list)",
+    "boolean": "isinstance({0}, bool)",
+    "integer": "(isinstance({0}, int) and not isinstance({0}, bool) or isinstance({0}, float) and {0}.is_integer())",
+    "null": "{0} is None",
+    "number": "(isinstance({0}, Number) and not isinstance({0}, bool))",
+    "object": "isinstance({0}, dict)",
+    "string": "isinstance({0}, str)",
+}
+
+
+class CompiledValidator:
+    """A validator using a function compiled from its schema to check instances, and the `jsonschema` validator the
+    function was compiled from to produce errors for invalid instances.
+
+    :param jsonschema.protocols.Validator validator: the validator the function was compiled from
+    :param callable function: the compiled function, returning `True` if an instance is valid
+    :param str source: the Python source of the compiled function
+    :param dict constants: the values of the constants used by the compiled function, keyed on name
+    :return None:
+    """
+
+    def __init__(self, validator, function, source, constants):
+        self.validator = validator
+        self.schema = validator.schema
+        self.function = function
+        self.source = source
+        self.constants = constants
+
+    def is_valid(self, instance):
+        """Check whether the instance is valid. Compiled functions only accept JSON types, so instances they reject that
+        contain numpy arrays or scalars are checked by the validator too.
+
+        :param any instance:
+        :return bool:
+        """
+        if self.function(instance):
+            return True
+
+        return contains_numpy_objects(instance) and self.validator.is_valid(instance)
+
+    def iter_errors(self, instance):
+        """Iterate over the validation errors for the instance.
+
+        :param any instance:
+        :return iter(jsonschema.exceptions.ValidationError):
+        """
+        if self.function(instance):
+            return iter(())
+
+        return self.validator.iter_errors(instance)
+
+    def validate(self, instance):
+        """Validate the instance.
+
+        :param any instance:
+        :raise jsonschema.exceptions.ValidationError: if the instance is invalid
+        :return None:
+        """
+        if not self.function(instance):
+            self.validator.validate(instance)
+
+
+def compile_validator(validator):
+    """Compile the schema of a `jsonschema` validator into a specialised Python function.
+
+    :param jsonschema.protocols.Validator validator: the validator whose schema should be compiled
+    :raise twined.exceptions.UnsupportedSchema: if the schema uses keywords or a draft the compiler doesn't support
+    :return CompiledValidator:
+    """
+    # Validators extended to validate numpy arrays (see `twined.arrays`) are compiled like the class they extend.
+    if getattr(type(validator), "BASE_VALIDATOR_CLASS", type(validator)) not in SUPPORTED_VALIDATOR_CLASSES:
+        raise exceptions.UnsupportedSchema(f"Schemas using {type(validator).__name__} can't be compiled.")
+
+    supported_keywords = SUPPORTED_KEYWORDS
+
+    if validator.format_checker is not None:
+        supported_keywords = supported_keywords - {"format"}
+
+    generator = _CodeGenerator(known_keywords=set(type(validator).VALIDATORS), supported_keywords=supported_keywords)
+    source = generator.generate(validator.schema)
+    logger.debug("Compiled schema into:\n%s", source)
+    return _load_compiled_validator(validator, source, generator.constants)
+
+
+def _load_compiled_validator(validator, source, constants):
+    """Load the function in the given source into a compiled validator.
+
+    :param jsonschema.protocols.Validator validator: the validator the function was compiled from
+    :param str source: the Python source of the compiled function
+    :param dict constants: the values of the constants used by the compiled function, keyed on name
+    :return CompiledValidator:
+    """
+    namespace = {"Number": Number, "equal": equal, **constants}
+    exec(compile(source, "<twined.compiler>", "exec"), namespace)
+    return CompiledValidator(validator, namespace["validate"], source, constants)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_versioned_directory_name():
+    """Get the name of the compiler cache subdirectory for the installed versions of twined and jsonschema.
+
+    :return str:
+    """
+    return f"twined-{get_installed_twined_version()}_jsonschema-{importlib.metadata.version('jsonschema')}"
+
+
+class CompilerCache:
+    """An on-disk cache of compiled validators, allowing new processes to skip checking and compiling schemas that
+    have been compiled before. Entries are keyed on the schema and the kind of validator it was compiled from, and are
+    kept in a subdirectory for the installed versions of twined and jsonschema, so entries from other versions are never
+    used. Subdirectories for other versions that haven't been written to for `STALE_DIRECTORY_AGE` seconds are removed
+    when the cache is first written to. Subdirectories written to more recently are kept, so processes running different
+    versions (e.g. during a rolling deployment) can share the cache without removing each other's entries.
+
+    Entries contain Python source that's executed when they're loaded, so an entry is only loaded if it, the cache
+    directory and the subdirectory it's in are owned by the current user and aren't writable by its group or other users
+    (otherwise it's treated as a cache miss). The directories are created with those permissions if they don't exist.
+
+    :param str directory: the path of the directory to keep the cache in
+    :return None:
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.versioned_directory = os.path.join(directory, _get_versioned_directory_name())
+        self._pruned = False
+
+    def load(self, validator):
+        """Load the compiled validator for the given validator's schema if it's in the cache.
+
+        :param jsonschema.protocols.Validator validator:
+        :return CompiledValidator|None:
+        """
+        try:
+            with open(self._get_path(validator)) as f:
+                # The entry is checked through the open file so it can't be swapped for another file after the check.
+                stat_results = (os.stat(self.directory), os.stat(self.versioned_directory), os.fstat(f.fileno()))
+
+                if not all(_is_trusted(stat_result) for stat_result in stat_results):
+                    logger.warning(
+                        "Ignoring compiler cache entry for schema %r as it or the cache directory %r isn't owned by "
+                        "the current user or is writable by other users.",
+                        validator.schema,
+                        self.directory,
+                    )
+                    return None
+
+                entry = json.load(f)
+
+            constants = {name: self._deserialise_constant(constant) for name, constant in entry["constants"].items()}
+            return _load_compiled_validator(validator, entry["source"], constants)
+
+        except FileNotFoundError:
+            return None
+
+        except Exception as e:
+            logger.warning("Ignoring corrupt compiler cache entry for schema %r: %s", validator.schema, e)
+            return None
+
+    def save(self, compiled_validator):
+        """Save a compiled validator to the cache. The entry is written to a temporary file and moved into place so
+        other processes never read a partially written entry.
+
+        :param CompiledValidator compiled_validator:
+        :return None:
+        """
+        entry = {
+            "source": compiled_validator.source,
+            "constants": {
+                name: self._serialise_constant(constant) for name, constant in compiled_validator.constants.items()
+            },
+        }
+
+        temporary_path = None
+
+        try:
+            self._prune()
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            os.makedirs(self.versioned_directory, mode=0o700, exist_ok=True)
+
+            with tempfile.NamedTemporaryFile("w", dir=self.versioned_directory, suffix=".tmp", delete=False) as f:
+                temporary_path = f.name
+                json.dump(entry, f)
+
+            os.replace(temporary_path, self._get_path(compiled_validator.validator))
+
+        except OSError as e:
+            logger.warning("Couldn't save compiled validator to the compiler cache at %r: %s", self.directory, e)
+
+            if temporary_path and os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def _get_path(self, validator):
+        """Get the path of the cache entry for the given validator's schema.
+
+        :param jsonschema.protocols.Validator validator:
+        :return str:
+        """
+        key = json.dumps(
+            {
+                "schema": validator.schema,
+                "validator": type(validator).__name__,
+                "format_checker": validator.format_checker is not None,
+            },
+            sort_keys=True,
+        )
+
+        return os.path.join(self.versioned_directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _prune(self):
+        """Remove the subdirectories for other versions of twined and jsonschema that haven't been written to for
+        `STALE_DIRECTORY_AGE` seconds.
+
+        :return None:
+        """
+        if self._pruned:
+            return
+
+        if os.path.isdir(self.directory):
+            stale_before = time.time() - STALE_DIRECTORY_AGE
+
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+
+                if not name.startswith("twined-") or path == self.versioned_directory:
+                    continue
+
+                try:
+                    if os.stat(path).st_mtime < stale_before:
+                        shutil.rmtree(path, ignore_errors=True)
+                except FileNotFoundError:
+                    # Another process removed it meanwhile.
+                    continue
+
+        self._pruned = True
+
+    @staticmethod
+    def _serialise_constant(constant):
+        if isinstance(constant, re.Pattern):
+            return {"pattern": constant.pattern}
+
+        if isinstance(constant, frozenset):
+            return {"frozenset": sorted(constant)}
+
+        return {"value": constant}
+
+    @staticmethod
+    def _deserialise_constant(serialised_constant):
+        if "pattern" in serialised_constant:
+            return re.compile(serialised_constant["pattern"])
+
+        if "frozenset" in serialised_constant:
+            return frozenset(serialised_constant["frozenset"])
+
+        return serialised_constant["value"]
+
+
+def _is_trusted(stat_result):
+    """Check whether a file or directory in the compiler cache is owned by the current user and isn't writable by its
+    group or other users. Ownership and permissions aren't checked on platforms without POSIX user IDs (e.g. Windows).
+
+    :param os.stat_result stat_result:
+    :return bool:
+    """
+    if not hasattr(os, "getuid"):
+        return True
+
+    return stat_result.st_uid == os.getuid() and not stat_result.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def equal(one, two):
+    """Check whether two JSON values are equal in the way JSON schema defines equality (e.g. `True` isn't equal to `1`).
+
+    :param any one:
+    :param any two:
+    :return bool:
+    """
+    if one is two:
+        return True
+
+    if isinstance(one, str) or isinstance(two, str):
+        return one == two
+
+    if isinstance(one, Sequence) and isinstance(two, Sequence):
+        return len(one) == len(two) and all(equal(i, j) for i, j in zip(one, two))
+
+    if isinstance(one, Mapping) and isinstance(two, Mapping):
+        return one.keys() == two.keys() and all(equal(one[key], two[key]) for key in one)
+
+    if isinstance(one, bool) or isinstance(two, bool):
+        return isinstance(one, bool) and isinstance(two, bool) and one == two
+
+    return one == two
+
+
+class _CodeGenerator:
+    """Generate the source of a function named `validate` checking instances against a schema.
+
+    :param set(str) known_keywords: the keywords the schema's draft defines, any unsupported ones of which prevent
+        compilation (unknown keywords are ignored, as they are by `jsonschema`)
+    :param set(str) supported_keywords: the keywords the generator can generate checks for
+    :return None:
+    """
+
+    def __init__(self, known_keywords, supported_keywords=SUPPORTED_KEYWORDS):
+        self.known_keywords = known_keywords
+        self.supported_keywords = supported_keywords
+        self.constants = {}
+        self._lines = []
+        self._variable_count = 0
+
+    def generate(self, schema):
+        """Generate the source of the function for the schema.
+
+        :param dict|bool schema:
+        :raise twined.exceptions.UnsupportedSchema: if the schema uses keywords the compiler doesn't support
+        :return str:
+        """
+        self._lines = ["def validate(data):"]
+        self._generate(schema, "data", 1)
+        self._emit(1, "return True")
+        return "\n".join(self._lines) + "\n"
+
+    def _emit(self, indent, line):
+        self._lines.append("    " * indent + line)
+
+    def _open_block(self, indent, *headers):
+        """Emit the header lines of a block, returning a marker for closing it with `_close_block`.
+
+        :param int indent:
+        :param str headers:
+        :return tuple(int, int):
+        """
+        for offset, header in enumerate(headers):
+            self._emit(indent + offset, header)
+
+        return len(self._lines), len(headers)
+
+    def _close_block(self, marker):
+        """Remove the header lines of a block if no checks were emitted in it.
+
+        :param tuple(int, int) marker:
+        :return None:
+        """
+        end_of_headers, number_of_headers = marker
+
+        if len(self._lines) == end_of_headers:
+            del self._lines[end_of_headers - number_of_headers :]
+
+    def _new_variable(self):
+        self._variable_count += 1
+        return f"data_{self._variable_count}"
+
+    def _add_constant(self, value):
+        name = f"constant_{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def _generate(self, schema, variable, indent):
+        """Emit checks that return `False` from the function if the value in the given variable doesn't match the
+        schema.
+
+        :param dict|bool schema:
+        :param str variable:
+        :param int indent:
+        :return None:
+        """
+        if schema is True:
+            return
+
+        if schema is False:
+            self._emit(indent, "return False")
+            return
+
+        if not isinstance(schema, dict):
+            raise exceptions.UnsupportedSchema(f"{schema!r} is not a valid schema.")
+
+        unsupported_keywords = (schema.keys() & self.known_keywords) - self.supported_keywords
+
+        if unsupported_keywords:
+            raise exceptions.UnsupportedSchema(f"Schemas using {sorted(unsupported_keywords)} can't be compiled.")
+
+        if "type" in schema:
+            self._generate_type(schema["type"], variable, indent)
+
+        if "const" in schema:
+            self._emit_check(indent, f"not equal({variable}, {self._add_constant(schema['const'])})")
+
+        if "enum" in schema:
+            self._emit_check(
+                indent, f"not any(equal({variable}, item) for item in {self._add_constant(schema['enum'])})"
+            )
+
+        self._generate_number_checks(schema, variable, indent)
+        self._generate_string_checks(schema, variable, indent)
+        self._generate_array_checks(schema, variable, indent)
+        self._generate_object_checks(schema, variable, indent)
+
+    def _generate_type(self, types, variable, indent):
+        if isinstance(types, str):
+            types = [types]
+
+        try:
+            checks = [TYPE_CHECKS[type_].format(variable) for type_ in types]
+        except (KeyError, TypeError):
+            raise exceptions.UnsupportedSchema(f"The type {types!r} can't be compiled.")
+
+        self._emit_check(indent, f"not ({' or '.join(checks) or 'False'})")
+
+    def _open_type_guard(self, schema, type_, variable, indent):
+        """Open a block that only applies its checks to values of the given type. The guard is omitted if the schema
+        already restricts values to that type.
+
+        :param dict schema:
+        :param str type_:
+        :param str variable:
+        :param int indent:
+        :return (tuple(int, int), int): a marker for closing the block and the indent of the checks in the block
+        """
+        implied_types = {"number": ("number", "integer")}.get(type_, (type_,))
+
+        if schema.get("type") in implied_types:
+            return self._open_block(indent), indent
+
+        return self._open_block(indent, f"if {TYPE_CHECKS[type_].format(variable)}:"), indent + 1
+
+    def _emit_check(self, indent, condition):
+        """Emit a check returning `False` from the function if the condition is true.
+
+        :param int indent:
+        :param str condition:
+        :return None:
+        """
+        self._emit(indent, f"if {condition}:")
+        self._emit(indent + 1, "return False")
+
+    def _generate_number_checks(self, schema, variable, indent):
+        comparisons = {"minimum": "<", "maximum": ">", "exclusiveMinimum": "<=", "exclusiveMaximum": ">="}
+        block, indent = self._open_type_guard(schema, "number", variable, indent)
+
+        for keyword in (*comparisons, "multipleOf"):
+            if keyword not in schema:
+                continue
+
+            limit = schema[keyword]
+
+            if isinstance(limit, bool) or not isinstance(limit, (int, float)):
+                # Draft 4 style boolean exclusive limits and other kinds of numbers (e.g. decimals) aren't supported.
+                raise exceptions.UnsupportedSchema(f"{keyword!r} must be an integer or a float to be compiled.")
+
+            if keyword == "multipleOf":
+                # Leave the edge cases of floating point division to `jsonschema`.
+                if not isinstance(limit, int):
+                    raise exceptions.UnsupportedSchema("Only integer 'multipleOf' values can be compiled.")
+
+                self._emit_check(indent, f"{variable} % {limit!r}")
+            else:
+                self._emit_check(indent, f"{variable} {comparisons[keyword]} {self._get_number_source(limit)}")
+
+        self._close_block(block)
+
+    def _get_number_source(self, number):
+        """Get the source to use for a number in the compiled function. Finite numbers are inlined, and infinity and NaN
+        (which have no literals, but are accepted by the standard library's JSON decoder) are passed in as constants.
+
+        :param int|float number:
+        :return str:
+        """
+        if isinstance(number, float) and not math.isfinite(number):
+            return self._add_constant(number)
+
+        return repr(number)
+
+    def _generate_string_checks(self, schema, variable, indent):
+        block, indent = self._open_type_guard(schema, "string", variable, indent)
+
+        if "minLength" in schema:
+            self._emit_check(indent, f"len({variable}) < {schema['minLength']!r}")
+
+        if "maxLength" in schema:
+            self._emit_check(indent, f"len({variable}) > {schema['maxLength']!r}")
+
+        if "pattern" in schema:
+            self._emit_check(indent, f"{self._add_constant(re.compile(schema['pattern']))}.search({variable}) is None")
+
+        self._close_block(block)
+
+    def _generate_array_checks(self, schema, variable, indent):
+        block, indent = self._open_type_guard(schema, "array", variable, indent)
+
+        if "minItems" in schema:
+            self._emit_check(indent, f"len({variable}) < {schema['minItems']!r}")
+
+        if "maxItems" in schema:
+            self._emit_check(indent, f"len({variable}) > {schema['maxItems']!r}")
+
+        if "items" in schema:
+            if isinstance(schema["items"], list):
+                raise exceptions.UnsupportedSchema("Tuple-style 'items' can't be compiled.")
+
+            item = self._new_variable()
+            items_block = self._open_block(indent, f"for {item} in {variable}:")
+            self._generate(schema["items"], item, indent + 1)
+            self._close_block(items_block)
+
+        self._close_block(block)
+
+    def _generate_object_checks(self, schema, variable, indent):
+        block, indent = self._open_type_guard(schema, "object", variable, indent)
+
+        for required in schema.get("required", []):
+            self._emit_check(indent, f"{required!r} not in {variable}")
+
+        if "minProperties" in schema:
+            self._emit_check(indent, f"len({variable}) < {schema['minProperties']!r}")
+
+        if "maxProperties" in schema:
+            self._emit_check(indent, f"len({variable}) > {schema['maxProperties']!r}")
+
+        properties = schema.get("properties", {})
+
+        for name, subschema in properties.items():
+            value = self._new_variable()
+            property_block = self._open_block(indent, f"if {name!r} in {variable}:", f"{value} = {variable}[{name!r}]")
+            self._generate(subschema, value, indent + 1)
+            self._close_block(property_block)
+
+        if "additionalProperties" in schema:
+            key = self._new_variable()
+            value = self._new_variable()
+            names = self._add_constant(frozenset(properties))
+
+            additional_properties_block = self._open_block(
+                indent,
+                f"for {key}, {value} in {variable}.items():",
+                f"if {key} in {names}:",
+                "continue",
+            )
+
+            self._generate(schema["additionalProperties"], value, indent + 1)
+            self._close_block(additional_properties_block)
+
+        self._close_block(block)
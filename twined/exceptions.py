@@ -21,6 +21,14 @@ class TwineVersionConflict(TwineException):
     """Raised when the (optional) "twined_version" field in the twine file does not match the current installed version of twined"""
 
 
+class UnsupportedSchema(TwineException):
+    """Raised when attempting to compile a schema using keywords that the schema compiler doesn't support"""
+
+
+class RemoteSchemaRetrievalDisabled(TwineException):
+    """Raised when a schema that isn't distributed with twined is referenced while validating in offline mode"""
+
+
 # --------------------- Exceptions relating to the twine itself ------------------------
 
 
@@ -43,6 +51,10 @@ class UnknownStrand(TwineException, ValueError):
     """Raised when referencing a strand which is not defined in ALL_STRANDS"""
 
 
+class FrozenTwine(TwineException, AttributeError):
+    """Raised when attempting to set a strand on a twine that is shared between callers (e.g. a cached twine)"""
+
+
 class StrandNotFound(TwineException, KeyError):
     """Raised when the attempting to access a strand not present in the twine"""
 
@@ -93,6 +105,10 @@ class InvalidSourceKindException(TwineException):
     """Raised when attempting to use the json loader for a disallowed kind"""
 
 
+class CorruptCompressedFile(TwineValueException):
+    """Raised when a compressed JSON file (e.g. *.json.gz) is truncated or its contents can't be decompressed"""
+
+
 class InvalidValues(TwineException):
     """Raised when JSON data (like Config data, Input Values or Output Values) is invalid"""
 
@@ -105,6 +121,10 @@ class InvalidValuesContents(InvalidValues, ValidationError):
     """Raised when the JSON in the file is not valid according to its matching schema."""
 
 
+class InvalidJsonPatch(TwineValueException):
+    """Raised when a JSON Patch (RFC 6902) is malformed or can't be applied to the document it's meant for"""
+
+
 # --------------------- Exceptions relating to validation of manifests ------------------------
 
 
@@ -0,0 +1,480 @@
+"""Revalidate documents that are resent with only a few changes (e.g. configuration values or monitor messages) by
+validating only the parts that have changed.
+
+Usage:
+```
+validator = IncrementalValidator(twine, "monitor_message")
+validator.validate(first_message)
+
+# Either give the next document...
+validator.update(next_message)
+
+# ...or a JSON Patch (RFC 6902) describing the changes to the last one.
+validator.apply_patch([{"op": "replace", "path": "/status", "value": "running"}])
+```
+"""
+
+import copy
+import logging
+
+from twined import exceptions
+from twined.compiler import CompiledValidator
+from twined.twine import SCHEMA_STRANDS
+from twined.utils import load_json
+
+logger = logging.getLogger(__name__)
+
+
+# Keywords that don't affect whether a document is valid.
+ANNOTATION_KEYWORDS = frozenset(
+    {
+        "$schema",
+        "$id",
+        "$anchor",
+        "$comment",
+        "$defs",
+        "definitions",
+        "title",
+        "description",
+        "default",
+        "examples",
+        "deprecated",
+        "readOnly",
+        "writeOnly",
+        "contentEncoding",
+        "contentMediaType",
+        "contentSchema",
+    }
+)
+
+# Keywords that only depend on an instance itself or the names of its properties and the number of its items, and so
+# aren't affected by changes to the values of its existing properties or items.
+LOCAL_KEYWORDS = frozenset(
+    {
+        "type",
+        "format",
+        "minimum",
+        "maximum",
+        "exclusiveMinimum",
+        "exclusiveMaximum",
+        "multipleOf",
+        "minLength",
+        "maxLength",
+        "pattern",
+        "required",
+        "dependentRequired",
+        "minProperties",
+        "maxProperties",
+        "propertyNames",
+        "minItems",
+        "maxItems",
+    }
+)
+
+# Keywords whose subschemas apply to each property or item independently of the others.
+INDEPENDENT_APPLICATOR_KEYWORDS = frozenset({"properties", "additionalProperties", "items"})
+
+DESCENDABLE_KEYWORDS = ANNOTATION_KEYWORDS | LOCAL_KEYWORDS | INDEPENDENT_APPLICATOR_KEYWORDS
+
+REFERENCE_KEYWORDS = frozenset({"$ref", "$dynamicRef", "$recursiveRef"})
+
+
+class IncrementalValidator:
+    """A validator for a strand of a twine that remembers the last valid document it validated and revalidates only the
+    parts of the next document that have changed. A changed part is validated against its subschema on its own unless
+    the schema of one of its parents has keywords relating it to other parts of the document (e.g. `if`, `allOf`,
+    `uniqueItems` or `patternProperties`), in which case the whole document is validated. Schemas containing
+    references are always validated in full. The errors raised for invalid documents are the same as those raised by
+    the twine's `validate_<strand>` methods.
+
+    Documents are stored by reference, so they mustn't be changed in place after being given to the validator.
+
+    :param twined.Twine twine: the twine containing the strand
+    :param str strand: the name of the strand to validate documents against (one of `SCHEMA_STRANDS`)
+    :raise twined.exceptions.UnknownStrand: if the strand isn't a values or monitor message strand
+    :raise twined.exceptions.StrandNotFound: if the strand isn't in the twine
+    :return None:
+    """
+
+    def __init__(self, twine, strand):
+        if strand not in SCHEMA_STRANDS:
+            raise exceptions.UnknownStrand(f"Cannot validate {strand!r} incrementally. Try one of {SCHEMA_STRANDS}.")
+
+        validator = twine._get_validator(strand)
+
+        # Subschemas are validated with `jsonschema` as compiled validators can only validate whole documents.
+        if isinstance(validator, CompiledValidator):
+            validator = validator.validator
+
+        self.twine = twine
+        self.strand = strand
+        self.document = None
+        self._validator = validator
+        self._incremental = not _contains_references(validator.schema)
+
+    def validate(self, source, **kwargs):
+        """Validate a whole document and remember it as the document to compare subsequent ones to.
+
+        :param any source: the document (of any kind the twine's `validate_<strand>` method accepts)
+        :param kwargs: keyword arguments passed to `load_json`
+        :raise twined.exceptions.InvalidValuesContents: if the document is invalid
+        :return any: the validated document
+        """
+        data = self.twine._load_json(self.strand, source, **kwargs)
+        self.twine._validate_against_schema(self.strand, data)
+        self.document = data
+        return data
+
+    def update(self, source, **kwargs):
+        """Validate the next document, revalidating only the parts that differ from the last valid document. If there's
+        no last valid document, the whole document is validated.
+
+        :param any source: the document (of any kind the twine's `validate_<strand>` method accepts)
+        :param kwargs: keyword arguments passed to `load_json`
+        :raise twined.exceptions.InvalidValuesContents: if the document is invalid
+        :return any: the validated document
+        """
+        data = self.twine._load_json(self.strand, source, **kwargs)
+
+        if self.document is None:
+            return self.validate(data)
+
+        self._revalidate(data, _diff(self.document, data))
+        self.document = data
+        return data
+
+    def apply_patch(self, patch):
+        """Apply a JSON Patch (RFC 6902) to the last valid document and validate the result, revalidating only the parts
+        the patch changed. The last valid document isn't changed.
+
+        :param list(dict)|str patch: the JSON Patch (or a json string or *.json filename containing it)
+        :raise twined.exceptions.InvalidJsonPatch: if there's no document to patch or the patch can't be applied to it
+        :raise twined.exceptions.InvalidValuesContents: if the patched document is invalid
+        :return any: the patched and validated document
+        """
+        if self.document is None:
+            raise exceptions.InvalidJsonPatch("There is no document to apply the patch to - validate one first.")
+
+        patch = load_json(patch)
+
+        if not isinstance(patch, list):
+            raise exceptions.InvalidJsonPatch("A JSON Patch must be a list of operations.")
+
+        document = self.document
+        changed_paths = []
+
+        for operation in patch:
+            document = _apply_operation(document, operation, changed_paths)
+
+        self._revalidate(document, changed_paths)
+        self.document = document
+        return document
+
+    def _revalidate(self, document, changed_paths):
+        """Revalidate the changed parts of a document, falling back to validating the whole document if any of them
+        can't be validated on their own. Whole documents are also validated if a changed part is invalid so the error
+        raised is the same as for a full validation.
+
+        :param any document:
+        :param iter(tuple) changed_paths: the paths to the parts of the document whose values have changed
+        :raise twined.exceptions.InvalidValuesContents: if the document is invalid
+        :return None:
+        """
+        changed_paths = _remove_nested_paths(changed_paths)
+
+        if self._incremental and all(self._is_valid_at(document, path) for path in changed_paths):
+            logger.debug("Revalidated %d changed parts of %s", len(changed_paths), self.strand)
+            return
+
+        self.twine._validate_against_schema(self.strand, document)
+
+    def _is_valid_at(self, document, path):
+        """Check whether the part of a document at the given path is valid against its subschema. `False` is returned if
+        the part can't be validated on its own.
+
+        :param any document:
+        :param tuple path:
+        :return bool:
+        """
+        schema = self._validator.schema
+        instance = document
+
+        for key in path:
+            if isinstance(schema, bool):
+                # Everything below a `true` schema is valid; nothing below a `false` one is.
+                return schema
+
+            if not schema.keys() <= DESCENDABLE_KEYWORDS:
+                return False
+
+            try:
+                child = instance[key]
+            except (LookupError, TypeError):
+                # The path has been removed or shifted by a later operation, which revalidates one of its parents.
+                break
+
+            if isinstance(instance, dict):
+                schema = schema.get("properties", {}).get(key, schema.get("additionalProperties", True))
+            elif isinstance(instance, list):
+                schema = schema.get("items", True)
+
+                if isinstance(schema, list):
+                    return False
+            else:
+                break
+
+            instance = child
+
+        return self._validator.evolve(schema=schema).is_valid(instance)
+
+
+def _contains_references(schema):
+    """Check whether a schema or any of its subschemas contains a reference.
+
+    :param any schema:
+    :return bool:
+    """
+    if isinstance(schema, dict):
+        return not REFERENCE_KEYWORDS.isdisjoint(schema) or any(
+            _contains_references(value) for value in schema.values()
+        )
+
+    if isinstance(schema, list):
+        return any(_contains_references(value) for value in schema)
+
+    return False
+
+
+def _remove_nested_paths(paths):
+    """Remove duplicate paths and paths within other paths.
+
+    :param iter(tuple) paths:
+    :return list(tuple):
+    """
+    kept_paths = set()
+
+    for path in sorted(set(paths), key=len):
+        if not any(path[:length] in kept_paths for length in range(len(path))):
+            kept_paths.add(path)
+
+    return list(kept_paths)
+
+
+def _diff(previous, next_, path=()):
+    """Iterate over the paths to the parts of the next document that need revalidating. These are the values that have
+    changed and the objects and arrays whose properties or number of items have changed.
+
+    :param any previous:
+    :param any next_:
+    :param tuple path:
+    :return iter(tuple):
+    """
+    if isinstance(previous, dict) and isinstance(next_, dict):
+        if previous.keys() != next_.keys():
+            yield path
+            return
+
+        for key, value in next_.items():
+            yield from _diff(previous[key], value, (*path, key))
+
+    elif isinstance(previous, list) and isinstance(next_, list):
+        if len(previous) != len(next_):
+            yield path
+            return
+
+        for index, (previous_item, item) in enumerate(zip(previous, next_)):
+            yield from _diff(previous_item, item, (*path, index))
+
+    # Compare types too, as `True == 1` but they're different types in JSON schema.
+    elif type(previous) is not type(next_) or previous != next_:
+        yield path
+
+
+def _apply_operation(document, operation, changed_paths):
+    """Apply a JSON Patch operation to a document without changing it, copying only the objects and arrays on the path
+    to the change. The paths to the parts of the new document that need revalidating are added to `changed_paths`.
+
+    :param any document:
+    :param dict operation:
+    :param list(tuple) changed_paths:
+    :raise twined.exceptions.InvalidJsonPatch: if the operation is malformed or can't be applied to the document
+    :return any: the new document
+    """
+    try:
+        op = operation["op"]
+        path = _parse_pointer(operation["path"])
+
+        if op in {"add", "replace", "test"}:
+            value = operation["value"]
+        elif op in {"move", "copy"}:
+            from_path = _parse_pointer(operation["from"])
+
+    except (KeyError, TypeError):
+        raise exceptions.InvalidJsonPatch(f"Malformed JSON Patch operation: {operation!r}.")
+
+    if op == "add":
+        return _add(document, path, value, changed_paths)
+
+    if op == "remove":
+        return _remove(document, path, changed_paths)
+
+    if op == "replace":
+        _get(document, path)
+
+        if not path:
+            changed_paths.append(())
+            return value
+
+        document, parent, parent_path = _copy_parents(document, path)
+        key = _get_key(parent, path[-1])
+        parent[key] = value
+        changed_paths.append((*parent_path, key))
+        return document
+
+    if op == "move":
+        if path[: len(from_path)] == from_path and path != from_path:
+            raise exceptions.InvalidJsonPatch(f"Cannot move {operation['from']!r} into one of its children.")
+
+        value = _get(document, from_path)
+        document = _remove(document, from_path, changed_paths)
+        return _add(document, path, value, changed_paths)
+
+    if op == "copy":
+        return _add(document, path, copy.deepcopy(_get(document, from_path)), changed_paths)
+
+    if op == "test":
+        actual = _get(document, path)
+
+        if type(actual) is not type(value) or actual != value:
+            raise exceptions.InvalidJsonPatch(f"Test failed: the value at {operation['path']!r} is not {value!r}.")
+
+        return document
+
+    raise exceptions.InvalidJsonPatch(f"Unknown JSON Patch operation {op!r}.")
+
+
+def _add(document, path, value, changed_paths):
+    """Add a value to a document at the given path without changing the document.
+
+    :param any document:
+    :param tuple(str) path:
+    :param any value:
+    :param list(tuple) changed_paths:
+    :return any: the new document
+    """
+    if not path:
+        changed_paths.append(())
+        return value
+
+    document, parent, parent_path = _copy_parents(document, path)
+
+    if isinstance(parent, list):
+        parent.insert(_get_key(parent, path[-1], allow_end=True), value)
+        changed_paths.append(parent_path)
+        return document
+
+    # Adding an existing property replaces its value without changing the parent's property names.
+    changed_paths.append((*parent_path, path[-1]) if path[-1] in parent else parent_path)
+    parent[path[-1]] = value
+    return document
+
+
+def _remove(document, path, changed_paths):
+    """Remove the value at the given path from a document without changing the document.
+
+    :param any document:
+    :param tuple(str) path:
+    :param list(tuple) changed_paths:
+    :return any: the new document
+    """
+    if not path:
+        raise exceptions.InvalidJsonPatch("Cannot remove the whole document.")
+
+    _get(document, path)
+    document, parent, parent_path = _copy_parents(document, path)
+    del parent[_get_key(parent, path[-1])]
+    changed_paths.append(parent_path)
+    return document
+
+
+def _get(document, path):
+    """Get the value at the given path in a document.
+
+    :param any document:
+    :param tuple(str) path:
+    :raise twined.exceptions.InvalidJsonPatch: if there's no value at the path
+    :return any:
+    """
+    value = document
+
+    for token in path:
+        value = value[_get_key(value, token)]
+
+    return value
+
+
+def _copy_parents(document, path):
+    """Shallow-copy the document and each object or array on the path to the value at the given path.
+
+    :param any document:
+    :param tuple(str) path:
+    :return (any, dict|list, tuple): the copied document, the copy of the value's parent and the path to the parent
+    """
+    document = parent = copy.copy(document)
+    parent_path = []
+
+    for token in path[:-1]:
+        key = _get_key(parent, token)
+        parent[key] = copy.copy(parent[key])
+        parent = parent[key]
+        parent_path.append(key)
+
+    if not isinstance(parent, (dict, list)):
+        raise exceptions.InvalidJsonPatch(f"Cannot change a child of {parent!r}.")
+
+    return document, parent, tuple(parent_path)
+
+
+def _get_key(container, token, allow_end=False):
+    """Get the key or index a JSON pointer token refers to in an object or array.
+
+    :param dict|list container:
+    :param str token:
+    :param bool allow_end: if `True`, allow the index one past the end of arrays (including as "-")
+    :raise twined.exceptions.InvalidJsonPatch: if the token doesn't refer to a child of the container
+    :return str|int:
+    """
+    if isinstance(container, dict):
+        if token not in container and not allow_end:
+            raise exceptions.InvalidJsonPatch(f"There is no property named {token!r}.")
+
+        return token
+
+    if isinstance(container, list):
+        end = len(container) if allow_end else len(container) - 1
+
+        if token == "-" and allow_end:
+            return len(container)
+
+        if token.isdigit() and (token == "0" or not token.startswith("0")) and int(token) <= end:
+            return int(token)
+
+        raise exceptions.InvalidJsonPatch(f"There is no item at index {token!r}.")
+
+    raise exceptions.InvalidJsonPatch(f"Cannot get {token!r} from {container!r}.")
+
+
+def _parse_pointer(pointer):
+    """Parse a JSON pointer (RFC 6901) into its unescaped tokens.
+
+    :param str pointer:
+    :raise twined.exceptions.InvalidJsonPatch: if the pointer is malformed
+    :return tuple(str):
+    """
+    if pointer == "":
+        return ()
+
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise exceptions.InvalidJsonPatch(f"{pointer!r} is not a valid JSON pointer.")
+
+    return tuple(token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/"))
@@ -0,0 +1,258 @@
+"""Schemas distributed with twined, and a `referencing` registry that resolves them from the package rather than from
+the remote schema registry.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+from urllib.request import urlopen
+
+from jsonschema.validators import validator_for
+from referencing import Registry, Resource
+
+try:
+    # python < 3.9
+    import importlib_resources
+except ModuleNotFoundError:
+    # python >= 3.9
+    import importlib.resources as importlib_resources
+
+from twined import exceptions
+from twined.compiler import compile_validator
+
+logger = logging.getLogger(__name__)
+
+CHILDREN_SCHEMA = "https://jsonschema.registry.octue.com/octue/children/0.2.0.json"
+MANIFEST_SCHEMA = "https://jsonschema.registry.octue.com/octue/manifest/0.1.0.json"
+
+# Remote schema URIs mapped to the files in this package holding copies of them.
+BUNDLED_SCHEMAS = {
+    CHILDREN_SCHEMA: "children_schema.json",
+    MANIFEST_SCHEMA: "manifest_schema.json",
+}
+
+# The SHA-256 hashes of the published documents at the URIs in `BUNDLED_SCHEMAS`. Outside offline mode, a bundled copy is
+# only used in place of the published document if it has the recorded hash (i.e. it's a byte-for-byte copy of it);
+# otherwise the published document is fetched (once per process). The copies bundled at the moment were written by hand
+# (the children schema from the copy distributed with twined 0.5.0, with the backend's `project_name` renamed to
+# `project_id`) as the registry couldn't be reached when they were added, so they're only used in offline mode. To
+# bundle a published document, save it to its file in this package unchanged and record its hash here.
+PUBLISHED_SCHEMA_HASHES = {}
+
+# The number of seconds to wait for the schema registry before giving up on retrieving a schema.
+REMOTE_SCHEMA_TIMEOUT = 10
+
+
+def load_bundled_schema(filename):
+    """Load a schema distributed with this package.
+
+    :param str filename: the name of the schema file in the `twined.schema` package
+    :return dict:
+    """
+    return json.loads(importlib_resources.files("twined.schema").joinpath(filename).read_text(encoding="utf-8"))
+
+
+def is_published_copy(uri):
+    """Check whether the schema bundled for a URI is a byte-for-byte copy of the document published at the URI, going
+    by the hash recorded for it in `PUBLISHED_SCHEMA_HASHES`.
+
+    :param str uri: one of the URIs in `BUNDLED_SCHEMAS`
+    :return bool:
+    """
+    published_hash = PUBLISHED_SCHEMA_HASHES.get(uri)
+
+    if published_hash is None:
+        return False
+
+    contents = importlib_resources.files("twined.schema").joinpath(BUNDLED_SCHEMAS[uri]).read_bytes()
+    return hashlib.sha256(contents).hexdigest() == published_hash
+
+
+@functools.lru_cache(maxsize=None)
+def _retrieve_remote(uri):
+    """Retrieve a schema that isn't bundled with this package from its URI. Each URI is only fetched once per process.
+
+    :param str uri:
+    :return referencing.Resource:
+    """
+    with urlopen(uri, timeout=REMOTE_SCHEMA_TIMEOUT) as response:
+        return Resource.from_contents(json.load(response))
+
+
+def _refuse_remote(uri):
+    """Refuse to retrieve a schema that isn't bundled with this package.
+
+    :param str uri:
+    :raise twined.exceptions.RemoteSchemaRetrievalDisabled: always
+    :return None:
+    """
+    raise exceptions.RemoteSchemaRetrievalDisabled(
+        f"Cannot retrieve the schema at {uri!r} - remote schema retrieval is disabled in offline mode."
+    )
+
+
+def find_retrieval_error(error):
+    """Find the twined exception raised while retrieving a schema (e.g. `RemoteSchemaRetrievalDisabled`) among the
+    errors `referencing` and `jsonschema` wrap it in.
+
+    :param Exception error: an error raised while validating
+    :return twined.exceptions.TwineException|None:
+    """
+    while error is not None:
+        if isinstance(error, exceptions.TwineException):
+            return error
+
+        error = error.__cause__ or error.__context__
+
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_registry(offline=False):
+    """Get a registry resolving the schemas bundled with this package locally. Outside offline mode, only bundled
+    copies of the published documents (see `PUBLISHED_SCHEMA_HASHES`) are resolved locally. Registries are immutable,
+    so one is shared per process for each mode.
+
+    :param bool offline: if `True`, resolve all the bundled schemas locally and raise an error instead of fetching any
+        schema that isn't bundled with this package
+    :return referencing.Registry:
+    """
+    retrieve = _refuse_remote if offline else _retrieve_remote
+
+    return Registry(retrieve=retrieve).with_resources(
+        (uri, Resource.from_contents(load_bundled_schema(filename)))
+        for uri, filename in BUNDLED_SCHEMAS.items()
+        if offline or is_published_copy(uri)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_twine_validator():
+    """Get the validator for twines, compiled from the twine schema distributed with this package. The schema is read,
+    checked and compiled once per process and the validator shared by all `Twine` instances.
+
+    :return jsonschema.protocols.Validator:
+    """
+    schema = load_bundled_schema("twine_schema.json")
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema, registry=get_registry(offline=True))
+
+
+@functools.lru_cache(maxsize=None)
+def get_manifest_file_validator():
+    """Get the validator for the entries of the "files" array of each dataset in a manifest, taken from the manifest
+    schema distributed with this package. The references to the manifest schema's definitions are inlined and the
+    validator compiled once per process so entries can be validated one at a time without resolving references for
+    each of them.
+
+    :return twined.compiler.CompiledValidator|jsonschema.protocols.Validator|None: `None` if the manifest schema doesn't
+        have a single schema for the file entries of every dataset (see `find_manifest_file_schema`), in which case the
+        entries must be validated with the rest of the manifest against the full manifest schema
+    """
+    manifest_schema = load_bundled_schema(BUNDLED_SCHEMAS[MANIFEST_SCHEMA])
+    file_schema = find_manifest_file_schema(manifest_schema)
+
+    if file_schema is None:
+        logger.debug("Couldn't find the schema of the manifest file entries; they'll be validated with the manifest")
+        return None
+
+    schema = _inline_definitions(file_schema, manifest_schema.get("$defs", {}))
+    schema = {"$schema": manifest_schema["$schema"], **schema}
+
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    validator = validator_class(schema)
+
+    try:
+        return compile_validator(validator)
+    except exceptions.UnsupportedSchema:
+        return validator
+
+
+def find_manifest_file_schema(manifest_schema):
+    """Find the schema of the entries of the "files" array of the datasets in a manifest schema. The schemas of the
+    datasets (the values of the "datasets" object) are searched through their combinators ("oneOf", "anyOf" and
+    "allOf") and references to the manifest schema's definitions for object schemas with a "files" array property.
+
+    :param dict manifest_schema:
+    :return dict|None: the schema of the file entries, or `None` if there isn't exactly one (e.g. if datasets with
+        different names have differently structured files)
+    """
+    definitions = manifest_schema.get("$defs", {})
+    datasets_schema = manifest_schema.get("properties", {}).get("datasets", {})
+
+    dataset_schemas = [
+        *datasets_schema.get("patternProperties", {}).values(),
+        *datasets_schema.get("properties", {}).values(),
+        datasets_schema.get("additionalProperties"),
+    ]
+
+    file_schemas = []
+
+    for dataset_schema in dataset_schemas:
+        for file_schema in _iter_file_schemas(dataset_schema, definitions):
+            if file_schema not in file_schemas:
+                file_schemas.append(file_schema)
+
+    if len(file_schemas) != 1:
+        return None
+
+    return file_schemas[0]
+
+
+def _iter_file_schemas(schema, definitions, seen_references=()):
+    """Iterate over the schemas of the entries of the "files" array properties of a dataset schema and the schemas it's
+    combined from.
+
+    :param any schema: the dataset schema
+    :param dict definitions: the manifest schema's definitions
+    :param tuple(str) seen_references: the references already followed to reach the schema (to avoid cycles)
+    :return iter(dict):
+    """
+    if not isinstance(schema, dict):
+        return
+
+    reference = schema.get("$ref")
+
+    if isinstance(reference, str) and reference.startswith("#/$defs/") and reference not in seen_references:
+        yield from _iter_file_schemas(
+            definitions.get(reference[len("#/$defs/") :]),
+            definitions,
+            (*seen_references, reference),
+        )
+
+    files_schema = schema.get("properties", {}).get("files")
+
+    if isinstance(files_schema, dict) and isinstance(files_schema.get("items"), dict):
+        yield files_schema["items"]
+
+    for keyword in ("oneOf", "anyOf", "allOf"):
+        for subschema in schema.get(keyword, ()):
+            yield from _iter_file_schemas(subschema, definitions, seen_references)
+
+
+def _inline_definitions(schema, definitions):
+    """Replace references to a schema's definitions (e.g. "#/$defs/tags") in one of its subschemas with the definitions.
+
+    :param any schema: the subschema
+    :param dict definitions: the schema's definitions
+    :return any: the subschema with its references inlined
+    """
+    if isinstance(schema, list):
+        return [_inline_definitions(item, definitions) for item in schema]
+
+    if not isinstance(schema, dict):
+        return schema
+
+    inlined_schema = {key: _inline_definitions(value, definitions) for key, value in schema.items() if key != "$ref"}
+    reference = schema.get("$ref")
+
+    if reference is None:
+        return inlined_schema
+
+    if not reference.startswith("#/$defs/"):
+        raise exceptions.UnsupportedSchema(f"Cannot inline the reference {reference!r}.")
+
+    return {**_inline_definitions(definitions[reference[len("#/$defs/") :]], definitions), **inlined_schema}
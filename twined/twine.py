@@ -1,21 +1,44 @@
-import importlib.metadata
+import asyncio
+from collections import namedtuple
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+import contextlib
+import functools
+import io
 import json as jsonlib
 import logging
 import os
+import reprlib
+import time
 
-from dotenv import load_dotenv
-from jsonschema import ValidationError
-from jsonschema import validate as jsonschema_validate
-
-try:
-    # python < 3.9
-    import importlib_resources
-except ModuleNotFoundError:
-    # python >= 3.9
-    import importlib.resources as importlib_resources
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+from referencing.exceptions import Unresolvable
 
 from . import exceptions
-from .utils import load_json, trim_suffix
+from .arrays import get_array_validator_class
+from .compiler import CompilerCache, compile_validator
+from .schema import (  # noqa: F401
+    CHILDREN_SCHEMA,
+    MANIFEST_SCHEMA,
+    find_retrieval_error,
+    get_manifest_file_validator,
+    get_registry,
+    get_twine_validator,
+)
+from .utils import (
+    JSON_FILE_SUFFIXES,
+    JSONStreamReader,
+    decoders,
+    freeze,
+    get_decompression_errors,
+    get_installed_twined_version,
+    iter_lines,
+    load_json,
+    open_json_file,
+    trim_suffix,
+    version_satisfies,
+)
+from .utils.decoders import raise_error_if_duplicate_keys
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +62,55 @@ ALL_STRANDS = (
     *CHILDREN_STRANDS,
 )
 
+ValidatorCacheInfo = namedtuple("ValidatorCacheInfo", ["hits", "misses", "size"])
+ValidationResult = namedtuple("ValidationResult", ["index", "data", "error"])
+ManifestFile = namedtuple("ManifestFile", ["dataset", "index", "file"])
+ErrorRecord = namedtuple("ErrorRecord", ["pointer", "keyword", "message", "excerpt"])
+CollectedErrors = namedtuple("CollectedErrors", ["errors", "complete"])
+
+# Excerpts of invalid instances are built with a bounded amount of work however large the instances are.
+_excerpt_repr = reprlib.Repr()
+_excerpt_repr.maxlevel = 2
+_excerpt_repr.maxdict = _excerpt_repr.maxlist = _excerpt_repr.maxtuple = 5
+_excerpt_repr.maxstring = _excerpt_repr.maxother = 40
+
 
-CHILDREN_SCHEMA = "https://jsonschema.registry.octue.com/octue/children/0.2.0.json"
-MANIFEST_SCHEMA = "https://jsonschema.registry.octue.com/octue/manifest/0.1.0.json"
+def _iter_unique_keys(reader, data):
+    """Iterate over the keys of the object at the current position of a JSON stream reader, raising an error if a key is
+    already in the given dictionary (which the caller adds each key to).
+
+    :param twined.utils.JSONStreamReader reader:
+    :param dict data:
+    :raise KeyError: if a key is duplicated
+    :return iter(str):
+    """
+    for key in reader.iter_object():
+        if key in data:
+            raise KeyError(f"Duplicate key detected: {key!r}.")
+
+        yield key
+
+
+def _format_json_pointer(path):
+    """Format the path to part of a JSON document as a JSON pointer (RFC 6901), e.g. "/datasets/0/files".
+
+    :param iter(str|int) path:
+    :return str:
+    """
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in path)
+
+
+def _truncate(string, length=200):
+    """Truncate a string to the given length, marking it with an ellipsis if it's been truncated.
+
+    :param str string:
+    :param int length:
+    :return str:
+    """
+    if len(string) <= length:
+        return string
+
+    return string[: length - 3] + "..."
 
 
 class Twine:
@@ -52,9 +121,43 @@ class Twine:
 
     Note: Instantiating the twine does not validate that any inputs to an application are correct - it merely
     checks that the twine itself is correct.
+
+    Copies of the children and manifest schemas are distributed with this package. They're resolved locally in offline
+    mode, and otherwise only if they're byte-for-byte copies of the published schemas (see
+    `twined.schema.PUBLISHED_SCHEMA_HASHES`); the published schemas are fetched once per process otherwise. Any other
+    schemas referenced by the twine's strands are fetched remotely unless `offline=True`, in which case referencing
+    them raises an error so that validation never touches the network.
+
+    The schemas of the strands named in `compiled_strands` (e.g. `("monitor_message", "input_values")`) are compiled
+    into specialised Python functions by `twined.compiler` for faster validation of valid data. Strands whose schemas
+    use keywords the compiler doesn't support are validated by `jsonschema` as usual. If a `compiler_cache_directory` is
+    given, compiled validators are cached there so that other processes can use them without recompiling them.
+
+    The `avalidate*` coroutines run loading and validation in the given `executor` (a `concurrent.futures.Executor`,
+    defaulting to the event loop's default executor) so they don't block the event loop.
+
+    If a `source_cache` (a `twined.SourceCache`, which can be shared between twines) is given, data loaded from files,
+    strings and bytes-like sources is cached in it so sources that are validated repeatedly (e.g. the same
+    `children.json` file on every run of a long-lived service) are only loaded once. Cached data is read-only.
     """
 
-    def __init__(self, **kwargs):
+    def __init__(
+        self,
+        offline=False,
+        compiled_strands=(),
+        compiler_cache_directory=None,
+        executor=None,
+        source_cache=None,
+        **kwargs,
+    ):
+        self._executor = executor
+        self._source_cache = source_cache
+        self._registry = get_registry(offline=offline)
+        self._compiled_strands = set(compiled_strands)
+        self._compiler_cache = CompilerCache(compiler_cache_directory) if compiler_cache_directory else None
+        self._validators = {}
+        self._validator_cache_hits = 0
+        self._validator_cache_misses = 0
         self._available_strands = set()
         self._required_strands = set()
 
@@ -66,6 +169,43 @@ class Twine:
                 self._required_strands.add(trim_suffix(name, "_schema"))
 
         self._available_manifest_strands = self._available_strands & set(MANIFEST_STRANDS)
+        self._frozen = False
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False) and not name.startswith("_"):
+            raise exceptions.FrozenTwine(
+                f"Cannot set {name!r} - this twine is shared and its strands can't be modified."
+            )
+
+        super().__setattr__(name, value)
+
+    def _freeze(self):
+        """Make the twine's strands read-only and prevent them from being reassigned, so the twine can be shared. This
+        must be done before any validators are compiled so they only refer to the read-only strands.
+
+        :return None:
+        """
+        for name, strand in list(vars(self).items()):
+            if not name.startswith("_"):
+                setattr(self, name, freeze(strand)[0])
+
+        self._frozen = True
+
+    @classmethod
+    def cached(cls, source=None, offline=False):
+        """Get a twine from the process-wide twine cache, loading it if it isn't already cached. Twines are cached on
+        the content of string and dict sources and on the path, modification time and size of twine files, so a twine
+        file is reloaded if it changes. Cached twines are shared, so their validators are compiled up front and their
+        strands are read-only (see `twined.utils.freeze`) and can't be reassigned.
+
+        :param str|dict|None source: a *.json filename, a json string or a dict (file-like sources aren't cached)
+        :param bool offline: if `True`, raise an error instead of fetching any schema that isn't bundled with twined
+        :return Twine:
+        """
+        # Imported here as `twined.cache` depends on this module.
+        from .cache import twine_cache
+
+        return twine_cache.get(source, offline=offline)
 
     def _load_twine(self, source=None):
         """Load twine from a *.json filename, file-like or a json string and validates twine contents."""
@@ -74,7 +214,9 @@ class Twine:
             raw_twine = {}
             logger.warning("No twine source specified. Loading empty twine.")
         else:
-            raw_twine = self._load_json("twine", source, allowed_kinds=("file-like", "filename", "string", "object"))
+            raw_twine = self._load_json(
+                "twine", source, allowed_kinds=("file-like", "filename", "string", "bytes", "object")
+            )
 
         self._validate_against_schema("twine", raw_twine)
         self._validate_twine_version(twine_file_twined_version=raw_twine.get("twined_version", None))
@@ -87,11 +229,16 @@ class Twine:
 
         # Decode the json string and deserialize to objects.
         try:
-            data = load_json(source, **kwargs)
+            # Twines aren't cached here as their strands become attributes of the twine (see `Twine.cached` instead).
+            if self._source_cache is None or kind == "twine":
+                data = load_json(source, **kwargs)
+            else:
+                data = self._source_cache.load(source, **kwargs)
         except FileNotFoundError as e:
             raise exceptions.file_not_found_map[kind](e)
 
-        except jsonlib.decoder.JSONDecodeError as e:
+        # Bytes-like sources and files that aren't valid UTF-8 (or UTF-16/32) raise a `UnicodeDecodeError`.
+        except (jsonlib.decoder.JSONDecodeError, UnicodeDecodeError, exceptions.CorruptCompressedFile) as e:
             raise exceptions.invalid_json_map[kind](e)
 
         return data
@@ -110,9 +257,7 @@ class Twine:
         if strand == "twine":
             # The data is a twine. A twine *contains* schema, but we also need to verify that it matches a certain
             # schema itself. The twine schema is distributed with this packaged to ensure version consistency...
-            return jsonlib.loads(
-                importlib_resources.files("twined.schema").joinpath("twine_schema.json").read_text(encoding="utf-8")
-            )
+            return get_twine_validator().schema
 
         if strand in CHILDREN_STRANDS:
             # The data is a list of children. The "children" strand of the twine describes matching criteria for
@@ -137,6 +282,92 @@ class Twine:
         except AttributeError:
             raise exceptions.StrandNotFound(f"Cannot validate - no {schema_key} strand in the twine")
 
+    def _get_validator(self, strand):
+        """Get the validator for the given strand, compiling it from the strand's schema the first time it's needed and
+        reusing it afterwards. The schema itself is checked against its metaschema when the validator is compiled. The
+        validator for the twine itself is shared by all twines.
+
+        :param str strand:
+        :raise jsonschema.exceptions.SchemaError: if the strand's schema is invalid
+        :return jsonschema.protocols.Validator:
+        """
+        if strand == "twine":
+            return get_twine_validator()
+
+        validator = self._validators.get(strand)
+
+        if validator is not None:
+            self._validator_cache_hits += 1
+            return validator
+
+        self._validator_cache_misses += 1
+        schema = self._get_schema(strand)
+        validator_class = validator_for(schema)
+
+        # Values are often numerical outputs, so numpy arrays in them are validated without converting them to lists.
+        if strand in SCHEMA_STRANDS:
+            validator_class = get_array_validator_class(validator_class)
+
+        validator = validator_class(schema, registry=self._registry)
+
+        if strand in self._compiled_strands:
+            validator = self._compile_validator(strand, validator)
+        else:
+            validator_class.check_schema(schema)
+
+        self._validators[strand] = validator
+        return validator
+
+    def _compile_validator(self, strand, validator):
+        """Compile the given validator for a strand, loading it from the compiler cache if possible. Schemas are checked
+        before they're compiled, so those loaded from the cache aren't checked again. If the schema can't be compiled,
+        the validator is returned as it is.
+
+        :param str strand:
+        :param jsonschema.protocols.Validator validator:
+        :raise jsonschema.exceptions.SchemaError: if the strand's schema is invalid
+        :return twined.compiler.CompiledValidator|jsonschema.protocols.Validator:
+        """
+        if self._compiler_cache:
+            compiled_validator = self._compiler_cache.load(validator)
+
+            if compiled_validator is not None:
+                return compiled_validator
+
+        type(validator).check_schema(validator.schema)
+
+        try:
+            compiled_validator = compile_validator(validator)
+        except exceptions.UnsupportedSchema as e:
+            logger.debug("Validating %s with jsonschema as its schema can't be compiled: %s", strand, e)
+            return validator
+
+        if self._compiler_cache:
+            self._compiler_cache.save(compiled_validator)
+
+        return compiled_validator
+
+    def warm(self, *strands):
+        """Compile the validators for the given strands up front so the first validation of each doesn't pay for it.
+        If no strands are given, the validators for all the strands available in the twine are compiled.
+
+        :param str strands: the names of the strands to compile validators for
+        :return None:
+        """
+        for strand in strands or self.available_strands:
+            if strand in CREDENTIAL_STRANDS:
+                continue
+
+            self._get_validator(strand)
+
+    @property
+    def validator_cache_info(self):
+        """Get statistics on the reuse of compiled validators by this twine.
+
+        :return ValidatorCacheInfo: the number of cache hits and misses and the number of compiled validators
+        """
+        return ValidatorCacheInfo(self._validator_cache_hits, self._validator_cache_misses, len(self._validators))
+
     def _validate_against_schema(self, strand, data):
         """Validate data against a schema, raises exceptions of type Invalid<strand>Json if not compliant.
 
@@ -147,24 +378,44 @@ class Twine:
 
         :param str strand:
         :param dict data:
+        :raise twined.exceptions.RemoteSchemaRetrievalDisabled: if the schema references a schema that can't be
+            retrieved in offline mode
         :return None:
         """
-        schema = self._get_schema(strand)
-
         try:
-            jsonschema_validate(instance=data, schema=schema)
-            logger.debug("Validated %s against schema", strand)
+            # Select the same error `jsonschema.validate` would raise so error messages are unchanged.
+            error = best_match(self._get_validator(strand).iter_errors(data))
+
+        except Unresolvable as e:
+            retrieval_error = find_retrieval_error(e)
+
+            if retrieval_error is None:
+                raise
+
+            raise retrieval_error from e
+
+        if error is not None:
+            raise exceptions.invalid_contents_map[strand](str(error))
 
-        except ValidationError as e:
-            raise exceptions.invalid_contents_map[strand](str(e))
+        logger.debug("Validated %s against schema", strand)
 
     def _validate_twine_version(self, twine_file_twined_version):
-        """Validate that the installed version is consistent with an optional version specification in the twine file."""
-        installed_twined_version = importlib.metadata.version("twined")
+        """Validate that the installed version is consistent with an optional version specification in the twine file.
+        The specification can be an exact version or a range (e.g. ">=0.6,<0.8") - see `twined.utils.version_satisfies`.
+        """
+        installed_twined_version = get_installed_twined_version()
         logger.debug(
             "Twine versions... %s installed, %s specified in twine", installed_twined_version, twine_file_twined_version
         )
-        if (twine_file_twined_version is not None) and (installed_twined_version != twine_file_twined_version):
+        if twine_file_twined_version is None:
+            return
+
+        try:
+            satisfied = version_satisfies(installed_twined_version, str(twine_file_twined_version))
+        except ValueError as e:
+            raise exceptions.InvalidTwineContents(str(e))
+
+        if not satisfied:
             raise exceptions.TwineVersionConflict(
                 f"Twined library version conflict. Twine file requires {twine_file_twined_version} but you have {installed_twined_version} installed"
             )
@@ -204,6 +455,19 @@ class Twine:
         :raise twined.exceptions.InvalidManifestContents: if one or more of the expected non-optional datasets is missing
         :return None:
         """
+        for expected_dataset_name in self._iter_missing_datasets(manifest_kind, manifest):
+            raise exceptions.invalid_contents_map[manifest_kind](
+                f"A dataset named {expected_dataset_name!r} is expected in the {manifest_kind} but is missing."
+            )
+
+    def _iter_missing_datasets(self, manifest_kind, manifest):
+        """Iterate over the names of the non-optional datasets specified in the corresponding manifest strand in the
+        twine that are missing from the given manifest.
+
+        :param str manifest_kind: the kind of manifest that's being validated (so the correct schema can be accessed)
+        :param dict manifest: the manifest whose datasets are to be checked
+        :return iter(str):
+        """
         # This is the manifest schema included in the `twine.json` file, not the schema for `manifest.json` files.
         manifest_schema = getattr(self, manifest_kind)
 
@@ -214,9 +478,42 @@ class Twine:
             if expected_dataset_schema.get("optional", False):
                 continue
 
-            raise exceptions.invalid_contents_map[manifest_kind](
-                f"A dataset named {expected_dataset_name!r} is expected in the {manifest_kind} but is missing."
-            )
+            yield expected_dataset_name
+
+    def _iter_children_key_errors(self, children):
+        """Iterate over messages describing how the keys of the given children don't match the keys of the children
+        strand in the twine - each key in the strand must have at least one child, and each child's key must be in the
+        strand.
+
+        :param list(dict) children: children that match the children schema
+        :return iter(str):
+        """
+        strand = getattr(self, "children", [])
+
+        # Loop the children and accumulate values so we have an O(1) check
+        children_keys = {}
+        for child in children:
+            children_keys[child["key"]] = children_keys.get(child["key"], 0) + 1
+
+        # Check there is at least one child for each item described in the strand
+        # TODO add max, min num specs to the strand schema and check here
+        for item in strand:
+            strand_key = item["key"]
+            if children_keys.get(strand_key, 0) <= 0:
+                yield f"No children found matching the key {strand_key}"
+
+        # Loop the strand and add unique keys to dict so we have an O(1) check
+        strand_keys = {}
+        for item in strand:
+            strand_keys[item["key"]] = True
+
+        # Check that each child has a key which is described in the strand
+        for child in children:
+            child_key = child["key"]
+            if not strand_keys.get(child_key, False):
+                yield (
+                    f"Child with key '{child_key}' found but no such key exists in the 'children' strand of the twine."
+                )
 
     @property
     def available_strands(self):
@@ -244,36 +541,11 @@ class Twine:
 
     def validate_children(self, source, **kwargs):
         """Validate that the children values, passed as either a file or a json string, are correct."""
-        # TODO cache this loaded data keyed on a hashed version of kwargs
         children = self._load_json("children", source, **kwargs)
         self._validate_against_schema("children", children)
 
-        strand = getattr(self, "children", [])
-
-        # Loop the children and accumulate values so we have an O(1) check
-        children_keys = {}
-        for child in children:
-            children_keys[child["key"]] = children_keys.get(child["key"], 0) + 1
-
-        # Check there is at least one child for each item described in the strand
-        # TODO add max, min num specs to the strand schema and check here
-        for item in strand:
-            strand_key = item["key"]
-            if children_keys.get(strand_key, 0) <= 0:
-                raise exceptions.InvalidValuesContents(f"No children found matching the key {strand_key}")
-
-        # Loop the strand and add unique keys to dict so we have an O(1) check
-        strand_keys = {}
-        for item in strand:
-            strand_keys[item["key"]] = True
-
-        # Check that each child has a key which is described in the strand
-        for child in children:
-            child_key = child["key"]
-            if not strand_keys.get(child_key, False):
-                raise exceptions.InvalidValuesContents(
-                    f"Child with key '{child_key}' found but no such key exists in the 'children' strand of the twine."
-                )
+        for message in self._iter_children_key_errors(children):
+            raise exceptions.InvalidValuesContents(message)
 
         # TODO Additional validation that the children match what is set as required in the Twine
         return children
@@ -308,7 +580,9 @@ class Twine:
         if not hasattr(self, "credentials"):
             return set()
 
-        # Load any variables from the .env file into the environment.
+        # Load any variables from the .env file into the environment. `dotenv` is only imported when it's needed.
+        from dotenv import load_dotenv
+
         dotenv_path = dotenv_path or os.path.join(".", ".env")
         load_dotenv(dotenv_path)
 
@@ -336,6 +610,45 @@ class Twine:
         """Validate monitor message against the monitor message schema strand."""
         return self._validate_values(kind="monitor_message", source=source, **kwargs)
 
+    def iter_validate_monitor_messages(self, stream):
+        """Validate a stream of newline-delimited JSON monitor messages against the monitor message schema strand,
+        yielding a result for each message as it's read. Only one line of the stream is held in memory at a time, so
+        streams of any length can be validated. Blank lines are skipped.
+
+        Usage:
+        ```
+            with open("monitor_messages.ndjson", "rb") as f:
+                for result in twine.iter_validate_monitor_messages(f):
+                    if result.error:
+                        logger.error("Monitor message on line %d is invalid: %s", result.index + 1, result.error)
+        ```
+
+        :param io.IOBase|iter(bytes) stream: a file-like object (in text or binary mode) or an iterable of chunks of
+            bytes split at arbitrary points (e.g. from a socket or a message bus)
+        :raise twined.exceptions.StrandNotFound: if there's no monitor message schema strand in the twine
+        :return iter(ValidationResult): the line index of each message with its validated data and `None`, or `None`
+            and an `InvalidValuesJson` or `InvalidValuesContents` exception
+        """
+        validator = self._get_validator("monitor_message")
+
+        for index, line in enumerate(iter_lines(stream)):
+            if not line.strip():
+                continue
+
+            try:
+                # Lines are parsed directly rather than with `load_json` as they shouldn't be treated as filenames.
+                data = decoders.loads(line)
+            except (ValueError, KeyError) as e:
+                yield ValidationResult(index, None, exceptions.invalid_json_map["monitor_message"](e))
+                continue
+
+            error = best_match(validator.iter_errors(data))
+
+            if error is None:
+                yield ValidationResult(index, data, None)
+            else:
+                yield ValidationResult(index, None, exceptions.invalid_contents_map["monitor_message"](str(error)))
+
     def validate_configuration_manifest(self, source, **kwargs):
         """Validate the input manifest, passed as either a file or a json string."""
         return self._validate_manifest("configuration_manifest", source, **kwargs)
@@ -348,12 +661,129 @@ class Twine:
         """Validate the output manifest, passed as either a file or a json string."""
         return self._validate_manifest("output_manifest", source, **kwargs)
 
+    def iter_validate_manifest(self, kind, source, chunk_size=65536):
+        """Validate a manifest read from a stream, yielding the entries of the "files" array of each dataset one at a
+        time as they're read and validated. Only one file entry (along with the rest of the manifest without its file
+        entries) is held in memory at a time, so manifests with any number of files can be validated. The rest of the
+        manifest, including the check that all the non-optional datasets are present, is validated once the end of the
+        stream is reached, after the last file entry has been yielded. If the manifest schema doesn't have a single
+        schema for the file entries (see `twined.schema.find_manifest_file_schema`), the entries are instead validated
+        with the rest of the manifest at the end of the stream, so they're all held in memory.
+
+        Usage:
+        ```
+            with open("output_manifest.json", "rb") as f:
+                for entry in twine.iter_validate_manifest("output_manifest", f):
+                    index_file(entry.dataset, entry.file)
+        ```
+
+        :param str kind: the kind of manifest (one of `MANIFEST_STRANDS`)
+        :param str|io.IOBase source: a *.json filename (or a compressed one, e.g. *.json.gz, which is decompressed as
+            it's read), a file-like object (in text or binary mode) or a json string
+        :param int chunk_size: the number of characters to read from the stream at a time
+        :raise twined.exceptions.UnknownStrand: if the kind isn't a kind of manifest
+        :raise twined.exceptions.StrandNotFound: if the manifest strand isn't in the twine
+        :raise twined.exceptions.InvalidManifestJson: if the manifest isn't valid JSON or can't be decompressed
+        :raise twined.exceptions.InvalidManifestContents: if the manifest is invalid
+        :return iter(ManifestFile): the name of the dataset, the index in the dataset and the contents of each file
+            entry
+        """
+        if kind not in MANIFEST_STRANDS:
+            raise exceptions.UnknownStrand(f"Cannot stream {kind!r}. Try one of {MANIFEST_STRANDS}.")
+
+        if kind not in self.available_strands:
+            raise exceptions.StrandNotFound(f"Cannot validate - no {kind} strand in the twine")
+
+        file_validator = get_manifest_file_validator()
+
+        decompression_errors = ()
+
+        with contextlib.ExitStack() as stack:
+            if isinstance(source, str):
+                if source.endswith(JSON_FILE_SUFFIXES):
+                    decompression_errors = get_decompression_errors(source)
+
+                    try:
+                        source = stack.enter_context(open_json_file(source))
+                    except FileNotFoundError as e:
+                        raise exceptions.file_not_found_map[kind](e)
+                else:
+                    source = io.StringIO(source)
+
+            reader = JSONStreamReader(source, chunk_size=chunk_size, object_pairs_hook=raise_error_if_duplicate_keys)
+
+            try:
+                # The manifest without the entries of the "files" arrays, which are validated separately as they're
+                # read.
+                manifest = yield from self._iter_manifest_files(kind, reader, file_validator)
+                reader.expect_end()
+            except (jsonlib.decoder.JSONDecodeError, *decompression_errors) as e:
+                raise exceptions.invalid_json_map[kind](e)
+
+        self._validate_against_schema(kind, manifest)
+        self._validate_all_expected_datasets_are_present_in_manifest(manifest_kind=kind, manifest=manifest)
+
+    def _iter_manifest_files(self, kind, reader, file_validator):
+        """Read a manifest from a stream, validating and yielding each entry of the "files" array of each dataset.
+
+        :param str kind:
+        :param twined.utils.JSONStreamReader reader:
+        :param twined.compiler.CompiledValidator|jsonschema.protocols.Validator|None file_validator: if `None`, the
+            file entries are yielded without being validated and kept in the returned manifest
+        :return iter(ManifestFile): the file entries; the manifest without them is returned once the stream is read
+        """
+        if reader.peek() != "{":
+            return reader.read_value()
+
+        manifest = {}
+
+        for key in _iter_unique_keys(reader, manifest):
+            if key != "datasets" or reader.peek() != "{":
+                manifest[key] = reader.read_value()
+                continue
+
+            manifest[key] = datasets = {}
+
+            for dataset_name in _iter_unique_keys(reader, datasets):
+                if reader.peek() != "{":
+                    datasets[dataset_name] = reader.read_value()
+                    continue
+
+                datasets[dataset_name] = dataset = {}
+
+                for dataset_key in _iter_unique_keys(reader, dataset):
+                    if dataset_key != "files" or reader.peek() != "[":
+                        dataset[dataset_key] = reader.read_value()
+                        continue
+
+                    dataset[dataset_key] = files = []
+
+                    for index in reader.iter_array():
+                        file = reader.read_value()
+
+                        # Without a schema for the file entries alone, they're kept to be validated with the rest of
+                        # the manifest against the full manifest schema.
+                        if file_validator is None:
+                            files.append(file)
+                            yield ManifestFile(dataset_name, index, file)
+                            continue
+
+                        error = best_match(file_validator.iter_errors(file))
+
+                        if error is not None:
+                            error.path.extendleft(reversed(("datasets", dataset_name, "files", index)))
+                            raise exceptions.invalid_contents_map[kind](str(error))
+
+                        yield ManifestFile(dataset_name, index, file)
+
+        return manifest
+
     @staticmethod
     def _get_cls(name, cls):
         """Getter that will return cls[name] if cls is a dict or cls otherwise"""
         return cls.get(name, None) if isinstance(cls, dict) else cls
 
-    def validate(self, allow_extra=False, cls=None, **kwargs):
+    def validate(self, allow_extra=False, cls=None, parallel=False, executor=None, **kwargs):
         """Validate strands from sources provided as keyword arguments
 
         Usage:
@@ -370,23 +800,26 @@ class Twine:
 
         :param bool allow_extra: If strand is present in the sources, but not in the twine, allow validation to continue (only strands in the twine will be validated and converted, others will be returned as-is)
         :param any cls: optional dict of classes keyed on strand name (alternatively, one single class which will be applied to strands) which will be instantiated with the validated source data.
+        :param bool parallel: if `True`, load and validate the strands concurrently. If a strand fails validation, strands that haven't started validating yet are cancelled and the error for the first failing strand (in the order the sources were given) is raised, so the same error is raised as when validating serially.
+        :param concurrent.futures.Executor|None executor: the executor to validate strands in when `parallel` is `True` (defaults to a temporary thread pool - the twine's executor isn't used as `avalidate` may already be running this method in it, and waiting in an executor for work queued in the same executor can deadlock)
         :return dict: dict of validated and initialised sources
         """
         # pop any strand name:data pairs out of kwargs and into their own dict
         source_kwargs = tuple(name for name in kwargs.keys() if name in ALL_STRANDS)
         sources = dict((name, kwargs.pop(name)) for name in source_kwargs)
+        validations = {}
+        source_error = None
 
         for strand_name, strand_data in sources.items():
-            if not allow_extra:
-                if (strand_data is not None) and (strand_name not in self.available_strands):
-                    raise exceptions.StrandNotFound(
-                        f"Source data is provided for '{strand_name}' but no such strand is defined in the twine"
-                    )
+            try:
+                self._check_source(strand_name, strand_data, allow_extra)
+            except (exceptions.StrandNotFound, exceptions.TwineValueException) as e:
+                # Raise the error once the strands before this one have been validated, as validating serially would.
+                if not validations:
+                    raise
 
-            if (strand_name in self.required_strands) and (strand_data is None):
-                raise exceptions.TwineValueException(
-                    f"The '{strand_name}' strand is defined in the twine, but no data is provided in sources"
-                )
+                source_error = e
+                break
 
             if strand_data is not None:
                 # TODO Consider reintroducing a skip based on whether cls is already instantiated. For now, leave it the
@@ -399,16 +832,365 @@ class Twine:
                 #         return self.twine.validate(name, source=value, cls=cls)
                 method = getattr(self, f"validate_{strand_name}")
                 klass = self._get_cls(strand_name, cls)
-                sources[strand_name] = method(strand_data, cls=klass, **kwargs)
+                validation = functools.partial(method, strand_data, cls=klass, **kwargs)
+
+                if parallel:
+                    validations[strand_name] = validation
+                else:
+                    sources[strand_name] = validation()
             else:
                 sources[strand_name] = None
 
+        if validations:
+            sources.update(self._run_concurrently(validations, executor=executor))
+
+        if source_error is not None:
+            raise source_error
+
         return sources
 
+    def _check_source(self, strand_name, strand_data, allow_extra):
+        """Check that a source can be validated against the twine.
+
+        :param str strand_name:
+        :param any strand_data:
+        :param bool allow_extra: if `True`, allow sources for strands that aren't in the twine
+        :raise twined.exceptions.StrandNotFound: if the strand isn't in the twine and `allow_extra` is `False`
+        :raise twined.exceptions.TwineValueException: if the strand is required but no source is given for it
+        :return None:
+        """
+        if not allow_extra:
+            if (strand_data is not None) and (strand_name not in self.available_strands):
+                raise exceptions.StrandNotFound(
+                    f"Source data is provided for '{strand_name}' but no such strand is defined in the twine"
+                )
+
+        if (strand_name in self.required_strands) and (strand_data is None):
+            raise exceptions.TwineValueException(
+                f"The '{strand_name}' strand is defined in the twine, but no data is provided in sources"
+            )
+
+    @staticmethod
+    def _run_concurrently(functions, executor=None):
+        """Run functions concurrently in an executor. As soon as one fails, functions that haven't started yet are
+        cancelled. If any fail, the exception raised by the first failing function (in the order they're given) is
+        raised, so errors are deterministic however the functions are scheduled.
+
+        :param dict(str, callable) functions: the functions to run, keyed on name
+        :param concurrent.futures.Executor|None executor: the executor to run the functions in (defaults to a temporary
+            thread pool)
+        :raise Exception: the exception raised by the first failing function
+        :return dict: the results of the functions, keyed on name
+        """
+        temporary_executor = None
+
+        if executor is None:
+            executor = temporary_executor = ThreadPoolExecutor(max_workers=len(functions))
+
+        try:
+            futures = [executor.submit(function) for function in functions.values()]
+            indices = {future: index for index, future in enumerate(futures)}
+            pending = set(futures)
+            first_failure = None
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_EXCEPTION)
+
+                for future in done:
+                    if not future.cancelled() and future.exception() is not None:
+                        first_failure = min(indices[future], len(futures) if first_failure is None else first_failure)
+
+                if first_failure is not None:
+                    # Only the results of functions before the first failure can change which error is raised.
+                    for future in pending:
+                        if indices[future] > first_failure:
+                            future.cancel()
+
+                    pending = {future for future in pending if indices[future] < first_failure}
+
+            if first_failure is not None:
+                raise futures[first_failure].exception()
+
+            return {name: future.result() for name, future in zip(functions, futures)}
+
+        finally:
+            if temporary_executor is not None:
+                temporary_executor.shutdown(wait=False, cancel_futures=True)
+
     def validate_strand(self, name, source, **kwargs):
         """Validate a single strand by name."""
         return self.validate({name: source}, **kwargs)[name]
 
+    def validate_many(self, strand, sources, *, fail_fast=False, **kwargs):
+        """Validate a batch of sources against a strand without raising on invalid ones. Values strands are validated
+        with a single lookup of the strand's validator for the whole batch; other strands are validated by their
+        `validate_<strand>` method.
+
+        Usage:
+        ```
+            results = twine.validate_many("monitor_message", messages)
+            failures = [result for result in results if result.error]
+        ```
+
+        :param str strand: the name of the strand to validate the sources against (any strand except "credentials")
+        :param iter sources: the sources to validate (each of any kind the strand's `validate_<strand>` method accepts)
+        :param bool fail_fast: if `True`, stop validating at the first invalid source
+        :param kwargs: keyword arguments passed to `load_json` (or the `validate_<strand>` method) for each source
+        :raise twined.exceptions.UnknownStrand: if the strand can't be validated in batches
+        :raise twined.exceptions.StrandNotFound: if the strand isn't in the twine
+        :return list(ValidationResult): the index of each source in the batch with its validated data and `None`, or
+            `None` and the exception raised by validating it
+        """
+        if strand not in ALL_STRANDS or strand in CREDENTIAL_STRANDS:
+            raise exceptions.UnknownStrand(f"Cannot validate batches of {strand!r}. Try one of {ALL_STRANDS}.")
+
+        if strand in SCHEMA_STRANDS:
+            validator = self._get_validator(strand)
+            invalid_contents_exception = exceptions.invalid_contents_map[strand]
+
+            def validate(source):
+                data = self._load_json(strand, source, **kwargs)
+                error = best_match(validator.iter_errors(data))
+
+                if error is not None:
+                    raise invalid_contents_exception(str(error))
+
+                return data
+
+        else:
+            validate = functools.partial(getattr(self, f"validate_{strand}"), **kwargs)
+
+        results = []
+
+        for index, source in enumerate(sources):
+            try:
+                results.append(ValidationResult(index, validate(source), None))
+
+            # Duplicate keys in JSON sources raise a `KeyError`.
+            except (exceptions.TwineException, KeyError) as e:
+                results.append(ValidationResult(index, None, e))
+
+                if fail_fast:
+                    break
+
+        logger.debug("Validated batch of %d %s sources", len(results), strand)
+        return results
+
+    def is_valid(self, strand, source, **kwargs):
+        """Check whether a source is valid against a strand. Unlike the `validate_<strand>` methods, validation stops at
+        the first error and no error message is rendered (which, for large sources, can take longer than validating
+        them), so this is cheaper when only a yes/no answer is needed. Sources that can't be parsed as JSON are invalid.
+
+        :param str strand: the name of the strand to check the source against (any strand except "credentials")
+        :param any source: the source to check (of any kind the strand's `validate_<strand>` method accepts)
+        :param kwargs: keyword arguments passed to `load_json`
+        :raise twined.exceptions.UnknownStrand: if the strand can't be checked
+        :raise twined.exceptions.StrandNotFound: if the strand isn't in the twine
+        :return bool:
+        """
+        return self._get_validity_checker(strand, **kwargs)(source)
+
+    def is_valid_many(self, strand, sources, **kwargs):
+        """Check whether each of a batch of sources is valid against a strand. See `Twine.is_valid`.
+
+        :param str strand: the name of the strand to check the sources against (any strand except "credentials")
+        :param iter sources: the sources to check
+        :param kwargs: keyword arguments passed to `load_json` for each source
+        :raise twined.exceptions.UnknownStrand: if the strand can't be checked
+        :raise twined.exceptions.StrandNotFound: if the strand isn't in the twine
+        :return list(bool): whether each source is valid, in the order they were given
+        """
+        is_valid = self._get_validity_checker(strand, **kwargs)
+        return [is_valid(source) for source in sources]
+
+    def _get_validity_checker(self, strand, **kwargs):
+        """Get a function that checks whether a source is valid against a strand using its validator's `is_valid`
+        method, which stops at the first error without building it.
+
+        :param str strand:
+        :param kwargs: keyword arguments passed to `load_json` for each source
+        :raise twined.exceptions.UnknownStrand: if the strand can't be checked
+        :raise twined.exceptions.StrandNotFound: if the strand isn't in the twine
+        :return callable: a function taking a source and returning a bool
+        """
+        if strand not in ALL_STRANDS or strand in CREDENTIAL_STRANDS:
+            raise exceptions.UnknownStrand(f"Cannot check the validity of {strand!r}. Try one of {ALL_STRANDS}.")
+
+        # Get the validator up front so a missing strand raises `StrandNotFound` rather than making every source
+        # invalid.
+        validator = self._get_validator(strand)
+        invalid_json_exception = exceptions.invalid_json_map[strand]
+
+        def is_valid(source):
+            try:
+                data = self._load_json(strand, source, **kwargs)
+
+            # Duplicate keys in JSON sources raise a `KeyError`.
+            except (invalid_json_exception, KeyError):
+                return False
+
+            if strand in MANIFEST_STRANDS:
+                if hasattr(data, "to_primitive"):
+                    data = data.to_primitive()
+
+                if not validator.is_valid(data):
+                    return False
+
+                return next(self._iter_missing_datasets(strand, data), None) is None
+
+            if strand == "children":
+                return validator.is_valid(data) and next(self._iter_children_key_errors(data), None) is None
+
+            return validator.is_valid(data)
+
+        return is_valid
+
+    def collect_errors(self, strand, source, max_errors=100, time_budget=None, **kwargs):
+        """Collect the errors in a source against a strand rather than raising only the first one. Errors are collected
+        lazily, so collection stops as soon as `max_errors` errors have been found or the time budget has run out,
+        bounding the cost for very large or very invalid sources. The time budget is checked between errors, so it can
+        be overrun by the time taken to find a single error.
+
+        Usage:
+        ```
+            collected = twine.collect_errors("input_manifest", manifest, max_errors=20, time_budget=0.5)
+
+            for error in collected.errors:
+                logger.error("%s (%s): %s", error.pointer, error.keyword, error.message)
+        ```
+
+        :param str strand: the name of the strand to validate the source against (any strand except "credentials")
+        :param any source: the source to validate (of any kind the strand's `validate_<strand>` method accepts)
+        :param int|None max_errors: the maximum number of errors to collect (unlimited if `None`)
+        :param float|None time_budget: the maximum number of seconds to spend collecting errors (unlimited if `None`)
+        :param kwargs: keyword arguments passed to `load_json`
+        :raise twined.exceptions.UnknownStrand: if the strand can't be validated
+        :raise twined.exceptions.StrandNotFound: if the strand isn't in the twine
+        :return CollectedErrors: a record of each error (with the JSON pointer to the invalid part of the source, the
+            schema keyword it failed, the error message and a truncated excerpt of the invalid part) and whether all
+            the errors were collected
+        """
+        if strand not in ALL_STRANDS or strand in CREDENTIAL_STRANDS:
+            raise exceptions.UnknownStrand(f"Cannot collect errors for {strand!r}. Try one of {ALL_STRANDS}.")
+
+        validator = self._get_validator(strand)
+        data = self._load_json(strand, source, **kwargs)
+
+        if strand in MANIFEST_STRANDS and hasattr(data, "to_primitive"):
+            data = data.to_primitive()
+
+        deadline = None if time_budget is None else time.perf_counter() + time_budget
+        errors = []
+
+        for error in validator.iter_errors(data):
+            # At least one error is always collected so invalid sources can't be reported as having no errors.
+            if len(errors) == max_errors or (errors and deadline is not None and time.perf_counter() > deadline):
+                return CollectedErrors(errors, False)
+
+            errors.append(
+                ErrorRecord(
+                    pointer=_format_json_pointer(error.absolute_path),
+                    keyword=error.validator,
+                    message=_truncate(error.message),
+                    excerpt=_truncate(_excerpt_repr.repr(error.instance)),
+                )
+            )
+
+        # Missing datasets are only checked for if the manifest matches the manifest schema.
+        if strand in MANIFEST_STRANDS and not errors:
+            for dataset_name in self._iter_missing_datasets(strand, data):
+                if len(errors) == max_errors:
+                    return CollectedErrors(errors, False)
+
+                errors.append(
+                    ErrorRecord(
+                        pointer="/datasets",
+                        keyword="datasets",
+                        message=f"A dataset named {dataset_name!r} is expected in the {strand} but is missing.",
+                        excerpt=_truncate(_excerpt_repr.repr(data["datasets"])),
+                    )
+                )
+
+        # Children's keys are only checked if the children match the children schema.
+        if strand == "children" and not errors:
+            for message in self._iter_children_key_errors(data):
+                if len(errors) == max_errors:
+                    return CollectedErrors(errors, False)
+
+                errors.append(
+                    ErrorRecord(
+                        pointer="",
+                        keyword="key",
+                        message=_truncate(message),
+                        excerpt=_truncate(_excerpt_repr.repr(data)),
+                    )
+                )
+
+        return CollectedErrors(errors, True)
+
+    async def _run_in_executor(self, function, *args, executor=None, **kwargs):
+        """Run a function in an executor without blocking the event loop. If the coroutine is cancelled, the function
+        is cancelled if it hasn't started yet; otherwise it runs to completion in the executor but its result is
+        discarded.
+
+        :param callable function:
+        :param executor: the executor to run the function in (defaults to the twine's executor)
+        :return any: the function's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self._executor, functools.partial(function, *args, **kwargs))
+
+    async def avalidate(self, executor=None, **kwargs):
+        """Validate strands from sources provided as keyword arguments without blocking the event loop. See
+        `Twine.validate` for usage.
+
+        :param executor: the executor to load and validate the sources in (defaults to the twine's executor)
+        :return dict: dict of validated and initialised sources
+        """
+        return await self._run_in_executor(self.validate, executor=executor, **kwargs)
+
+    async def avalidate_children(self, source, executor=None, **kwargs):
+        """Validate the children values without blocking the event loop. See `Twine.validate_children`."""
+        return await self._run_in_executor(self.validate_children, source, executor=executor, **kwargs)
+
+    async def avalidate_credentials(self, *args, executor=None, **kwargs):
+        """Validate that all credentials required by the twine are present without blocking the event loop. See
+        `Twine.validate_credentials`.
+        """
+        return await self._run_in_executor(self.validate_credentials, *args, executor=executor, **kwargs)
+
+    async def avalidate_configuration_values(self, source, executor=None, **kwargs):
+        """Validate the configuration values without blocking the event loop. See
+        `Twine.validate_configuration_values`.
+        """
+        return await self._run_in_executor(self.validate_configuration_values, source, executor=executor, **kwargs)
+
+    async def avalidate_input_values(self, source, executor=None, **kwargs):
+        """Validate the input values without blocking the event loop. See `Twine.validate_input_values`."""
+        return await self._run_in_executor(self.validate_input_values, source, executor=executor, **kwargs)
+
+    async def avalidate_output_values(self, source, executor=None, **kwargs):
+        """Validate the output values without blocking the event loop. See `Twine.validate_output_values`."""
+        return await self._run_in_executor(self.validate_output_values, source, executor=executor, **kwargs)
+
+    async def avalidate_monitor_message(self, source, executor=None, **kwargs):
+        """Validate a monitor message without blocking the event loop. See `Twine.validate_monitor_message`."""
+        return await self._run_in_executor(self.validate_monitor_message, source, executor=executor, **kwargs)
+
+    async def avalidate_configuration_manifest(self, source, executor=None, **kwargs):
+        """Validate the configuration manifest without blocking the event loop. See
+        `Twine.validate_configuration_manifest`.
+        """
+        return await self._run_in_executor(self.validate_configuration_manifest, source, executor=executor, **kwargs)
+
+    async def avalidate_input_manifest(self, source, executor=None, **kwargs):
+        """Validate the input manifest without blocking the event loop. See `Twine.validate_input_manifest`."""
+        return await self._run_in_executor(self.validate_input_manifest, source, executor=executor, **kwargs)
+
+    async def avalidate_output_manifest(self, source, executor=None, **kwargs):
+        """Validate the output manifest without blocking the event loop. See `Twine.validate_output_manifest`."""
+        return await self._run_in_executor(self.validate_output_manifest, source, executor=executor, **kwargs)
+
     def prepare(self, *args, cls=None, **kwargs):
         """Prepare instance for strand data using a class map."""
         prepared = {}
@@ -1,3 +1,8 @@
+from .decoders import get_json_decoder, set_json_decoder  # noqa: F401
 from .encoders import TwinedEncoder  # noqa: F401
-from .load_json import load_json  # noqa: F401
+from .frozen import FrozenDict, FrozenList, freeze  # noqa: F401
+from .load_json import JSON_FILE_SUFFIXES, get_decompression_errors, load_json, open_json_file  # noqa: F401
+from .streams import JSONStreamReader, iter_lines  # noqa: F401
 from .strings import trim_suffix  # noqa: F401
+from .versions import get_installed_twined_version, version_satisfies  # noqa: F401
+from .write_json import write_json  # noqa: F401
@@ -0,0 +1,107 @@
+"""Pluggable JSON decoding. JSON is parsed with the standard library's `json` module by default, which rejects objects
+with duplicate keys. Another decoder can be plugged in with `set_json_decoder` - it's called with the document (a
+string or a bytes-like object, including memory-mapped files) and whether to detect duplicate keys, and must raise
+`json.JSONDecodeError` for invalid documents and `KeyError` for objects with duplicate keys (unless detecting them is
+turned off).
+
+Usage:
+```
+from twined.utils import set_json_decoder
+
+set_json_decoder(my_loads)  # Parse JSON with `my_loads(data, detect_duplicate_keys=True)`.
+set_json_decoder()  # Parse JSON with the standard library (the default).
+```
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+_json_decoder = None
+
+
+def get_json_decoder():
+    """Get the decoder plugged in to parse JSON.
+
+    :return callable|None: the decoder, or `None` if the standard library's decoder is used
+    """
+    return _json_decoder
+
+
+def set_json_decoder(decoder=None):
+    """Set the decoder used to parse JSON.
+
+    :param callable|None decoder: a function taking a JSON document and a `detect_duplicate_keys` keyword argument and
+        returning the parsed document (see the module docstring); if `None`, the standard library's decoder is used
+    :raise TypeError: if the decoder isn't callable
+    :return None:
+    """
+    global _json_decoder
+
+    if decoder is not None and not callable(decoder):
+        raise TypeError(f"The JSON decoder must be callable or `None`, not {decoder!r}.")
+
+    logger.debug("Using the %r JSON decoder", decoder or "json")
+    _json_decoder = decoder
+
+
+def loads(data, *args, detect_duplicate_keys=True, **kwargs):
+    """Parse a JSON document with the selected decoder, raising an error if any object in it has duplicate keys. The
+    standard library's decoder is used if any arguments are given, as they're specific to it.
+
+    :param str|bytes|bytearray|memoryview|mmap.mmap data: the JSON document
+    :param args: positional arguments passed to `json.loads`
+    :param bool detect_duplicate_keys: if `False`, skip checking for duplicate keys (the last value of a duplicate key
+        is kept); only do this for trusted sources
+    :param kwargs: keyword arguments passed to `json.loads`
+    :raise json.JSONDecodeError: if the document isn't valid JSON
+    :raise KeyError: if any object in the document has duplicate keys
+    :return any:
+    """
+    decoder = get_json_decoder()
+
+    if decoder is not None and not args and not kwargs:
+        return decoder(data, detect_duplicate_keys=detect_duplicate_keys)
+
+    if not isinstance(data, (str, bytes, bytearray)):
+        data = decode(data)
+
+    if detect_duplicate_keys:
+        return json.loads(data, *args, object_pairs_hook=raise_error_if_duplicate_keys, **kwargs)
+
+    return json.loads(data, *args, **kwargs)
+
+
+def decode(data):
+    """Decode a bytes-like object containing JSON into a string, detecting its encoding as `json.loads` does. The data
+    is decoded directly from its buffer without being copied into a `bytes` object first.
+
+    :param bytes|bytearray|memoryview|mmap.mmap data:
+    :return str:
+    """
+    return str(data, json.detect_encoding(bytes(data[:4])), "surrogatepass")
+
+
+def raise_error_if_duplicate_keys(pairs):
+    """Raise an error if any of the given key-value pairs have the same key.
+
+    :param list(tuple) pairs: a JSON object converted to a list of key-value pairs
+    :raise KeyError: if any of the pairs have the same key
+    :return dict:
+    """
+    result = dict(pairs)
+
+    # Building the dictionary in one go is much faster than checking each key, so the keys are only checked one by one
+    # to find the duplicate once it's known there is one.
+    if len(result) == len(pairs):
+        return result
+
+    seen_keys = set()
+
+    for key, _ in pairs:
+        if key in seen_keys:
+            raise KeyError(f"Duplicate key detected: {key!r}.")
+
+        seen_keys.add(key)
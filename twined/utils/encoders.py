@@ -1,35 +1,232 @@
+import copy
 import importlib.util
+import itertools
 import json
+import os
+import re
 
 # Determines whether numpy is available
 _numpy_spec = importlib.util.find_spec("numpy")
 
+# The numpy module, imported the first time it's needed (so importing twined doesn't import numpy).
+_numpy = None
+
 
 class TwinedEncoder(json.JSONEncoder):
-    """An encoder which will cope with serialising numpy arrays, ndarrays and matrices to JSON (in list form)
+    """An encoder which will cope with serialising numpy arrays, ndarrays, matrices and scalars (e.g. `numpy.float32`,
+    `numpy.int64` and `numpy.bool_`) to JSON (in list form)
 
     This is designed to work "out of the box" to help people serialise the outputs from twined applications.
     It does not require installation of numpy - it'll work fine if numpy is not present, so can be used in a versatile
     tool in uncertain environments.
 
+    Arrays are encoded a chunk of `array_chunk_size` elements at a time, and the encoded text of each chunk is spliced
+    into the output, so encoding an array never builds Python objects for all of its elements at once. Arrays are
+    converted to nested lists as a whole when an `indent` is given, so they're pretty-printed like lists.
+
+    Non-finite values (NaN and infinities) in numpy arrays and scalars are encoded as `NaN`, `Infinity` and `-Infinity`
+    by default (like python floats), raise a `ValueError` if `allow_nan=False`, or are encoded as `null` if
+    `nan_as_null=True`. As `numpy.float64` is a subclass of python's `float`, `numpy.float64` scalars (but not arrays of
+    them) are always treated like python floats.
+
     Example use:
     ```
     from twined.utils import TwinedEncoder
     some_json = {"a": np.array([0, 1])}
     json.dumps(some_json, cls=TwinedEncoder)
+    json.dumps(some_json, cls=TwinedEncoder, nan_as_null=True)
     ```
+
+    :param bool nan_as_null: if `True`, encode non-finite values in numpy arrays and scalars as `null`
+    :param int array_chunk_size: the maximum number of array elements to encode at a time
+    :param args: positional arguments passed to `json.JSONEncoder`
+    :param kwargs: keyword arguments passed to `json.JSONEncoder`
+    :return None:
     """
 
+    def __init__(self, *args, nan_as_null=False, array_chunk_size=65536, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.nan_as_null = nan_as_null
+        self.array_chunk_size = array_chunk_size
+
+        # The arrays found while encoding (keyed on the number in their placeholders) or `None` if arrays are converted
+        # to lists rather than spliced into the output.
+        self._arrays = None
+        self._array_indices = None
+        self._placeholder_prefix = None
+
     def default(self, obj):
         """Convert the given object to python primitives.
 
         :param any obj:
         :return any:
         """
-        if _numpy_spec is not None:
-            import numpy
+        numpy = _get_numpy()
+
+        if numpy is not None:
+            if isinstance(obj, numpy.ndarray):
+                if self._arrays is None:
+                    return self._to_primitive(obj)
+
+                # Put a placeholder in the output for the array, to be replaced by its encoded elements.
+                index = next(self._array_indices)
+                self._arrays[index] = obj
+                return f"{self._placeholder_prefix}{index}\x00"
+
+            if isinstance(obj, numpy.generic):
+                return self._to_primitive(obj)
+
+        return json.JSONEncoder.default(self, obj)
+
+    def iterencode(self, o, _one_shot=False):
+        """Encode the given object, yielding its JSON representation in chunks.
+
+        :param any o:
+        :param bool _one_shot: passed to `json.JSONEncoder.iterencode`
+        :return iter(str):
+        """
+        if _get_numpy() is None or self.indent is not None:
+            return json.JSONEncoder.iterencode(self, o, _one_shot)
+
+        # Use a copy of the encoder for each encoding so encodings can be interleaved, and a random placeholder prefix
+        # so placeholders can't be confused with strings in the data.
+        encoder = copy.copy(self)
+        encoder._arrays = {}
+        encoder._array_indices = itertools.count()
+        encoder._placeholder_prefix = f"\x00twined-array-{os.urandom(8).hex()}:"
+        return encoder._iterencode_with_arrays(o, _one_shot)
+
+    def _iterencode_with_arrays(self, o, _one_shot):
+        """Encode the given object, replacing the placeholders for arrays in the output with the encoded arrays.
+
+        :param any o:
+        :param bool _one_shot:
+        :return iter(str):
+        """
+        # Placeholders are strings, so they're quoted and their null characters escaped in the output.
+        placeholder_pattern = re.compile(
+            re.escape(json.dumps(self._placeholder_prefix)[:-1]) + r"(\d+)" + re.escape(json.dumps("\x00")[1:])
+        )
+
+        for chunk in json.JSONEncoder.iterencode(self, o, _one_shot):
+            if not self._arrays:
+                yield chunk
+                continue
+
+            position = 0
+
+            for match in placeholder_pattern.finditer(chunk):
+                yield chunk[position : match.start()]
+                yield from self._iterencode_array(self._arrays.pop(int(match.group(1))))
+                position = match.end()
+
+            yield chunk[position:]
+
+    def _iterencode_array(self, array):
+        """Encode a numpy array as nested JSON arrays, a chunk of at most `array_chunk_size` elements at a time.
+
+        :param numpy.ndarray array:
+        :return iter(str):
+        """
+        numpy = _get_numpy()
+
+        # Matrices are always two-dimensional (even their rows), so they're viewed as ordinary arrays.
+        array = numpy.asarray(array)
+
+        if array.ndim == 0 or array.size == 0:
+            yield self._encode_chunk(array)
+            return
+
+        row_size = array.size // len(array)
+
+        # Split rows that are too large to encode at once into chunks of their own.
+        if row_size > self.array_chunk_size:
+            yield "["
+
+            for index, row in enumerate(array):
+                if index:
+                    yield self.item_separator
+
+                yield from self._iterencode_array(row)
+
+            yield "]"
+            return
+
+        rows_per_chunk = max(1, self.array_chunk_size // max(1, row_size))
+        yield "["
+
+        for start in range(0, len(array), rows_per_chunk):
+            if start:
+                yield self.item_separator
+
+            yield self._encode_chunk(array[start : start + rows_per_chunk])[1:-1]
+
+        yield "]"
+
+    def _encode_chunk(self, array):
+        """Encode a (small) numpy array with the standard library's encoder.
+
+        :param numpy.ndarray array:
+        :return str:
+        """
+        encoder = json.JSONEncoder(
+            skipkeys=self.skipkeys,
+            ensure_ascii=self.ensure_ascii,
+            check_circular=False,
+            allow_nan=self.allow_nan,
+            sort_keys=self.sort_keys,
+            separators=(self.item_separator, self.key_separator),
+            default=self._to_primitive_or_raise,
+        )
+
+        return encoder.encode(self._to_primitive(array))
+
+    def _to_primitive(self, obj):
+        """Convert a numpy array or scalar to python primitives, replacing non-finite floats with `None` if
+        `nan_as_null` is `True`.
+
+        :param numpy.ndarray|numpy.generic obj:
+        :return any:
+        """
+        numpy = _get_numpy()
+
+        if self.nan_as_null and numpy.issubdtype(obj.dtype, numpy.floating):
+            finite = numpy.isfinite(obj)
+
+            if not numpy.all(finite):
+                obj = numpy.where(finite, obj, None)
+
+        return obj.tolist()
+
+    def _to_primitive_or_raise(self, obj):
+        """Convert numpy arrays and scalars (e.g. in object arrays) to python primitives, raising an error for other
+        objects that can't be encoded.
+
+        :param any obj:
+        :raise TypeError: if the object can't be encoded
+        :return any:
+        """
+        numpy = _get_numpy()
 
-            if isinstance(obj, numpy.ndarray) or isinstance(obj, numpy.matrix):
-                return obj.tolist()
+        if isinstance(obj, (numpy.ndarray, numpy.generic)):
+            return self._to_primitive(obj)
 
         return json.JSONEncoder.default(self, obj)
+
+
+def _get_numpy():
+    """Get the numpy module, importing it the first time it's needed.
+
+    :return module|None: the numpy module, or `None` if it isn't installed
+    """
+    global _numpy
+
+    if _numpy_spec is None:
+        return None
+
+    if _numpy is None:
+        import numpy
+
+        _numpy = numpy
+
+    return _numpy
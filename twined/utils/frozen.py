@@ -0,0 +1,82 @@
+import copy
+import sys
+
+
+class FrozenDict(dict):
+    """A dictionary that can't be modified. It's still a `dict`, so it can be validated and serialised like any other.
+    Copying it (with `copy.copy` or `copy.deepcopy`) gives an ordinary, modifiable dictionary.
+    """
+
+    __slots__ = ()
+
+    def _raise_read_only_error(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__!r} object is read-only.")
+
+    __setitem__ = __delitem__ = __ior__ = _raise_read_only_error
+    clear = pop = popitem = setdefault = update = _raise_read_only_error
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+class FrozenList(list):
+    """A list that can't be modified. It's still a `list`, so it can be validated and serialised like any other.
+    Copying it (with `copy.copy` or `copy.deepcopy`) gives an ordinary, modifiable list.
+    """
+
+    __slots__ = ()
+
+    def _raise_read_only_error(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__!r} object is read-only.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _raise_read_only_error
+    append = clear = extend = insert = pop = remove = reverse = sort = _raise_read_only_error
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(item, memo) for item in self]
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+def freeze(value):
+    """Make a read-only copy of decoded JSON, replacing each dictionary and list in it with a `FrozenDict` or
+    `FrozenList`, and estimate how much memory the copy takes up. Other values are immutable so are shared with the
+    original.
+
+    :param any value: decoded JSON
+    :return (any, int): the read-only copy and an estimate of its size in bytes
+    """
+    if isinstance(value, dict):
+        items = {}
+        size = 0
+
+        for key, item in value.items():
+            items[key], item_size = freeze(item)
+            size += sys.getsizeof(key) + item_size
+
+        frozen = FrozenDict(items)
+        return frozen, size + sys.getsizeof(frozen)
+
+    if isinstance(value, list):
+        items = []
+        size = 0
+
+        for item in value:
+            frozen_item, item_size = freeze(item)
+            items.append(frozen_item)
+            size += item_size
+
+        frozen = FrozenList(items)
+        return frozen, size + sys.getsizeof(frozen)
+
+    return value, sys.getsizeof(value)
@@ -1,13 +1,36 @@
+import importlib
 import io
-import json
 import logging
+import mmap
+import os
 
-from twined.exceptions import InvalidSourceKindException
+from .decoders import loads, raise_error_if_duplicate_keys  # noqa: F401
 
 logger = logging.getLogger(__file__)
 
 
-ALLOWED_KINDS = ("file-like", "filename", "string", "object")
+ALLOWED_KINDS = ("file-like", "filename", "string", "bytes", "object")
+
+# Files at least this large (in bytes) are memory-mapped rather than read into memory before being decoded.
+MMAP_THRESHOLD = 1024 * 1024
+
+# The modules that can decompress JSON files with each suffix (following ".json") in order of preference. They're
+# imported when they're first needed and each has an `open` function like `gzip.open`.
+DECOMPRESSORS = {
+    ".gz": ("gzip",),
+    ".bz2": ("bz2",),
+    ".xz": ("lzma",),
+    ".zst": ("compression.zstd", "zstandard"),
+}
+
+JSON_FILE_SUFFIXES = (".json", *(".json" + suffix for suffix in DECOMPRESSORS))
+
+# The number of bytes of a compressed file to decompress at a time.
+DECOMPRESSION_CHUNK_SIZE = 1024 * 1024
+
+# The errors the decompression modules raise for corrupt data, besides `EOFError` (raised for truncated files) and
+# `OSError` (raised for invalid data by `gzip` as `gzip.BadGzipFile` and by `bz2`).
+DECOMPRESSION_ERROR_NAMES = ("LZMAError", "ZstdError")
 
 
 def load_json(source, *args, **kwargs):
@@ -18,52 +41,140 @@ def load_json(source, *args, **kwargs):
     whether it's in a file or a raw string
 
     :parameter source: The data source, which can be a string filename ending in *.json (json loaded from disc to
-    python dict), a file-like object, a string containing raw json data (json loaded from string to python dict), or
-    any other valid python object (passed through).
+    python dict) or a compressed *.json.gz, *.json.bz2, *.json.xz or *.json.zst (if `zstandard` is installed) file
+    (decompressed as it's read), a file-like object, a string containing raw json data (json loaded from string to
+    python dict), a bytes-like object (`bytes`, `bytearray` or `memoryview`) containing raw json data, or any other
+    valid python object (passed through). Files of at least `MMAP_THRESHOLD` bytes are memory-mapped and decoded
+    straight from the mapping instead of being read into memory first.
+
+    JSON is parsed with the decoder selected with `twined.utils.set_json_decoder` (the standard library's by default).
 
-    :parameter args, kwargs: Arguments passed through to json.load or json.loads, enabling use of custom encoders etc.
+    :parameter args, kwargs: Arguments passed through to json.loads, enabling use of custom decoders etc. (the standard
+    library's decoder is always used if any are given). Pass `detect_duplicate_keys=False` to skip checking for
+    duplicate keys in trusted sources.
     """
     allowed_kinds = kwargs.pop("allowed_kinds", ALLOWED_KINDS)
 
     def check(kind):
         if kind not in allowed_kinds:
+            # Imported here as the exceptions depend on `jsonschema`, which is slow to import.
+            from twined.exceptions import InvalidSourceKindException
+
             raise InvalidSourceKindException(f"Attempted to load json from a {kind} data source")
 
     if isinstance(source, io.IOBase):
         logger.debug("Detected source is a file-like object, loading contents...")
         check("file-like")
-        return json.load(source, object_pairs_hook=raise_error_if_duplicate_keys, *args, **kwargs)
+        return loads(source.read(), *args, **kwargs)
+
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        logger.debug("Detected source is a bytes-like object containing json data, parsing...")
+        check("bytes")
+        return loads(source, *args, **kwargs)
 
     elif not isinstance(source, str):
         logger.debug("Source is not a string, bypassing (returning raw data)")
         check("object")
         return source
 
-    elif source.endswith(".json"):
+    elif source.endswith(JSON_FILE_SUFFIXES):
         logger.debug("Detected source is name of a *.json file, loading from %s", source)
         check("filename")
-        with open(source) as f:
-            return json.load(f, object_pairs_hook=raise_error_if_duplicate_keys, *args, **kwargs)
+        return _load_file(source, *args, **kwargs)
 
     else:
         logger.debug("Detected source is string containing json data, parsing...")
         check("string")
-        return json.loads(source, object_pairs_hook=raise_error_if_duplicate_keys, *args, **kwargs)
+        return loads(source, *args, **kwargs)
+
+
+def open_json_file(path, mode="rb"):
+    """Open a JSON file in binary mode. Compressed files (see `DECOMPRESSORS`) are decompressed as they're read and
+    compressed as they're written.
+
+    :param str path: the path to a *.json file or a compressed JSON file (e.g. *.json.gz)
+    :param str mode: "rb" to read the file or "wb" to write it
+    :raise ImportError: if no module that can decompress the file is installed
+    :return io.BufferedIOBase:
+    """
+    for suffix, module_names in DECOMPRESSORS.items():
+        if path.endswith(suffix):
+            return _import_decompressor(module_names).open(path, mode)
+
+    return open(path, mode)
+
 
+def get_decompression_errors(path):
+    """Get the errors raised while reading the given JSON file if it's compressed and its contents are corrupt or
+    truncated. They should only be caught around reading the file, as opening it raises some of the same errors (e.g.
+    `PermissionError` is an `OSError`).
 
-def raise_error_if_duplicate_keys(pairs):
-    """Raise an error if any of the given key-value pairs have the same key.
+    :param str path: the path to a *.json file or a compressed JSON file (e.g. *.json.gz)
+    :raise ImportError: if no module that can decompress the file is installed
+    :return tuple(type): the errors; empty if the file isn't compressed
+    """
+    for suffix, module_names in DECOMPRESSORS.items():
+        if path.endswith(suffix):
+            module = _import_decompressor(module_names)
+            module_errors = (getattr(module, name) for name in DECOMPRESSION_ERROR_NAMES if hasattr(module, name))
+            return (EOFError, OSError, *module_errors)
+
+    return ()
+
+
+def _import_decompressor(module_names):
+    """Import the first of the given decompression modules that's installed.
+
+    :param iter(str) module_names:
+    :raise ImportError: if none of the modules are installed
+    :return module:
+    """
+    for module_name in module_names:
+        try:
+            return importlib.import_module(module_name)
+        except ImportError:
+            continue
+
+    raise ImportError(f"One of {module_names!r} must be installed to open this compressed JSON file.")
 
-    :param list(tuple) pairs: a JSON object converted to a list of key-value pairs
-    :raise KeyError: if any of the pairs have the same key
-    :return dict:
+
+def _load_file(path, *args, **kwargs):
+    """Load a JSON file. Files of at least `MMAP_THRESHOLD` bytes are parsed straight from a memory mapping of the file,
+    avoiding the intermediate copy of the whole file that reading it would make. Compressed files are decompressed a
+    chunk at a time, so the whole compressed file is never held in memory alongside the decompressed document.
+
+    :param str path:
+    :raise twined.exceptions.CorruptCompressedFile: if the file is compressed but can't be decompressed
+    :return any:
     """
-    result = {}
+    if not path.endswith(".json"):
+        decompression_errors = get_decompression_errors(path)
+
+        with open_json_file(path) as f:
+            data = bytearray()
+
+            try:
+                while chunk := f.read(DECOMPRESSION_CHUNK_SIZE):
+                    data += chunk
+            except decompression_errors as e:
+                # Imported here as the exceptions depend on `jsonschema`, which is slow to import.
+                from twined.exceptions import CorruptCompressedFile
+
+                raise CorruptCompressedFile(f"Cannot decompress {path!r}: {e}") from e
+
+        return loads(data, *args, **kwargs)
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-    for key, value in pairs:
-        if key in result:
-            raise KeyError(f"Duplicate key detected: {key!r}.")
+            # Some files (e.g. on some network filesystems) can't be memory-mapped.
+            except (OSError, ValueError):
+                logger.debug("Couldn't memory-map %s, reading it instead", path)
 
-        result[key] = value
+            else:
+                with mapping:
+                    return loads(mapping, *args, **kwargs)
 
-    return result
+        return loads(f.read(), *args, **kwargs)
@@ -0,0 +1,249 @@
+import codecs
+import io
+import json
+
+
+def iter_lines(stream):
+    """Iterate over the lines of a stream without reading more than one line into memory at a time. Newlines are
+    stripped from the lines.
+
+    :param io.IOBase|iter(bytes) stream: a file-like object (in text or binary mode) or an iterable of chunks of bytes
+        split at arbitrary points (e.g. from a socket or a message bus)
+    :return iter(str|bytes):
+    """
+    if isinstance(stream, io.IOBase):
+        for line in stream:
+            yield line.rstrip(b"\r\n" if isinstance(line, bytes) else "\r\n")
+
+        return
+
+    buffer = bytearray()
+
+    for chunk in stream:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+
+        start = 0
+
+        while True:
+            end = chunk.find(b"\n", start)
+
+            if end == -1:
+                buffer += chunk[start:]
+                break
+
+            buffer += chunk[start:end]
+            yield bytes(buffer.rstrip(b"\r"))
+            buffer.clear()
+            start = end + 1
+
+    if buffer:
+        yield bytes(buffer.rstrip(b"\r"))
+
+
+class JSONStreamReader:
+    """A reader for walking through a JSON document in a stream without loading the whole document into memory. Objects
+    and arrays can be iterated over one member at a time, reading each member's value only when it's needed, so memory
+    use is bounded by the size of the largest value read at once rather than the size of the document.
+
+    Usage:
+    ```
+        with open("manifest.json") as f:
+            reader = JSONStreamReader(f)
+
+            for key in reader.iter_object():
+                if key == "datasets":
+                    for dataset_name in reader.iter_object():
+                        dataset = reader.read_value()
+                else:
+                    reader.read_value()
+    ```
+
+    :param io.IOBase stream: a file-like object in text or binary (UTF-8) mode
+    :param int chunk_size: the number of characters to read from the stream at a time
+    :param callable|None object_pairs_hook: passed to `json.JSONDecoder` for decoding the values read
+    :return None:
+    """
+
+    def __init__(self, stream, chunk_size=65536, object_pairs_hook=None):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder(object_pairs_hook=object_pairs_hook)
+        self._buffer = ""
+        self._position = 0
+        self._end_of_stream = False
+
+        # Binary streams are decoded incrementally (rather than wrapped in a `TextIOWrapper`, which would close them).
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def iter_object(self):
+        """Iterate over the keys of the object at the current position. After each key is yielded, its value must be
+        read (or iterated over) before the iteration continues.
+
+        :raise json.JSONDecodeError: if there isn't a valid object at the current position
+        :return iter(str):
+        """
+        self._expect("{")
+
+        if self._peek() == "}":
+            self._position += 1
+            return
+
+        while True:
+            if self._peek() != '"':
+                self._raise("Expecting property name enclosed in double quotes")
+
+            key = self.read_value()
+            self._expect(":")
+            yield key
+
+            if not self._continue_container("}"):
+                return
+
+    def iter_array(self):
+        """Iterate over the indices of the items in the array at the current position. After each index is yielded, the
+        item must be read (or iterated over) before the iteration continues.
+
+        :raise json.JSONDecodeError: if there isn't a valid array at the current position
+        :return iter(int):
+        """
+        self._expect("[")
+
+        if self._peek() == "]":
+            self._position += 1
+            return
+
+        index = 0
+
+        while True:
+            yield index
+            index += 1
+
+            if not self._continue_container("]"):
+                return
+
+    def peek(self):
+        """Get the first character of the value at the current position (e.g. "{" for an object or '"' for a string).
+
+        :return str: the character, or an empty string at the end of the stream
+        """
+        return self._peek()
+
+    def read_value(self):
+        """Read and decode the whole value at the current position.
+
+        :raise json.JSONDecodeError: if there isn't a valid value at the current position
+        :return any:
+        """
+        self._peek()
+        read_size = self._chunk_size
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if self._end_of_stream:
+                    raise
+
+                value, end = None, None
+
+            # A value ending at the end of the buffer, or a number followed by a character that could continue it, may
+            # have been truncated by the end of the buffer (e.g. "2.5" from "2.5e3").
+            if end is not None and (
+                self._end_of_stream
+                or (end < len(self._buffer) and not (_is_number(value) and self._buffer[end] in "0123456789.eE+-"))
+            ):
+                self._position = end
+                return value
+
+            # Read geometrically more each time so reading a large value takes linear time.
+            self._read(read_size)
+            read_size *= 2
+
+    def expect_end(self):
+        """Check that nothing but whitespace is left in the stream after the value(s) read.
+
+        :raise json.JSONDecodeError: if anything else is left in the stream
+        :return None:
+        """
+        if self._peek():
+            self._raise("Extra data")
+
+    def _continue_container(self, closing_character):
+        """Move past the comma after a member of an object or array, or past the end of the object or array.
+
+        :param str closing_character:
+        :raise json.JSONDecodeError: if neither a comma nor the closing character is next
+        :return bool: `True` if there's another member
+        """
+        character = self._peek()
+        self._position += 1
+
+        if character == ",":
+            return True
+
+        if character == closing_character:
+            return False
+
+        self._position -= 1
+        self._raise(f"Expecting ',' delimiter or {closing_character!r}")
+
+    def _expect(self, character):
+        """Move past the given character, skipping any whitespace before it.
+
+        :param str character:
+        :raise json.JSONDecodeError: if the character isn't next
+        :return None:
+        """
+        if self._peek() != character:
+            self._raise(f"Expecting {character!r}")
+
+        self._position += 1
+
+    def _peek(self):
+        """Skip any whitespace at the current position and get the next character.
+
+        :return str: the character, or an empty string at the end of the stream
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in " \t\n\r":
+                self._position += 1
+
+            if self._position < len(self._buffer) or self._end_of_stream:
+                return self._buffer[self._position : self._position + 1]
+
+            self._read(self._chunk_size)
+
+    def _read(self, size):
+        """Read more of the stream into the buffer, discarding the part of the buffer that's already been read.
+
+        :param int size:
+        :return None:
+        """
+        chunk = self._stream.read(size)
+
+        if not chunk:
+            self._end_of_stream = True
+
+        if isinstance(chunk, bytes):
+            chunk = self._text_decoder.decode(chunk, final=self._end_of_stream)
+
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+
+    def _raise(self, message):
+        """Raise a decoding error at the current position.
+
+        :param str message:
+        :raise json.JSONDecodeError:
+        """
+        raise json.JSONDecodeError(message, self._buffer, self._position)
+
+
+def _is_number(value):
+    """Check whether a decoded JSON value is a number.
+
+    :param any value:
+    :return bool:
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,202 @@
+from collections import namedtuple
+import functools
+import math
+import re
+
+# The version scheme of PEP 440 (see appendix B of https://peps.python.org/pep-0440).
+VERSION_PATTERN = re.compile(
+    r"""
+    ^\s*v?
+    (?:(?P<epoch>\d+)!)?
+    (?P<release>\d+(?:\.\d+)*)
+    (?:[-_.]?(?P<pre_label>a|b|c|rc|alpha|beta|pre|preview)[-_.]?(?P<pre_number>\d+)?)?
+    (?:-(?P<implicit_post_number>\d+)|[-_.]?(?P<post_label>post|rev|r)[-_.]?(?P<post_number>\d+)?)?
+    (?:[-_.]?(?P<dev_label>dev)[-_.]?(?P<dev_number>\d+)?)?
+    (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+    \s*$
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+SPECIFIER_PATTERN = re.compile(r"^(==|!=|>=|<=|>|<|~=)\s*(\S+)$")
+
+# The order of pre-release phases, keyed on each spelling of them.
+PRE_RELEASE_PHASES = {"a": 0, "alpha": 0, "b": 1, "beta": 1, "c": 2, "rc": 2, "pre": 2, "preview": 2}
+
+Version = namedtuple("Version", ["epoch", "release", "pre", "post", "dev", "local"])
+
+
+@functools.lru_cache(maxsize=None)
+def get_installed_twined_version():
+    """Get the installed version of twined. The distribution metadata is only looked up once per process.
+
+    :return str:
+    """
+    # Imported here as `importlib.metadata` is slow to import.
+    import importlib.metadata
+
+    return importlib.metadata.version("twined")
+
+
+def parse_version(version):
+    """Parse a PEP 440 version string (e.g. "0.7.0", "0.7.0rc1" or "1!0.7.0.post2.dev1+local").
+
+    :param str version:
+    :raise ValueError: if the version isn't a valid PEP 440 version
+    :return Version: the version's segments - the pre-release segment is a tuple of the phase's position in
+        `PRE_RELEASE_PHASES` and its number, and missing optional segments are `None`
+    """
+    match = VERSION_PATTERN.match(version)
+
+    if match is None:
+        raise ValueError(f"{version!r} is not a valid version.")
+
+    pre = None
+    post = None
+    dev = None
+    local = None
+
+    if match["pre_label"]:
+        pre = (PRE_RELEASE_PHASES[match["pre_label"].lower()], int(match["pre_number"] or 0))
+
+    if match["implicit_post_number"]:
+        post = int(match["implicit_post_number"])
+    elif match["post_label"]:
+        post = int(match["post_number"] or 0)
+
+    if match["dev_label"]:
+        dev = int(match["dev_number"] or 0)
+
+    if match["local"]:
+        local = tuple(
+            (1, int(part)) if part.isdigit() else (0, part.lower()) for part in re.split(r"[-_.]", match["local"])
+        )
+
+    return Version(
+        epoch=int(match["epoch"] or 0),
+        release=tuple(int(part) for part in match["release"].split(".")),
+        pre=pre,
+        post=post,
+        dev=dev,
+        local=local,
+    )
+
+
+def version_satisfies(version, specification):
+    """Check whether a version satisfies a version specification. The specification can be a version on its own (which
+    the version must be exactly equal to, character for character) or a comma-separated list of clauses using the
+    operators `==`, `!=`, `>=`, `<=`, `>`, `<` and `~=` (e.g. ">=0.6,<0.8" or "~=0.7.0"), all of which must be
+    satisfied. Clauses compare whole versions, including pre-, post- and development release segments, as PEP 440
+    specifies. The `==` and `!=` operators also accept a release prefix followed by ".*" (e.g. "==0.7.*"), which
+    matches any version whose release segment starts with the prefix.
+
+    :param str version: the version to check
+    :param str specification: the version specification to check the version against
+    :raise ValueError: if the version or the specification is invalid
+    :return bool:
+    """
+    parsed_version = parse_version(version)
+
+    if VERSION_PATTERN.match(specification):
+        return version.strip() == specification.strip()
+
+    for clause in specification.split(","):
+        match = SPECIFIER_PATTERN.match(clause.strip())
+
+        if match is None:
+            raise ValueError(f"{specification!r} is not a valid version specification.")
+
+        operator, required_version = match.groups()
+
+        if operator in ("==", "!=") and required_version.endswith(".*"):
+            prefix = parse_version(required_version[:-2])
+
+            # Only release segments (with an optional epoch) can be used as prefixes.
+            if prefix != Version(prefix.epoch, prefix.release, None, None, None, None):
+                raise ValueError(f"{specification!r} is not a valid version specification.")
+
+            if _matches_prefix(parsed_version, prefix) != (operator == "=="):
+                return False
+
+        elif not _compare(parsed_version, operator, parse_version(required_version)):
+            return False
+
+    return True
+
+
+def _compare(version, operator, required_version):
+    """Compare two versions using the given operator following PEP 440. The local segment of the version is ignored
+    unless the required version has one.
+
+    :param Version version:
+    :param str operator:
+    :param Version required_version:
+    :return bool:
+    """
+    if required_version.local is None:
+        version = version._replace(local=None)
+
+    key = _get_sort_key(version)
+    required_key = _get_sort_key(required_version)
+    same_release = key[:2] == required_key[:2]
+
+    if operator == "~=":
+        # Compatible release, e.g. "~=0.7.1" means ">=0.7.1,==0.7.*".
+        prefix = required_version.release[:-1] or required_version.release
+        return key >= required_key and _matches_prefix(version, required_version._replace(release=prefix))
+
+    if operator == ">":
+        # Post-releases of the required version don't count as greater than it unless it's a post-release itself.
+        return key > required_key and not (same_release and version.post is not None and required_version.post is None)
+
+    if operator == "<":
+        # Pre-releases of the required version don't count as less than it unless it's a pre-release itself.
+        is_pre_release = version.pre is not None or version.dev is not None
+        required_is_pre_release = required_version.pre is not None or required_version.dev is not None
+        return key < required_key and not (same_release and is_pre_release and not required_is_pre_release)
+
+    return {
+        "==": key == required_key,
+        "!=": key != required_key,
+        ">=": key >= required_key,
+        "<=": key <= required_key,
+    }[operator]
+
+
+def _matches_prefix(version, prefix):
+    """Check whether a version's release segment starts with a prefix's release segment (e.g. "0.7.1rc1" matches the
+    prefix "0.7"), padding the version's release segment with zeros if it's shorter than the prefix. Only the epoch and
+    release segments are compared.
+
+    :param Version version:
+    :param Version prefix:
+    :return bool:
+    """
+    padded_release = version.release + (0,) * max(0, len(prefix.release) - len(version.release))
+    return version.epoch == prefix.epoch and padded_release[: len(prefix.release)] == prefix.release
+
+
+def _get_sort_key(version):
+    """Get a key that sorts versions in the order PEP 440 defines. Trailing zeros in the release segment are ignored, so
+    e.g. "0.7" and "0.7.0" are equal.
+
+    :param Version version:
+    :return tuple:
+    """
+    release = version.release
+
+    while len(release) > 1 and release[-1] == 0:
+        release = release[:-1]
+
+    # Development releases come before pre-releases, which come before final releases.
+    if version.pre is None and version.post is None and version.dev is not None:
+        pre = (-math.inf, 0)
+    elif version.pre is None:
+        pre = (math.inf, 0)
+    else:
+        pre = version.pre
+
+    post = -math.inf if version.post is None else version.post
+    dev = math.inf if version.dev is None else version.dev
+    local = () if version.local is None else version.local
+    return (version.epoch, release, pre, post, dev, local)
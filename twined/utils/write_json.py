@@ -0,0 +1,98 @@
+import io
+import logging
+import os
+
+from .encoders import TwinedEncoder
+from .load_json import open_json_file
+
+logger = logging.getLogger(__file__)
+
+
+# The number of characters of encoded JSON to collect before writing them.
+WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def write_json(obj, destination, cls=TwinedEncoder, buffer_size=WRITE_BUFFER_SIZE, **kwargs):
+    """Write an object as JSON to a file, a file-like object or a socket as it's encoded, rather than encoding it into
+    one string first (as `json.dumps` does), so the memory used doesn't grow with the size of the output.
+
+    The encoded JSON is collected into a buffer of around `buffer_size` characters, which is written whenever it's full.
+    Numpy arrays are encoded a chunk at a time by `TwinedEncoder` (see its `array_chunk_size` argument), so a chunk of
+    an array can make a single write larger than the buffer.
+
+    Usage:
+    ```
+    from twined.utils import write_json
+
+    write_json({"wind_speeds": np.zeros(10_000_000)}, "output_values.json")
+    ```
+
+    :param any obj: the object to encode
+    :param str|os.PathLike|io.IOBase|socket.socket destination: a *.json filename (or a compressed one, e.g. *.json.gz,
+        which is compressed as it's written), a file-like object in text or binary mode, or a connected socket
+    :param type cls: the `json.JSONEncoder` subclass to encode the object with
+    :param int buffer_size: the number of characters to collect before writing them
+    :param kwargs: keyword arguments passed to the encoder (e.g. `indent` or `nan_as_null`)
+    :return None:
+    """
+    if isinstance(destination, (str, os.PathLike)):
+        logger.debug("Writing json to %s", destination)
+
+        with open_json_file(os.fspath(destination), "wb") as f:
+            return write_json(obj, f, cls=cls, buffer_size=buffer_size, **kwargs)
+
+    if hasattr(destination, "sendall"):
+        write = destination.sendall
+        binary = True
+    elif isinstance(destination, io.RawIOBase):
+        # Raw streams may write only part of what they're given.
+        write = _get_write_all(destination)
+        binary = True
+    else:
+        write = destination.write
+        binary = isinstance(destination, io.BufferedIOBase)
+
+    buffer = []
+    buffered_size = 0
+
+    for chunk in cls(**kwargs).iterencode(obj):
+        buffer.append(chunk)
+        buffered_size += len(chunk)
+
+        if buffered_size >= buffer_size:
+            _flush(buffer, write, binary)
+            buffered_size = 0
+
+    _flush(buffer, write, binary)
+
+
+def _flush(buffer, write, binary):
+    """Write the chunks in the buffer and empty it.
+
+    :param list(str) buffer:
+    :param callable write:
+    :param bool binary: if `True`, encode the chunks as UTF-8 before writing them
+    :return None:
+    """
+    if not buffer:
+        return
+
+    data = "".join(buffer)
+    buffer.clear()
+    write(data.encode() if binary else data)
+
+
+def _get_write_all(stream):
+    """Get a function that writes all of the given data to a raw stream, however many calls that takes.
+
+    :param io.RawIOBase stream:
+    :return callable:
+    """
+
+    def write_all(data):
+        data = memoryview(data)
+
+        while data:
+            data = data[stream.write(data) :]
+
+    return write_all